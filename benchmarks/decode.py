@@ -0,0 +1,182 @@
+"""
+Measures the number of values decoded per second when converting a
+retrieved AREntryListFieldValueList into Python entries, comparing the
+decoding plans used by PyRemedy with the previous per-value if/elif chain.
+
+The entry list is built in memory so the benchmark requires neither a
+Remedy ARS server nor the Remedy ARS C API:
+
+    python benchmarks/decode.py [rows]
+"""
+from ctypes import addressof, cast, create_string_buffer, pointer, POINTER
+from datetime import datetime
+import os
+import sys
+import timeit
+
+# Import PyRemedy from the source tree containing the benchmark
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+)
+
+from pyremedy import arh
+from pyremedy.decoder import build_plan
+
+
+SCHEMA = b'HPD:Help Desk'
+
+FIELDS = [
+    (1, b'Request ID', arh.AR_DATA_TYPE_CHAR),
+    (3, b'Create Date', arh.AR_DATA_TYPE_TIME),
+    (6, b'Modified Date', arh.AR_DATA_TYPE_TIME),
+    (7, b'Status', arh.AR_DATA_TYPE_ENUM),
+    (8, b'Short Description', arh.AR_DATA_TYPE_CHAR),
+    (9, b'Priority', arh.AR_DATA_TYPE_INTEGER),
+    (10, b'Effort', arh.AR_DATA_TYPE_REAL)
+]
+
+ENUMS = {0: b'New', 1: b'Assigned', 2: b'In Progress', 3: b'Closed'}
+
+
+class FieldCaches(object):
+    """The field caches of an ARS session for a single schema."""
+
+    def __init__(self):
+        self.field_id_to_name_cache = {
+            SCHEMA: dict((f[0], f[1]) for f in FIELDS)
+        }
+        self.field_id_to_type_cache = {
+            SCHEMA: dict((f[0], f[2]) for f in FIELDS)
+        }
+        self.enum_id_to_name_cache = {SCHEMA: {7: ENUMS}}
+
+
+def build_entry_list(rows):
+    """
+    Builds an AREntryListFieldValueList containing a number of rows.
+
+    :param int rows: the number of rows to build
+    :return: the entry list and a list of objects that must be kept alive
+    """
+
+    keep = []
+    entry_list = arh.AREntryListFieldValueList()
+    entries = (arh.AREntryListFieldValueStruct * rows)()
+    entry_list.numItems = rows
+    entry_list.entryList = cast(
+        entries, POINTER(arh.AREntryListFieldValueStruct)
+    )
+    keep.append(entries)
+
+    for i in range(rows):
+        entry = entries[i]
+        entry_ids = (arh.AREntryIdType * 1)()
+        entry_ids[0].value = ('%015d' % i).encode('ascii')
+        entry.entryId.numItems = 1
+        entry.entryId.entryIdList = cast(
+            entry_ids, POINTER(arh.AREntryIdType)
+        )
+
+        values = (arh.ARFieldValueStruct * len(FIELDS))()
+        for j, (field_id, name, data_type) in enumerate(FIELDS):
+            value = values[j]
+            value.fieldId = field_id
+            value.value.dataType = data_type
+            if data_type == arh.AR_DATA_TYPE_CHAR:
+                text = create_string_buffer(('value %d' % i).encode('ascii'))
+                keep.append(text)
+                value.value.u.ptrVal = addressof(text)
+            elif data_type == arh.AR_DATA_TYPE_TIME:
+                value.value.u.timeVal = 1400000000 + i
+            elif data_type == arh.AR_DATA_TYPE_ENUM:
+                value.value.u.enumVal = i % len(ENUMS)
+            elif data_type == arh.AR_DATA_TYPE_INTEGER:
+                value.value.u.intVal = i
+            else:
+                value.value.u.realVal = i / 4.0
+
+        field_value_list = arh.ARFieldValueList()
+        field_value_list.numItems = len(FIELDS)
+        field_value_list.fieldValueList = cast(
+            values, POINTER(arh.ARFieldValueStruct)
+        )
+        entry.entryValues = pointer(field_value_list)
+        keep.extend([entry_ids, values, field_value_list])
+
+    return entry_list, keep
+
+
+def decode_if_chain(caches, entry_list):
+    """Decodes entries using the if/elif chain PyRemedy previously used."""
+
+    entries = []
+    for i in range(entry_list.numItems):
+        entry_id = entry_list.entryList[i].entryId.entryIdList[0].value
+        field_value_list = entry_list.entryList[i].entryValues.contents
+        entry_values = {}
+        for j in range(field_value_list.numItems):
+            field_id = field_value_list.fieldValueList[j].fieldId
+            field_name = caches.field_id_to_name_cache[SCHEMA][field_id]
+            value_struct = field_value_list.fieldValueList[j].value
+
+            # _extract_field looked up the field name again for its errors
+            data_type = value_struct.dataType
+            field_name = caches.field_id_to_name_cache[SCHEMA][field_id]
+            if data_type == arh.AR_DATA_TYPE_NULL:
+                value = None
+            elif data_type == arh.AR_DATA_TYPE_INTEGER:
+                value = value_struct.u.intVal
+            elif data_type == arh.AR_DATA_TYPE_REAL:
+                value = value_struct.u.realVal
+            elif data_type == arh.AR_DATA_TYPE_CHAR:
+                value = value_struct.u.charVal
+            elif data_type == arh.AR_DATA_TYPE_ENUM:
+                value = caches.enum_id_to_name_cache[SCHEMA][field_id][
+                    value_struct.u.enumVal
+                ]
+            elif data_type == arh.AR_DATA_TYPE_TIME:
+                value = datetime.fromtimestamp(value_struct.u.timeVal)
+            entry_values[field_name] = value
+        entries.append((entry_id, entry_values))
+    return entries
+
+
+def decode_plan(caches, entry_list):
+    """Decodes entries using a decoding plan as per ARS.query."""
+
+    plan = build_plan(caches, SCHEMA, [f[0] for f in FIELDS])
+    entries = []
+    for i in range(entry_list.numItems):
+        entry = entry_list.entryList[i]
+        entry_id = entry.entryId.entryIdList[0].value
+        field_value_list = entry.entryValues.contents
+        entry_values = {}
+        for j in range(field_value_list.numItems):
+            field_value = field_value_list.fieldValueList[j]
+            field_name, index, convert = plan[field_value.fieldId]
+            entry_values[field_name] = convert(field_value.value)
+        entries.append((entry_id, entry_values))
+    return entries
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    cells = rows * len(FIELDS)
+
+    caches = FieldCaches()
+    entry_list, keep = build_entry_list(rows)
+
+    if decode_if_chain(caches, entry_list) != decode_plan(caches, entry_list):
+        raise SystemExit('The decoders produced different results')
+
+    for name, decode in [
+        ('if/elif chain', decode_if_chain), ('decoding plan', decode_plan)
+    ]:
+        seconds = min(timeit.repeat(
+            lambda: decode(caches, entry_list), number=1, repeat=5
+        ))
+        print('{:<14} {:>12,.0f} cells/s'.format(name, cells / seconds))
+
+
+if __name__ == '__main__':
+    main()
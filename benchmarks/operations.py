@@ -0,0 +1,237 @@
+"""
+Measures the latency, throughput and memory allocations of the main ARS
+operations against the in-process Remedy ARS simulator, so performance
+work can be checked without a Remedy ARS server or the Remedy ARS C API:
+
+    python benchmarks/operations.py [sizes] [--latency seconds]
+
+Sizes is a comma separated list of result sizes used for queries (by
+default 1,100,1000,10000).  The latency is added to every simulated call
+to approximate the network round trip to a server (0 by default, which
+measures the overhead of PyRemedy alone).
+
+For each operation the following are reported:
+
+* ops/s, p50 and p95: calls per second and the median and 95th percentile
+  latency of a single call in milliseconds
+* rows/s and cells/s: entries and field values processed per second
+* alloc KB: the peak Python memory allocated by a single call (requires
+  tracemalloc, which is available from Python 3.4)
+* leaked: the number of structs returned by the simulator which were still
+  not freed once the session was terminated (each indicates a missing
+  FreeAR call)
+"""
+import os
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# Import PyRemedy and the simulator from the source tree containing the
+# benchmark
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+)
+
+from pyremedy import ARS, arh
+from benchmarks.simulator import Simulator
+
+
+SCHEMA = b'HPD:Help Desk'
+
+FIELDS = [
+    (1, b'Request ID', arh.AR_DATA_TYPE_CHAR),
+    (2, b'Submitter', arh.AR_DATA_TYPE_CHAR),
+    (3, b'Create Date', arh.AR_DATA_TYPE_TIME),
+    (4, b'Assigned To', arh.AR_DATA_TYPE_CHAR),
+    (5, b'Last Modified By', arh.AR_DATA_TYPE_CHAR),
+    (6, b'Modified Date', arh.AR_DATA_TYPE_TIME),
+    (
+        7, b'Status', arh.AR_DATA_TYPE_ENUM,
+        [(0, b'New'), (1, b'Assigned'), (2, b'In Progress'), (3, b'Closed')]
+    ),
+    (8, b'Short Description', arh.AR_DATA_TYPE_CHAR),
+    (9, b'Priority', arh.AR_DATA_TYPE_INTEGER),
+    (10, b'Effort', arh.AR_DATA_TYPE_REAL),
+    (
+        11, b'Impact', arh.AR_DATA_TYPE_ENUM,
+        [(1000, b'Low'), (2000, b'Medium'), (3000, b'High')]
+    ),
+    (12, b'Notes', arh.AR_DATA_TYPE_CHAR)
+]
+
+FIELD_NAMES = [field[1] for field in FIELDS]
+
+DEFAULT_SIZES = [1, 100, 1000, 10000]
+
+
+def forget_fields(ars, schema):
+    """
+    Removes the cached field details of a schema so that update_fields
+    retrieves them again.
+
+    :param ARS ars: the session
+    :param str schema: the schema name
+    """
+
+    for cache in [
+        ars.field_timestamp_cache, ars.field_id_to_name_cache,
+        ars.field_name_to_id_cache, ars.field_id_to_type_cache,
+        ars.enum_id_to_name_cache, ars.enum_name_to_id_cache
+    ]:
+        cache.pop(schema, None)
+
+
+def build_operations(ars, entry_ids, sizes):
+    """
+    Builds the operations to measure.
+
+    :param ARS ars: the session to run the operations with
+    :param list entry_ids: the entry ids of the generated entries
+    :param list sizes: the result sizes used for queries
+    :return: a list of tuples containing the name of each operation, the
+             number of rows and cells it processes and a function running
+             it once
+    """
+
+    operations = []
+
+    for size in sizes:
+        operations.append((
+            'query', size, size * len(FIELDS),
+            lambda size=size: ars.query(
+                SCHEMA, b'1=1', FIELD_NAMES, limit=size
+            )
+        ))
+
+    operations.append((
+        'get', 1, len(FIELDS),
+        lambda: ars.get(SCHEMA, entry_ids[0], FIELD_NAMES)
+    ))
+
+    values = {
+        b'Submitter': b'benchmark', b'Status': b'New',
+        b'Short Description': b'A benchmark entry', b'Priority': 1,
+        b'Effort': 1.5, b'Impact': b'Low'
+    }
+    operations.append((
+        'create', 1, len(values), lambda: ars.create(SCHEMA, values)
+    ))
+
+    changes = {b'Status': b'Closed', b'Priority': 2}
+    operations.append((
+        'update', 1, len(changes),
+        lambda: ars.update(SCHEMA, entry_ids[1], changes)
+    ))
+
+    def update_fields():
+        forget_fields(ars, SCHEMA)
+        ars.update_fields(SCHEMA)
+
+    operations.append(('update_fields', len(FIELDS), 0, update_fields))
+
+    return operations
+
+
+def measure(function, minimum_seconds=0.5, minimum_calls=5):
+    """
+    Times individual calls of a function.
+
+    :param function: the function to time
+    :param float minimum_seconds: the minimum total time to spend calling
+                                  the function
+    :param int minimum_calls: the minimum number of calls to make
+    :return: a sorted list of the duration of each call in seconds
+    """
+
+    timer = timeit.default_timer
+    durations = []
+    started = timer()
+
+    while (
+        len(durations) < minimum_calls or timer() - started < minimum_seconds
+    ):
+        call_started = timer()
+        function()
+        durations.append(timer() - call_started)
+
+    return sorted(durations)
+
+
+def peak_allocation(function):
+    """
+    Determines the peak Python memory allocated by a single call of a
+    function.
+
+    :param function: the function to call
+    :return: the peak allocation in KB or None if tracemalloc isn't
+             available
+    """
+
+    if tracemalloc is None:
+        return None
+
+    tracemalloc.start()
+    try:
+        function()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak / 1024.0
+
+
+def main():
+    arguments = sys.argv[1:]
+    latency = 0.0
+    if '--latency' in arguments:
+        index = arguments.index('--latency')
+        latency = float(arguments[index + 1])
+        del arguments[index:index + 2]
+
+    if arguments:
+        sizes = [int(size) for size in arguments[0].split(',')]
+    else:
+        sizes = DEFAULT_SIZES
+
+    simulator = Simulator(latency=latency)
+    simulator.add_schema(SCHEMA, FIELDS)
+    entry_ids = simulator.generate(SCHEMA, max(sizes))
+
+    ars = ARS(b'simulator', b'benchmark', b'password', arlib=simulator)
+    ars.update_fields(SCHEMA)
+
+    print('{:<14} {:>6} {:>9} {:>9} {:>9} {:>11} {:>12} {:>9}'.format(
+        'operation', 'rows', 'ops/s', 'p50 ms', 'p95 ms', 'rows/s',
+        'cells/s', 'alloc KB'
+    ))
+
+    for name, rows, cells, function in build_operations(
+        ars, entry_ids, sizes
+    ):
+        # Warm up any caches before measuring
+        function()
+
+        durations = measure(function)
+        seconds = sum(durations) / len(durations)
+        allocated = peak_allocation(function)
+
+        print(
+            '{:<14} {:>6} {:>9,.0f} {:>9.3f} {:>9.3f} {:>11,.0f} {:>12,.0f} '
+            '{:>9}'.format(
+                name, rows, 1 / seconds, durations[len(durations) // 2] * 1000,
+                durations[int(len(durations) * 0.95)] * 1000, rows / seconds,
+                cells / seconds,
+                '-' if allocated is None else '{:.1f}'.format(allocated)
+            )
+        )
+
+    ars.terminate()
+    print('leaked {} structs'.format(simulator.allocations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1236 @@
+from collections import OrderedDict
+from ctypes import (
+    CDLL, addressof, cast, create_string_buffer, c_void_p, POINTER
+)
+import random
+import re
+import threading
+import time
+
+from pyremedy import arh
+
+
+# The number of seconds after the epoch used for generated time values
+SYNTHETIC_EPOCH = 1400000000
+
+# Generated character values are chosen from these words
+SYNTHETIC_WORDS = [
+    b'network', b'printer', b'outage', b'password', b'reset', b'server',
+    b'access', b'request', b'laptop', b'email', b'install', b'failure'
+]
+
+# ARERR 302: Entry does not exist in database
+AR_ERROR_NO_SUCH_ENTRY = 302
+
+# ARERR 303: Form does not exist on server
+AR_ERROR_NO_SUCH_SCHEMA = 303
+
+# ARERR 314: Field does not exist on current form
+AR_ERROR_NO_SUCH_FIELD = 314
+
+
+class SimulatedSchema(object):
+    """
+    A schema held by a Simulator.
+
+    :param str name: the schema name
+    :param list fields: tuples containing the field id, field name, data
+                        type and (for enum fields) a list of enum id and
+                        enum name tuples
+    """
+
+    def __init__(self, name, fields):
+        #: The schema name
+        self.name = name
+
+        #: The field name, data type and enum mappings of each field id
+        self.fields = OrderedDict()
+
+        #: The field values of each entry (by field id) keyed by entry id
+        self.entries = OrderedDict()
+
+        #: The epoch timestamp at which the schema was last changed
+        self.timestamp = int(time.time())
+
+        #: The number of entries created so far (used to number entry ids)
+        self.next_id = 1
+
+        for field in fields:
+            field_id, field_name, data_type = field[:3]
+            enums = field[3] if len(field) > 3 else None
+            if data_type == arh.AR_DATA_TYPE_ENUM and enums is None:
+                raise ValueError(
+                    'The enum field {} requires enum mappings'.format(
+                        field_name
+                    )
+                )
+            self.fields[field_id] = (field_name, data_type, enums)
+
+        if arh.AR_CORE_ENTRY_ID not in self.fields:
+            self.fields[arh.AR_CORE_ENTRY_ID] = (
+                b'Request ID', arh.AR_DATA_TYPE_CHAR, None
+            )
+
+    def new_entry_id(self):
+        """
+        Allocates the entry id of a new entry.
+
+        :return: the entry id
+        """
+
+        entry_id = str(self.next_id).zfill(15).encode('ascii')
+        self.next_id += 1
+        return entry_id
+
+
+class _Function(object):
+    """
+    A simulated C function.  Like the functions of a CDLL, the argument
+    and return types may be assigned (although they are ignored).
+    """
+
+    def __init__(self, function):
+        self.function = function
+        self.argtypes = None
+        self.restype = None
+
+    def __call__(self, *args):
+        return self.function(*args)
+
+
+class Simulator(object):
+    """
+    An in-process stand-in for the Remedy ARS C API which may be passed to
+    an ARS session in place of libar_lx64.so::
+
+        simulator = Simulator(latency=0.002)
+        simulator.add_schema(b'HPD:Help Desk', [
+            (1, b'Request ID', arh.AR_DATA_TYPE_CHAR),
+            (7, b'Status', arh.AR_DATA_TYPE_ENUM, [(0, b'New'), (1, b'Done')]),
+            (8, b'Short Description', arh.AR_DATA_TYPE_CHAR)
+        ])
+        simulator.generate(b'HPD:Help Desk', 10000)
+
+        ars = ARS(b'simulator', b'user', b'password', arlib=simulator)
+
+    Each function fills the same arh structs as the C API from the
+    synthetic schemas and entries held in memory, so everything except the
+    network round trip and the server itself is exercised.  Qualifiers
+    built using F objects are evaluated against the entries, while
+    qualification strings aren't parsed and match every entry.
+
+    The simulator is a test double used by the benchmarks and tests rather
+    than part of PyRemedy itself.
+
+    Structs returned by the simulator are owned by Python and are released
+    when the related FreeAR function is called.  Structs which were
+    allocated by the caller using malloc are freed using the C library.
+
+    :param float latency: the number of seconds each call (other than the
+                          FreeAR functions) takes in addition to its
+                          processing time
+    :param int seed: the seed used to generate synthetic values
+    """
+
+    def __init__(self, latency=0.0, seed=0):
+        #: The number of seconds added to each call
+        self.latency = latency
+
+        #: The schemas held by the simulator keyed by schema name
+        self.schemas = OrderedDict()
+
+        #: The session configuration variables and their values
+        self.session_configuration = {
+            arh.AR_SESS_CHUNK_RESPONSE_SIZE: 100,
+            arh.AR_SESS_TIMEOUT_NORMAL: 120,
+            arh.AR_SESS_TIMEOUT_LONG: 300,
+            arh.AR_SESS_TIMEOUT_XLONG: 3600
+        }
+
+        #: The maximum number of entries returned by each query regardless
+        #: of the number requested, as per the Max-Entries-Returned-By-
+        #: GetList server setting (None returns all entries requested)
+        self.max_entries = None
+
+        # The Python objects referenced by each struct returned and not yet
+        # freed, keyed by the address of the struct
+        self._allocations = {}
+
+        # The calls queued by each control record in a bulk transaction
+        self._bulk_calls = {}
+
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+
+        self._libc = CDLL('libc.so.6')
+        self._libc.free.argtypes = [c_void_p]
+        self._libc.free.restype = None
+
+        # Expose each simulated function under its C name
+        for name in dir(self):
+            if name.startswith('_AR') or name.startswith('_FreeAR'):
+                setattr(
+                    self, name[1:],
+                    _Function(self._simulate(name[1:], getattr(self, name)))
+                )
+
+    @property
+    def allocations(self):
+        """The number of returned structs which have not yet been freed."""
+
+        return len(self._allocations)
+
+    def add_schema(self, schema, fields):
+        """
+        Adds an empty schema.  A Request ID field (field id 1) is added if
+        not provided.
+
+        :param str schema: the schema name
+        :param list fields: tuples containing the field id, field name,
+                            data type (one of the AR_DATA_TYPE constants)
+                            and (for enum fields) a list of enum id and enum
+                            name tuples
+        :return: the SimulatedSchema
+        """
+
+        with self._lock:
+            self.schemas[schema] = SimulatedSchema(schema, fields)
+            return self.schemas[schema]
+
+    def add_entries(self, schema, entries):
+        """
+        Adds entries to a schema.
+
+        :param str schema: the schema name
+        :param list entries: dicts containing the value of each field id
+                             (strings for character fields, epoch timestamps
+                             for time fields and enum ids for enum fields)
+        :return: a list of the entry ids added
+        """
+
+        with self._lock:
+            simulated_schema = self.schemas[schema]
+            entry_ids = []
+
+            for entry in entries:
+                entry_id = simulated_schema.new_entry_id()
+                values = dict(entry)
+                values[arh.AR_CORE_ENTRY_ID] = entry_id
+                simulated_schema.entries[entry_id] = values
+                entry_ids.append(entry_id)
+
+            return entry_ids
+
+    def generate(self, schema, count):
+        """
+        Adds entries containing synthetic values for every field.
+
+        :param str schema: the schema name
+        :param int count: the number of entries to add
+        :return: a list of the entry ids added
+        """
+
+        simulated_schema = self.schemas[schema]
+        entries = []
+
+        for i in range(count):
+            entry = {}
+            for field_id, (field_name, data_type, enums) in (
+                simulated_schema.fields.items()
+            ):
+                if field_id != arh.AR_CORE_ENTRY_ID:
+                    entry[field_id] = self._synthetic_value(data_type, enums)
+            entries.append(entry)
+
+        return self.add_entries(schema, entries)
+
+    def _synthetic_value(self, data_type, enums):
+        """
+        Generates a value for a field.
+
+        :param int data_type: the data type of the field
+        :param list enums: the enum mappings of the field
+        :return: the value
+        """
+
+        if data_type == arh.AR_DATA_TYPE_INTEGER:
+            return self._random.randint(0, 100000)
+        elif data_type == arh.AR_DATA_TYPE_REAL:
+            return self._random.random() * 1000
+        elif data_type == arh.AR_DATA_TYPE_ENUM:
+            return self._random.choice(enums)[0]
+        elif data_type == arh.AR_DATA_TYPE_TIME:
+            return SYNTHETIC_EPOCH + self._random.randint(0, 86400 * 365)
+        else:
+            return b' '.join(
+                self._random.choice(SYNTHETIC_WORDS)
+                for i in range(self._random.randint(1, 8))
+            )
+
+    def _simulate(self, name, function):
+        """
+        Wraps a simulated function with the simulated latency and the lock
+        protecting the simulator state.
+
+        :param str name: the name of the C function
+        :param function: the function implementing it
+        :return: the wrapped function
+        """
+
+        def call(*args):
+            if self.latency and not name.startswith('Free'):
+                time.sleep(self.latency)
+            with self._lock:
+                return function(*args)
+
+        return call
+
+    # Helpers used to read arguments and fill returned structs
+
+    def _struct(self, argument):
+        """
+        Obtains the struct referenced by an argument passed using byref or
+        pointer.
+
+        :param argument: the argument
+        :return: the struct (or None for a NULL argument)
+        """
+
+        if argument is None:
+            return None
+        if hasattr(argument, '_obj'):
+            return argument._obj
+        if hasattr(argument, 'contents'):
+            return argument.contents if argument else None
+        return argument
+
+    def _array(self, item_type, count, keep):
+        """
+        Allocates an array of items.
+
+        :param item_type: the ctypes type of each item
+        :param int count: the number of items
+        :param list keep: the objects which must live as long as the struct
+                          being filled
+        :return: a pointer to the first item
+        """
+
+        array = (item_type * max(count, 1))()
+        keep.append(array)
+        return cast(array, POINTER(item_type))
+
+    def _allocate(self, struct, keep):
+        """
+        Records the objects referenced by a returned struct until the struct
+        is freed.
+
+        :param struct: the struct which was filled
+        :param list keep: the objects referenced by the struct
+        """
+
+        self._allocations[addressof(struct)] = keep
+
+    def _ok(self, status):
+        """
+        Fills a status list containing no messages.
+
+        :param status: the status list argument
+        :return: AR_RETURN_OK
+        """
+
+        status = self._struct(status)
+        if status is not None:
+            status.numItems = 0
+            status.statusList = None
+        return arh.AR_RETURN_OK
+
+    def _error(self, status, message_number, message_text, appended_text=None):
+        """
+        Fills a status list containing a single error.
+
+        :param status: the status list argument
+        :param int message_number: the error number
+        :param str message_text: the error message
+        :param str appended_text: additional details of the error
+        :return: AR_RETURN_ERROR
+        """
+
+        status = self._struct(status)
+        keep = []
+        status.numItems = 1
+        status.statusList = self._array(arh.ARStatusStruct, 1, keep)
+        status.statusList[0].messageType = arh.AR_RETURN_ERROR
+        status.statusList[0].messageNum = message_number
+        status.statusList[0].messageText = message_text
+        status.statusList[0].appendedText = appended_text
+        self._allocate(status, keep)
+        return arh.AR_RETURN_ERROR
+
+    def _schema(self, schema_artype):
+        """
+        Looks up the schema named by an ARNameType.
+
+        :param ARNameType schema_artype: the schema name
+        :return: the SimulatedSchema or None if it doesn't exist
+        """
+
+        return self.schemas.get(schema_artype.value)
+
+    def _get_value(self, value_struct):
+        """
+        Reads the Python value of an ARValueStruct.
+
+        :param ARValueStruct value_struct: the value to read
+        :return: the value
+        """
+
+        data_type = value_struct.dataType
+        if data_type == arh.AR_DATA_TYPE_INTEGER:
+            return value_struct.u.intVal
+        elif data_type == arh.AR_DATA_TYPE_REAL:
+            return value_struct.u.realVal
+        elif data_type == arh.AR_DATA_TYPE_CHAR:
+            return value_struct.u.charVal
+        elif data_type == arh.AR_DATA_TYPE_ENUM:
+            return value_struct.u.enumVal
+        elif data_type == arh.AR_DATA_TYPE_TIME:
+            return value_struct.u.timeVal
+        return None
+
+    def _set_value(self, value_struct, data_type, value, keep):
+        """
+        Fills an ARValueStruct with a Python value.
+
+        :param ARValueStruct value_struct: the struct to fill
+        :param int data_type: the data type of the value
+        :param value: the value
+        :param list keep: the objects which must live as long as the struct
+        """
+
+        if value is None:
+            value_struct.dataType = arh.AR_DATA_TYPE_NULL
+            return
+
+        value_struct.dataType = data_type
+        if data_type == arh.AR_DATA_TYPE_INTEGER:
+            value_struct.u.intVal = value
+        elif data_type == arh.AR_DATA_TYPE_REAL:
+            value_struct.u.realVal = value
+        elif data_type == arh.AR_DATA_TYPE_ENUM:
+            value_struct.u.enumVal = value
+        elif data_type == arh.AR_DATA_TYPE_TIME:
+            value_struct.u.timeVal = value
+        else:
+            # Strings are copied into buffers as the C API returns memory
+            # owned by the caller
+            buffer = create_string_buffer(value)
+            keep.append(buffer)
+            value_struct.u.ptrVal = addressof(buffer)
+
+    def _fill_field_values(
+        self, field_value_list, simulated_schema, values, field_ids, keep
+    ):
+        """
+        Fills an ARFieldValueList with the values of an entry.
+
+        :param ARFieldValueList field_value_list: the list to fill
+        :param SimulatedSchema simulated_schema: the schema of the entry
+        :param dict values: the values of the entry by field id
+        :param list field_ids: the field ids to include
+        :param list keep: the objects which must live as long as the list
+        """
+
+        field_value_list.numItems = len(field_ids)
+        field_value_list.fieldValueList = self._array(
+            arh.ARFieldValueStruct, len(field_ids), keep
+        )
+
+        for i, field_id in enumerate(field_ids):
+            field_value = field_value_list.fieldValueList[i]
+            field_value.fieldId = field_id
+            self._set_value(
+                field_value.value, simulated_schema.fields[field_id][1],
+                values.get(field_id), keep
+            )
+
+    def _read_field_values(self, field_value_list):
+        """
+        Reads the values of an ARFieldValueList.
+
+        :param ARFieldValueList field_value_list: the list to read
+        :return: a dict of field ids to values
+        """
+
+        values = {}
+        for i in range(field_value_list.numItems):
+            field_value = field_value_list.fieldValueList[i]
+            values[field_value.fieldId] = self._get_value(field_value.value)
+        return values
+
+    def _internal_ids(self, internal_id_list, simulated_schema):
+        """
+        Reads the field ids of an ARInternalIdList, defaulting to all fields
+        of the schema if the list is NULL or empty.
+
+        :param internal_id_list: the ARInternalIdList argument
+        :param SimulatedSchema simulated_schema: the schema of the fields
+        :return: a list of field ids
+        """
+
+        internal_id_list = self._struct(internal_id_list)
+        if internal_id_list is None or internal_id_list.numItems == 0:
+            return list(simulated_schema.fields)
+        return [
+            internal_id_list.internalIdList[i]
+            for i in range(internal_id_list.numItems)
+        ]
+
+    def _matches(self, qualifier, values):
+        """
+        Evaluates an ARQualifierStruct against the values of an entry.
+
+        :param ARQualifierStruct qualifier: the qualifier to evaluate
+        :param dict values: the values of the entry by field id
+        :return: whether the entry matches the qualifier
+        """
+
+        operation = qualifier.operation
+        if operation == arh.AR_COND_OP_AND:
+            return (
+                self._matches(qualifier.u.andor.operandLeft.contents, values)
+                and self._matches(
+                    qualifier.u.andor.operandRight.contents, values
+                )
+            )
+        elif operation == arh.AR_COND_OP_OR:
+            return (
+                self._matches(qualifier.u.andor.operandLeft.contents, values)
+                or self._matches(
+                    qualifier.u.andor.operandRight.contents, values
+                )
+            )
+        elif operation == arh.AR_COND_OP_NOT:
+            return not self._matches(qualifier.u.notQual.contents, values)
+        elif operation == arh.AR_COND_OP_REL_OP:
+            return self._compare(qualifier.u.relOp.contents, values)
+        return True
+
+    def _operand(self, operand, values):
+        """
+        Reads the value of an operand of a relational operation.
+
+        :param ARFieldValueOrArithStruct operand: the operand
+        :param dict values: the values of the entry by field id
+        :return: the value (a list for value sets)
+        """
+
+        if operand.tag == arh.AR_FIELD:
+            return values.get(operand.u.fieldId)
+        elif operand.tag == arh.AR_VALUE_SET:
+            value_set = operand.u.valueSet
+            return [
+                self._get_value(value_set.valueList[i])
+                for i in range(value_set.numItems)
+            ]
+        return self._get_value(operand.u.value)
+
+    def _compare(self, rel_op, values):
+        """
+        Evaluates an ARRelOpStruct against the values of an entry.
+
+        :param ARRelOpStruct rel_op: the relational operation
+        :param dict values: the values of the entry by field id
+        :return: whether the entry matches the operation
+        """
+
+        left = self._operand(rel_op.operandLeft, values)
+        right = self._operand(rel_op.operandRight, values)
+        operation = rel_op.operation
+
+        if operation == arh.AR_REL_OP_EQUAL:
+            return left == right
+        elif operation == arh.AR_REL_OP_NOT_EQUAL:
+            return left != right
+        elif operation == arh.AR_REL_OP_IN:
+            return left in right
+        elif operation == arh.AR_REL_OP_NOT_IN:
+            return left not in right
+
+        # NULL values never match any other operation
+        if left is None or right is None:
+            return False
+
+        if operation == arh.AR_REL_OP_GREATER:
+            return left > right
+        elif operation == arh.AR_REL_OP_GREATER_EQUAL:
+            return left >= right
+        elif operation == arh.AR_REL_OP_LESS:
+            return left < right
+        elif operation == arh.AR_REL_OP_LESS_EQUAL:
+            return left <= right
+        elif operation == arh.AR_REL_OP_LIKE:
+            pattern = b''.join(
+                b'.*' if part == b'%' else b'.' if part == b'_'
+                else re.escape(part)
+                for part in re.split(b'([%_])', right) if part
+            )
+            return re.match(pattern + b'$', left, re.DOTALL) is not None
+        return False
+
+    def _free(self, struct, *pointers):
+        """
+        Frees a struct passed to a FreeAR function.  Structs returned by the
+        simulator are released, while the pointer members of structs
+        allocated by the caller are freed using the C library.
+
+        :param struct: the struct argument
+        :param pointers: the names of the pointer members of the struct
+        """
+
+        struct = self._struct(struct)
+        if self._allocations.pop(addressof(struct), None) is not None:
+            # Clear the pointers so that the memory can't be freed twice
+            for pointer_name in pointers:
+                setattr(struct, pointer_name, None)
+            return
+
+        for pointer_name in pointers:
+            pointer = getattr(struct, pointer_name)
+            if pointer:
+                self._libc.free(cast(pointer, c_void_p))
+
+    # Sessions
+
+    def _ARInitialization(self, control, status):
+        return self._ok(status)
+
+    def _ARTermination(self, control, status):
+        self._bulk_calls.pop(addressof(self._struct(control)), None)
+        return self._ok(status)
+
+    def _ARSetServerPort(self, control, server, port, rpc_program, status):
+        return self._ok(status)
+
+    def _ARGetSessionConfiguration(self, control, variable_id, value, status):
+        if variable_id not in self.session_configuration:
+            return self._error(
+                status, 9999, b'Unknown session configuration variable'
+            )
+        value = self._struct(value)
+        value.dataType = arh.AR_DATA_TYPE_INTEGER
+        value.u.intVal = self.session_configuration[variable_id]
+        return self._ok(status)
+
+    def _ARSetSessionConfiguration(self, control, variable_id, value, status):
+        if variable_id not in self.session_configuration:
+            return self._error(
+                status, 9999, b'Unknown session configuration variable'
+            )
+        self.session_configuration[variable_id] = (
+            self._struct(value).u.intVal
+        )
+        return self._ok(status)
+
+    # Schemas and fields
+
+    def _ARGetListSchema(
+        self, control, changed_since, schema_type, name, field_ids, props,
+        schema_list, status
+    ):
+        names = [
+            simulated_schema.name
+            for simulated_schema in self.schemas.values()
+            if simulated_schema.timestamp >= changed_since
+        ]
+
+        schema_list = self._struct(schema_list)
+        keep = []
+        schema_list.numItems = len(names)
+        schema_list.nameList = self._array(arh.ARNameType, len(names), keep)
+        for i, schema_name in enumerate(names):
+            schema_list.nameList[i].value = schema_name
+        self._allocate(schema_list, keep)
+        return self._ok(status)
+
+    def _ARGetListField(
+        self, control, schema, field_type, changed_since, props,
+        field_id_list, status
+    ):
+        simulated_schema = self._schema(schema)
+        if simulated_schema is None:
+            return self._error(
+                status, AR_ERROR_NO_SUCH_SCHEMA,
+                b'Form does not exist on server', schema.value
+            )
+
+        # Fields only change when the schema is replaced
+        if simulated_schema.timestamp >= changed_since:
+            field_ids = list(simulated_schema.fields)
+        else:
+            field_ids = []
+
+        field_id_list = self._struct(field_id_list)
+        keep = []
+        field_id_list.numItems = len(field_ids)
+        field_id_list.internalIdList = self._array(
+            arh.ARInternalId, len(field_ids), keep
+        )
+        for i, field_id in enumerate(field_ids):
+            field_id_list.internalIdList[i] = field_id
+        self._allocate(field_id_list, keep)
+        return self._ok(status)
+
+    def _ARGetMultipleFields(self, control, schema, field_ids, *args):
+        # Only the field details retrieved by ARS are simulated
+        exist_list = args[0]
+        field_names = args[2]
+        field_limits = args[11]
+        status = args[-1]
+
+        simulated_schema = self._schema(schema)
+        if simulated_schema is None:
+            return self._error(
+                status, AR_ERROR_NO_SUCH_SCHEMA,
+                b'Form does not exist on server', schema.value
+            )
+
+        field_ids = self._internal_ids(field_ids, simulated_schema)
+        count = len(field_ids)
+
+        exist_list = self._struct(exist_list)
+        if exist_list is not None:
+            keep = []
+            exist_list.numItems = count
+            exist_list.booleanList = self._array(arh.ARBoolean, count, keep)
+            for i, field_id in enumerate(field_ids):
+                exist_list.booleanList[i] = (
+                    field_id in simulated_schema.fields
+                )
+            self._allocate(exist_list, keep)
+
+        field_names = self._struct(field_names)
+        if field_names is not None:
+            keep = []
+            field_names.numItems = count
+            field_names.nameList = self._array(arh.ARNameType, count, keep)
+            for i, field_id in enumerate(field_ids):
+                if field_id in simulated_schema.fields:
+                    field_names.nameList[i].value = (
+                        simulated_schema.fields[field_id][0]
+                    )
+            self._allocate(field_names, keep)
+
+        field_limits = self._struct(field_limits)
+        if field_limits is not None:
+            keep = []
+            field_limits.numItems = count
+            field_limits.fieldLimitList = self._array(
+                arh.ARFieldLimitStruct, count, keep
+            )
+            for i, field_id in enumerate(field_ids):
+                if field_id in simulated_schema.fields:
+                    field_name, data_type, enums = (
+                        simulated_schema.fields[field_id]
+                    )
+                    field_limit = field_limits.fieldLimitList[i]
+                    field_limit.dataType = data_type
+                    if data_type == arh.AR_DATA_TYPE_ENUM:
+                        self._fill_enum_limits(
+                            field_limit.u.enumLimits, enums, keep
+                        )
+            self._allocate(field_limits, keep)
+
+        return self._ok(status)
+
+    def _fill_enum_limits(self, enum_limits, enums, keep):
+        """
+        Fills an AREnumLimitsStruct, using a regular list when the enum ids
+        are numbered from 0 and a custom list otherwise.
+
+        :param AREnumLimitsStruct enum_limits: the struct to fill
+        :param list enums: enum id and enum name tuples
+        :param list keep: the objects which must live as long as the struct
+        """
+
+        if [enum_id for enum_id, enum_name in enums] == list(
+            range(len(enums))
+        ):
+            enum_limits.listStyle = arh.AR_ENUM_STYLE_REGULAR
+            regular_list = enum_limits.u.regularList
+            regular_list.numItems = len(enums)
+            regular_list.nameList = self._array(
+                arh.ARNameType, len(enums), keep
+            )
+            for i, (enum_id, enum_name) in enumerate(enums):
+                regular_list.nameList[i].value = enum_name
+        else:
+            enum_limits.listStyle = arh.AR_ENUM_STYLE_CUSTOM
+            custom_list = enum_limits.u.customList
+            custom_list.numItems = len(enums)
+            custom_list.enumItemList = self._array(
+                arh.AREnumItemStruct, len(enums), keep
+            )
+            for i, (enum_id, enum_name) in enumerate(enums):
+                custom_list.enumItemList[i].itemName = enum_name
+                custom_list.enumItemList[i].itemNumber = enum_id
+
+    # Queries
+
+    def _ARLoadARQualifierStruct(
+        self, control, schema, display_tag, qualification, qualifier, status
+    ):
+        if self._schema(schema) is None:
+            return self._error(
+                status, AR_ERROR_NO_SUCH_SCHEMA,
+                b'Form does not exist on server', schema.value
+            )
+
+        # Qualification strings aren't parsed, so they match every entry
+        qualifier = self._struct(qualifier)
+        qualifier.operation = arh.AR_COND_OP_NONE
+        self._allocate(qualifier, [])
+        return self._ok(status)
+
+    def _ARGetListEntryWithFields(
+        self, control, schema, qualifier, field_list, sort_list, first,
+        max_retrieve, use_locale, entry_list, num_matches, status
+    ):
+        simulated_schema = self._schema(schema)
+        if simulated_schema is None:
+            return self._error(
+                status, AR_ERROR_NO_SUCH_SCHEMA,
+                b'Form does not exist on server', schema.value
+            )
+
+        qualifier = self._struct(qualifier)
+        entries = [
+            values for values in simulated_schema.entries.values()
+            if qualifier is None or self._matches(qualifier, values)
+        ]
+
+        # Entries are returned in entry id order unless sorted otherwise
+        sort_list = self._struct(sort_list)
+        if sort_list is not None:
+            for i in reversed(range(sort_list.numItems)):
+                sort = sort_list.sortList[i]
+                entries.sort(
+                    key=lambda values, field_id=sort.fieldId: (
+                        values.get(field_id) is None, values.get(field_id)
+                    ),
+                    reverse=sort.sortOrder == arh.AR_SORT_DESCENDING
+                )
+
+        num_matches = self._struct(num_matches)
+        if num_matches is not None:
+            num_matches.value = len(entries)
+
+        entries = entries[first:]
+        if max_retrieve != arh.AR_NO_MAX_LIST_RETRIEVE:
+            entries = entries[:max_retrieve]
+        if self.max_entries is not None:
+            entries = entries[:self.max_entries]
+
+        field_list = self._struct(field_list)
+        field_ids = [
+            field_list.fieldsList[i].fieldId
+            for i in range(field_list.numItems)
+        ]
+        for field_id in field_ids:
+            if field_id not in simulated_schema.fields:
+                return self._error(
+                    status, AR_ERROR_NO_SUCH_FIELD,
+                    b'Field does not exist on current form',
+                    str(field_id).encode('ascii')
+                )
+
+        entry_list = self._struct(entry_list)
+        keep = []
+        entry_list.numItems = len(entries)
+        entry_list.entryList = self._array(
+            arh.AREntryListFieldValueStruct, len(entries), keep
+        )
+        field_value_lists = (arh.ARFieldValueList * max(len(entries), 1))()
+        keep.append(field_value_lists)
+
+        for i, values in enumerate(entries):
+            entry = entry_list.entryList[i]
+            entry.entryId.numItems = 1
+            entry.entryId.entryIdList = self._array(
+                arh.AREntryIdType, 1, keep
+            )
+            entry.entryId.entryIdList[0].value = values[arh.AR_CORE_ENTRY_ID]
+
+            self._fill_field_values(
+                field_value_lists[i], simulated_schema, values, field_ids,
+                keep
+            )
+            entry.entryValues = cast(
+                addressof(field_value_lists[i]), POINTER(arh.ARFieldValueList)
+            )
+
+        self._allocate(entry_list, keep)
+        return self._ok(status)
+
+    def _ARGetEntryStatistics(
+        self, control, schema, qualifier, target, statistic, group_by,
+        results, status
+    ):
+        simulated_schema = self._schema(schema)
+        if simulated_schema is None:
+            return self._error(
+                status, AR_ERROR_NO_SUCH_SCHEMA,
+                b'Form does not exist on server', schema.value
+            )
+
+        qualifier = self._struct(qualifier)
+        group_by = self._struct(group_by)
+        group_ids = [] if group_by is None else [
+            group_by.internalIdList[i] for i in range(group_by.numItems)
+        ]
+
+        groups = OrderedDict()
+        for values in simulated_schema.entries.values():
+            if qualifier is None or self._matches(qualifier, values):
+                key = tuple(values.get(field_id) for field_id in group_ids)
+                groups.setdefault(key, []).append(values)
+
+        target = self._struct(target)
+        target_id = target.u.fieldId if target is not None else None
+
+        results = self._struct(results)
+        keep = []
+        results.numItems = len(groups)
+        results.resultList = self._array(
+            arh.ARStatisticsResultStruct, len(groups), keep
+        )
+
+        for i, (key, entries) in enumerate(groups.items()):
+            result = results.resultList[i]
+            result.groupByValues.numItems = len(group_ids)
+            result.groupByValues.valueList = self._array(
+                arh.ARValueStruct, len(group_ids), keep
+            )
+            for j, field_id in enumerate(group_ids):
+                self._set_value(
+                    result.groupByValues.valueList[j],
+                    simulated_schema.fields[field_id][1], key[j], keep
+                )
+
+            if statistic == arh.AR_STAT_OP_COUNT:
+                self._set_value(
+                    result.result, arh.AR_DATA_TYPE_INTEGER, len(entries),
+                    keep
+                )
+                continue
+
+            numbers = [
+                values[target_id] for values in entries
+                if values.get(target_id) is not None
+            ]
+            if not numbers:
+                value = None
+            elif statistic == arh.AR_STAT_OP_SUM:
+                value = float(sum(numbers))
+            elif statistic == arh.AR_STAT_OP_AVERAGE:
+                value = float(sum(numbers)) / len(numbers)
+            elif statistic == arh.AR_STAT_OP_MINIMUM:
+                value = float(min(numbers))
+            else:
+                value = float(max(numbers))
+            self._set_value(result.result, arh.AR_DATA_TYPE_REAL, value, keep)
+
+        self._allocate(results, keep)
+        return self._ok(status)
+
+    # Entries
+
+    def _ARGetEntry(
+        self, control, schema, entry_id_list, field_ids, field_value_list,
+        status
+    ):
+        simulated_schema = self._schema(schema)
+        if simulated_schema is None:
+            return self._error(
+                status, AR_ERROR_NO_SUCH_SCHEMA,
+                b'Form does not exist on server', schema.value
+            )
+
+        entry_id = self._struct(entry_id_list).entryIdList[0].value
+        values = simulated_schema.entries.get(entry_id)
+        if values is None:
+            return self._error(
+                status, AR_ERROR_NO_SUCH_ENTRY,
+                b'Entry does not exist in database', entry_id
+            )
+
+        field_value_list = self._struct(field_value_list)
+        keep = []
+        self._fill_field_values(
+            field_value_list, simulated_schema, values,
+            self._internal_ids(field_ids, simulated_schema), keep
+        )
+        self._allocate(field_value_list, keep)
+        return self._ok(status)
+
+    def _ARGetMultipleEntries(
+        self, control, schema, entry_id_list_list, field_ids, exist_list,
+        field_value_list_list, status
+    ):
+        simulated_schema = self._schema(schema)
+        if simulated_schema is None:
+            return self._error(
+                status, AR_ERROR_NO_SUCH_SCHEMA,
+                b'Form does not exist on server', schema.value
+            )
+
+        entry_id_list_list = self._struct(entry_id_list_list)
+        field_ids = self._internal_ids(field_ids, simulated_schema)
+        count = entry_id_list_list.numItems
+
+        exist_list = self._struct(exist_list)
+        exist_keep = []
+        exist_list.numItems = count
+        exist_list.booleanList = self._array(arh.ARBoolean, count, exist_keep)
+
+        field_value_list_list = self._struct(field_value_list_list)
+        keep = []
+        field_value_list_list.numItems = count
+        field_value_list_list.valueListList = self._array(
+            arh.ARFieldValueList, count, keep
+        )
+
+        for i in range(count):
+            entry_id = entry_id_list_list.entryIdList[i].entryIdList[0].value
+            values = simulated_schema.entries.get(entry_id)
+            exist_list.booleanList[i] = values is not None
+            if values is not None:
+                self._fill_field_values(
+                    field_value_list_list.valueListList[i], simulated_schema,
+                    values, field_ids, keep
+                )
+
+        self._allocate(exist_list, exist_keep)
+        self._allocate(field_value_list_list, keep)
+        return self._ok(status)
+
+    def _ARCreateEntry(self, control, schema, field_value_list, entry_id,
+                       status):
+        simulated_schema = self._schema(schema)
+        if simulated_schema is None:
+            return self._error(
+                status, AR_ERROR_NO_SUCH_SCHEMA,
+                b'Form does not exist on server', schema.value
+            )
+
+        values = self._read_field_values(self._struct(field_value_list))
+
+        def create(entry_status):
+            for field_id in values:
+                if field_id not in simulated_schema.fields:
+                    return self._error(
+                        entry_status, AR_ERROR_NO_SUCH_FIELD,
+                        b'Field does not exist on current form',
+                        str(field_id).encode('ascii')
+                    ), None
+            new_entry_id = simulated_schema.new_entry_id()
+            values[arh.AR_CORE_ENTRY_ID] = new_entry_id
+            simulated_schema.entries[new_entry_id] = values
+            return self._ok(entry_status), new_entry_id
+
+        return self._queue_or_run(
+            control, arh.AR_BULK_ENTRY_CREATE, create, entry_id, status
+        )
+
+    def _ARSetEntry(
+        self, control, schema, entry_id_list, field_value_list, get_time,
+        option, status
+    ):
+        simulated_schema = self._schema(schema)
+        if simulated_schema is None:
+            return self._error(
+                status, AR_ERROR_NO_SUCH_SCHEMA,
+                b'Form does not exist on server', schema.value
+            )
+
+        entry_id = self._struct(entry_id_list).entryIdList[0].value
+        values = self._read_field_values(self._struct(field_value_list))
+
+        def update(entry_status):
+            entry = simulated_schema.entries.get(entry_id)
+            if entry is None:
+                return self._error(
+                    entry_status, AR_ERROR_NO_SUCH_ENTRY,
+                    b'Entry does not exist in database', entry_id
+                ), None
+            for field_id in values:
+                if field_id not in simulated_schema.fields:
+                    return self._error(
+                        entry_status, AR_ERROR_NO_SUCH_FIELD,
+                        b'Field does not exist on current form',
+                        str(field_id).encode('ascii')
+                    ), None
+            entry.update(values)
+            return self._ok(entry_status), None
+
+        return self._queue_or_run(
+            control, arh.AR_BULK_ENTRY_SET, update, None, status
+        )
+
+    def _ARDeleteEntry(self, control, schema, entry_id_list, option, status):
+        simulated_schema = self._schema(schema)
+        if simulated_schema is None:
+            return self._error(
+                status, AR_ERROR_NO_SUCH_SCHEMA,
+                b'Form does not exist on server', schema.value
+            )
+
+        entry_id = self._struct(entry_id_list).entryIdList[0].value
+
+        def delete(entry_status):
+            if simulated_schema.entries.pop(entry_id, None) is None:
+                return self._error(
+                    entry_status, AR_ERROR_NO_SUCH_ENTRY,
+                    b'Entry does not exist in database', entry_id
+                ), None
+            return self._ok(entry_status), None
+
+        return self._queue_or_run(
+            control, arh.AR_BULK_ENTRY_DELETE, delete, None, status
+        )
+
+    def _queue_or_run(self, control, call_type, run, entry_id, status):
+        """
+        Runs an entry call immediately or queues it if the control record
+        is in a bulk entry transaction.
+
+        :param control: the control record argument
+        :param int call_type: the AR_BULK_ENTRY constant of the call
+        :param run: a function accepting a status list which performs the
+                    call and returns the return code and new entry id
+        :param entry_id: the AREntryIdType receiving the new entry id (for
+                         create calls)
+        :param status: the status list argument
+        :return: the return code of the call
+        """
+
+        calls = self._bulk_calls.get(addressof(self._struct(control)))
+        if calls is not None:
+            calls.append((call_type, run))
+            return self._ok(status)
+
+        result, new_entry_id = run(status)
+        if new_entry_id is not None:
+            entry_id.value = new_entry_id
+        return result
+
+    def _ARBeginBulkEntryTransaction(self, control, status):
+        self._bulk_calls[addressof(self._struct(control))] = []
+        return self._ok(status)
+
+    def _AREndBulkEntryTransaction(
+        self, control, action, return_list, status
+    ):
+        calls = self._bulk_calls.pop(addressof(self._struct(control)), None)
+        if calls is None:
+            return self._error(
+                status, 9999, b'No bulk entry transaction is in progress'
+            )
+
+        if action == arh.AR_BULK_ENTRY_ACTION_CANCEL:
+            return self._ok(status)
+
+        # Calls are applied together, so all changes are rolled back if any
+        # call fails
+        snapshot = dict(
+            (name, OrderedDict(
+                (entry_id, dict(values))
+                for entry_id, values in simulated_schema.entries.items()
+            ))
+            for name, simulated_schema in self.schemas.items()
+        )
+
+        return_list = self._struct(return_list)
+        keep = []
+        return_list.numItems = len(calls)
+        return_list.entryReturnList = self._array(
+            arh.ARBulkEntryReturn, len(calls), keep
+        )
+
+        failed = False
+        for i, (call_type, run) in enumerate(calls):
+            entry_return = return_list.entryReturnList[i]
+            entry_return.entryCallType = call_type
+            if call_type == arh.AR_BULK_ENTRY_CREATE:
+                call_return = entry_return.u.createEntryReturn
+            elif call_type == arh.AR_BULK_ENTRY_SET:
+                call_return = entry_return.u.setEntryReturn
+            else:
+                call_return = entry_return.u.deleteEntryReturn
+
+            result, new_entry_id = run(call_return.status)
+            keep.append(self._allocations.pop(
+                addressof(call_return.status), None
+            ))
+            if result >= arh.AR_RETURN_ERROR:
+                failed = True
+            elif new_entry_id is not None:
+                call_return.entryId = new_entry_id
+
+        self._allocate(return_list, keep)
+
+        if failed:
+            for name, entries in snapshot.items():
+                self.schemas[name].entries = entries
+            return self._error(
+                status, 9999, b'The bulk entry transaction failed'
+            )
+
+        return self._ok(status)
+
+    # Freeing memory
+
+    def _FreeARBooleanList(self, value, free_struct):
+        self._free(value, 'booleanList')
+
+    def _FreeARBulkEntryReturnList(self, value, free_struct):
+        self._free(value)
+
+    def _FreeAREntryIdList(self, value, free_struct):
+        self._free(value, 'entryIdList')
+
+    def _FreeAREntryIdListList(self, value, free_struct):
+        entry_id_list_list = self._struct(value)
+        if addressof(entry_id_list_list) not in self._allocations:
+            for i in range(entry_id_list_list.numItems):
+                self._free(entry_id_list_list.entryIdList[i], 'entryIdList')
+        self._free(value, 'entryIdList')
+
+    def _FreeAREntryListFieldList(self, value, free_struct):
+        self._free(value, 'fieldsList')
+
+    def _FreeAREntryListFieldValueList(self, value, free_struct):
+        self._free(value)
+
+    def _FreeARFieldLimitList(self, value, free_struct):
+        self._free(value)
+
+    def _FreeARFieldValueList(self, value, free_struct):
+        self._free(value)
+
+    def _FreeARFieldValueListList(self, value, free_struct):
+        self._free(value)
+
+    def _FreeARInternalIdList(self, value, free_struct):
+        self._free(value, 'internalIdList')
+
+    def _FreeARNameList(self, value, free_struct):
+        self._free(value, 'nameList')
+
+    def _FreeARQualifierStruct(self, value, free_struct):
+        self._free(value)
+
+    def _FreeARStatisticsResultList(self, value, free_struct):
+        self._free(value)
+
+    def _FreeARStatusList(self, value, free_struct):
+        self._free(value)
@@ -1,4 +1,15 @@
+from .allocations import AllocationTracker
 from .ars import ARS
+from .cache import MetadataCache, SQLiteMetadataCache
+from .changes import ChangeFeed
 from .exceptions import ARSError
+from .instrumentation import Instrumentation, Metrics
+from .pool import ARSPool
+from .qualifier import F, Qualifier
+from .rows import Row
 
-__all__ = ['ARS', 'ARSError']
+__all__ = [
+    'AllocationTracker', 'ARS', 'ARSError', 'ARSPool', 'ChangeFeed', 'F',
+    'Instrumentation', 'MetadataCache', 'Metrics', 'Qualifier', 'Row',
+    'SQLiteMetadataCache'
+]
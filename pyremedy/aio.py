@@ -0,0 +1,349 @@
+"""
+An asyncio front end for PyRemedy.  This module requires Python 3.6+ and is
+therefore not imported by the pyremedy package itself::
+
+    from pyremedy.aio import AsyncARS
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import threading
+
+from .exceptions import ARSError
+from .pool import ARSPool
+
+
+class AsyncARS(object):
+    """
+    The AsyncARS object provides coroutine versions of the main ARS
+    operations so that Remedy ARS calls don't block the event loop.  Each
+    call runs on a dedicated thread pool using a session checked out of an
+    ARSPool::
+
+        ars = AsyncARS(
+            server='myserver.domain.com', port=1234,
+            user='fots', password='password123', size=8
+        )
+
+        entries = await ars.query(schema, qualifier, fields)
+
+        async for entry_id, entry_values in ars.iter_query(
+            schema, qualifier, fields
+        ):
+            ...
+
+        await ars.terminate()
+
+    At most one call per session is in flight at any time.  Further calls
+    wait without blocking the event loop until a session becomes free, so
+    callers may safely issue more calls than there are sessions.
+
+    Cancelling a call which is waiting for a session abandons it
+    immediately.  A call which has already been sent to the server can't be
+    interrupted, so its result is discarded and the session is only freed
+    once the server has responded.
+
+    The sessions are opened when the object is created, which blocks until
+    all sessions have logged in.
+
+    :param str server: the Remedy ARS server to connect to
+    :param str user: the username to authenticate with
+    :param str password: the password to authenticate with
+    :param int size: the number of sessions to open (and therefore the
+                     maximum number of calls in flight)
+    :param kwargs: additional keyword arguments passed to the ARSPool
+                   (e.g. port or qualifier_cache_size)
+    :raises: ARSError
+    """
+
+    def __init__(self, server, user, password, size=4, **kwargs):
+        #: The pool of sessions used to run each call
+        self.pool = ARSPool(server, user, password, size=size, **kwargs)
+
+        # Calls run on their own threads so that they never compete with
+        # other users of the default executor of the event loop
+        self._executor = ThreadPoolExecutor(max_workers=size)
+
+        # Limits the number of calls in flight to the number of sessions.
+        # The semaphore is created on first use within the event loop, as
+        # on Python 3.9 and earlier it binds to the loop that is current
+        # when it is created (which may not be the loop later running the
+        # calls, e.g. when using asyncio.run).
+        self._slots = None
+
+        # Whether terminate has been called, which stops further calls from
+        # starting while the calls in flight complete
+        self._terminating = False
+
+        self._terminated = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.terminate()
+
+    async def terminate(self):
+        """
+        Terminates all sessions once the calls currently in flight (and any
+        iterations which haven't been closed) have completed.  Calls still
+        waiting for a session and calls made afterwards raise ARSError.
+        """
+
+        self._terminating = True
+
+        slots = self._semaphore()
+        acquired = 0
+
+        try:
+            # Holding every slot waits for the calls in flight to complete
+            while acquired < self.pool.size:
+                await slots.acquire()
+                acquired += 1
+
+            if not self._terminated:
+                self._terminated = True
+                await self._submit(self.pool.terminate)
+                self._executor.shutdown(wait=False)
+        finally:
+            # Waiting calls are woken up so that they can fail
+            for i in range(acquired):
+                slots.release()
+
+    async def get(self, schema, entry_id, fields, as_rows=False):
+        """
+        Retrieves a particular entry as per ARS.get.
+
+        :param str schema: the schema name to retrieve the entry from
+        :param str entry_id: the entry id of the entry to retrieve
+        :param fields: a list of field names to retrieve from the schema
+        :type fields: list of strings
+        :param bool as_rows: whether to return entry values as a Row object
+                             rather than a dict
+        :return: a dict (or Row) containing the field names and values
+                 requested for the respective entry id
+        :raises: ARSError
+        """
+
+        return await self._call('get', schema, entry_id, fields, as_rows)
+
+    async def query(self, schema, qualifier, fields, **kwargs):
+        """
+        Runs a specified qualification string against a chosen schema and
+        returns all related records as per ARS.query.
+
+        :param str schema: the schema name to run the query against
+        :param qualifier: the query determining which records to retrieve
+        :type qualifier: string or Qualifier
+        :param fields: a list of field names to retrieve from the schema
+        :type fields: list of strings
+        :param kwargs: additional keyword arguments passed to ARS.query
+                       (e.g. limit, as_rows or sort)
+        :return: a list of tuples containing the entry id and entry values
+        :raises: ARSError
+        """
+
+        return await self._call('query', schema, qualifier, fields, **kwargs)
+
+    async def iter_query(
+        self, schema, qualifier, fields, page_size=100, **kwargs
+    ):
+        """
+        Runs a specified qualification string against a chosen schema and
+        yields the related records one at a time as per ARS.iter_query.
+        Each page is retrieved on the thread pool, so the event loop is only
+        blocked while the entries of a page are being yielded.
+
+        A session is held for the entire iteration, so iterations which
+        are abandoned part way should be closed (e.g. using aclose) rather
+        than left for the garbage collector.
+
+        :param str schema: the schema name to run the query against
+        :param qualifier: the query determining which records to retrieve
+        :type qualifier: string or Qualifier
+        :param fields: a list of field names to retrieve from the schema
+        :type fields: list of strings
+        :param int page_size: the number of records to retrieve per call
+        :param kwargs: additional keyword arguments passed to
+                       ARS.iter_query (e.g. limit, as_rows or keyset)
+        :return: an asynchronous generator of tuples containing the entry id
+                 and entry values
+        :raises: ARSError
+        """
+
+        await self._acquire_slot()
+        pages = _Pages(
+            self.pool, schema, qualifier, fields, page_size, kwargs
+        )
+
+        try:
+            while True:
+                entries = await self._submit(pages.next_page)
+                for entry in entries:
+                    yield entry
+
+                if len(entries) < page_size:
+                    break
+        finally:
+            # The current page may still be in flight if the iteration was
+            # cancelled, so the session is freed once the page completes
+            self._release_when_done(self._executor.submit(pages.close))
+
+    async def create(self, schema, entry_values):
+        """
+        Creates a new entry in a given schema as per ARS.create.
+
+        :param str schema: the schema name to create the entry in
+        :param dict entry_values: the field names and values of the entry
+        :return: the entry id of the created entry
+        :raises: ARSError
+        """
+
+        return await self._call('create', schema, entry_values)
+
+    async def update(self, schema, entry_id, entry_values):
+        """
+        Updates an entry in a given schema as per ARS.update.
+
+        :param str schema: the schema name to update the entry in
+        :param str entry_id: the entry id of the entry to update
+        :param dict entry_values: the field names and values to update
+        :raises: ARSError
+        """
+
+        await self._call('update', schema, entry_id, entry_values)
+
+    async def delete(self, schema, entry_id):
+        """
+        Deletes an entry in a given schema as per ARS.delete.
+
+        :param str schema: the schema name to delete the entry from
+        :param str entry_id: the entry id of the entry to delete
+        :raises: ARSError
+        """
+
+        await self._call('delete', schema, entry_id)
+
+    async def _call(self, method, *args, **kwargs):
+        """
+        Runs an ARS method on a pooled session without blocking the event
+        loop, waiting for a free session if necessary.
+
+        :param str method: the name of the ARS method to call
+        :param args: the positional arguments of the method
+        :param kwargs: the keyword arguments of the method
+        :return: the result of the method
+        :raises: ARSError
+        """
+
+        await self._acquire_slot()
+        future = self._executor.submit(self._run, method, args, kwargs)
+        self._release_when_done(future)
+        return await asyncio.wrap_future(future)
+
+    def _semaphore(self):
+        """
+        Obtains the semaphore limiting the number of calls in flight,
+        creating it within the running event loop on first use.
+
+        :return: the asyncio.Semaphore
+        """
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool.size)
+        return self._slots
+
+    async def _acquire_slot(self):
+        """
+        Waits for a session to become free and reserves it for a call.
+
+        :raises: ARSError
+        """
+
+        slots = self._semaphore()
+        await slots.acquire()
+
+        if self._terminating:
+            slots.release()
+            raise ARSError('Unable to run a call on a terminated session')
+
+    def _run(self, method, args, kwargs):
+        """
+        Runs an ARS method on a pooled session (called on the thread pool).
+
+        :param str method: the name of the ARS method to call
+        :param tuple args: the positional arguments of the method
+        :param dict kwargs: the keyword arguments of the method
+        :return: the result of the method
+        :raises: ARSError
+        """
+
+        with self.pool.session() as ars:
+            return getattr(ars, method)(*args, **kwargs)
+
+    def _submit(self, func):
+        """
+        Runs a function on the thread pool.
+
+        :param func: the function to run
+        :return: an asyncio future of the result
+        """
+
+        return asyncio.wrap_future(self._executor.submit(func))
+
+    def _release_when_done(self, future):
+        """
+        Frees the slot held by a call once the call has completed on the
+        thread pool, which may be after the awaiting coroutine has been
+        cancelled.
+
+        :param concurrent.futures.Future future: the future of the call
+        """
+
+        loop = asyncio.get_event_loop()
+        future.add_done_callback(
+            lambda future: loop.call_soon_threadsafe(self._slots.release)
+        )
+
+
+class _Pages(object):
+    """
+    The state of an asynchronous iteration, retrieving the pages of an
+    ARS.iter_query generator on the thread pool.  A lock ensures that the
+    iteration is only closed once any page in flight has been retrieved.
+    """
+
+    def __init__(self, pool, schema, qualifier, fields, page_size, kwargs):
+        self._pool = pool
+        self._query = (schema, qualifier, fields, page_size, kwargs)
+        self._ars = None
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def next_page(self):
+        """
+        Retrieves the next page of entries, checking out a session on the
+        first call.
+
+        :return: a list of up to page_size entries
+        :raises: ARSError
+        """
+
+        with self._lock:
+            schema, qualifier, fields, page_size, kwargs = self._query
+            if self._entries is None:
+                self._ars = self._pool.checkout()
+                self._entries = self._ars.iter_query(
+                    schema, qualifier, fields, page_size=page_size, **kwargs
+                )
+            return list(islice(self._entries, page_size))
+
+    def close(self):
+        """Frees the current page and returns the session to the pool."""
+
+        with self._lock:
+            if self._entries is not None:
+                self._entries.close()
+            if self._ars is not None:
+                self._pool.checkin(self._ars)
+                self._ars = None
@@ -0,0 +1,292 @@
+from collections import OrderedDict
+from ctypes import (
+    addressof, c_char_p, c_void_p, Structure, Union, _Pointer
+)
+import sys
+import threading
+
+
+# The indexes of the arguments of each Remedy ARS C API function which are
+# filled by the function (all others only return a status list)
+RESULT_ARGUMENTS = {
+    'AREndBulkEntryTransaction': (2, 3),
+    'ARGetEntry': (4, 5),
+    'ARGetEntryStatistics': (6, 7),
+    'ARGetListEntryWithFields': (8, 10),
+    'ARGetListField': (5, 6),
+    'ARGetListSchema': (6, 7),
+    'ARGetMultipleEntries': (4, 5, 6),
+    'ARGetMultipleFields': tuple(range(3, 23)),
+    'ARGetSessionConfiguration': (2, 3),
+    'ARLoadARQualifierStruct': (4, 5)
+}
+
+# Modules whose frames are skipped when determining the caller of a function
+WRAPPER_MODULES = frozenset([__name__, 'pyremedy.instrumentation'])
+
+
+class AllocationTracker(object):
+    """
+    A debugging aid which tracks the native memory allocated on behalf of
+    an ARS session and reports any memory which is never freed.  Structs
+    filled by a Remedy ARS C API function are tracked until the related
+    FreeAR function is called on them.
+
+    A struct which is filled again before it was freed has leaked the
+    memory it referenced, which is reported as lost.
+
+    Each allocation is attributed to the C function which made it and the
+    PyRemedy method which called that function, so growth between two
+    points of a long running process can be traced to its source::
+
+        tracker = AllocationTracker()
+        ars = ARS(server, user, password, allocation_tracker=tracker)
+
+        tracker.checkpoint()
+        ...
+        print(tracker.report())
+
+    Tracking walks every struct passed to the C API and is therefore only
+    intended for debugging.  Trackers may be shared by several sessions
+    (e.g. all sessions of an ARSPool).
+    """
+
+    def __init__(self):
+        # The function and caller of each outstanding allocation by address
+        self._outstanding = {}
+
+        # The number of allocations lost by function and caller
+        self._lost = OrderedDict()
+
+        # The outstanding allocations at the last checkpoint
+        self._baseline = {}
+
+        self._lock = threading.Lock()
+
+    def allocated(self, address, function, caller, struct_type):
+        """
+        Records a struct filled by the C API.
+
+        :param int address: the address of the struct
+        :param str function: the name of the C function which filled it
+        :param str caller: the name of the method which called the function
+        :param type struct_type: the type of the struct
+        """
+
+        with self._lock:
+            lost = self._outstanding.get(address)
+            if lost is not None:
+                key = lost[:2]
+                self._lost[key] = self._lost.get(key, 0) + 1
+            self._outstanding[address] = (function, caller, struct_type)
+
+    def freed(self, addresses):
+        """
+        Records the release of structs filled by the C API.  Addresses which
+        aren't being tracked are ignored.
+
+        :param addresses: the addresses of the structs freed
+        """
+
+        with self._lock:
+            for address in addresses:
+                self._outstanding.pop(address, None)
+
+    def tracking(self, address, struct_type):
+        """
+        Determines whether a struct filled by the C API is outstanding.
+
+        :param int address: the address of the struct
+        :param type struct_type: the type of the struct
+        :return: True if the struct is outstanding
+        """
+
+        with self._lock:
+            allocation = self._outstanding.get(address)
+            return allocation is not None and allocation[2] is struct_type
+
+    def outstanding(self):
+        """
+        Counts the allocations which haven't been freed, including those
+        which were lost.
+
+        :return: a dict of allocation counts keyed by tuples containing the
+                 C function and the calling method
+        """
+
+        with self._lock:
+            counts = OrderedDict(self._lost)
+            for allocation in self._outstanding.values():
+                key = allocation[:2]
+                counts[key] = counts.get(key, 0) + 1
+            return counts
+
+    def lost(self):
+        """
+        Counts the allocations which were lost because the struct
+        referencing them was filled again before being freed.
+
+        :return: a dict of allocation counts keyed by tuples containing the
+                 C function and the calling method
+        """
+
+        with self._lock:
+            return OrderedDict(self._lost)
+
+    def checkpoint(self):
+        """Records the outstanding allocations that growth is relative to."""
+
+        outstanding = self.outstanding()
+        with self._lock:
+            self._baseline = outstanding
+
+    def growth(self):
+        """
+        Determines the allocations which have been made and not freed since
+        the last checkpoint (or since tracking began).
+
+        :return: a dict of the increase in allocation counts keyed by tuples
+                 containing the C function and the calling method (keys
+                 which haven't grown are omitted)
+        """
+
+        outstanding = self.outstanding()
+        with self._lock:
+            baseline = self._baseline
+
+        return OrderedDict(
+            (key, count - baseline.get(key, 0))
+            for key, count in outstanding.items()
+            if count > baseline.get(key, 0)
+        )
+
+    def report(self):
+        """
+        Describes the growth of allocations since the last checkpoint.
+
+        :return: a text report with one line per function and caller
+        """
+
+        growth = self.growth()
+        lost = self.lost()
+
+        if not growth:
+            return 'No growth in outstanding allocations\n'
+
+        lines = []
+        for (function, caller), count in sorted(
+            growth.items(), key=lambda item: -item[1]
+        ):
+            lines.append('{:>8} {} (called by {}){}'.format(
+                count, function, caller,
+                ', {} lost'.format(lost[(function, caller)])
+                if (function, caller) in lost else ''
+            ))
+
+        return '\n'.join(lines) + '\n'
+
+
+class TrackedLibrary(object):
+    """
+    A wrapper around the Remedy ARS C API which reports the structs filled
+    by each function and the FreeAR calls releasing them to an
+    AllocationTracker.  Functions are wrapped on first use and must have
+    their argument and return types registered beforehand.
+
+    :param CDLL library: the Remedy ARS C API
+    :param AllocationTracker tracker: the object to report allocations to
+    """
+
+    def __init__(self, library, tracker):
+        self._library = library
+        self._tracker = tracker
+
+    def __getattr__(self, name):
+        function = getattr(self._library, name)
+        tracker = self._tracker
+
+        if name.startswith('Free'):
+            def call(*args):
+                struct = _struct(args[0])
+                address = addressof(struct)
+                # Structs built by the caller (such as scratch structs) are
+                # never tracked and are ignored
+                if tracker.tracking(address, type(struct)):
+                    tracker.freed([address])
+                return function(*args)
+
+        else:
+            results = RESULT_ARGUMENTS.get(name, (-1,))
+
+            def call(*args):
+                result = function(*args)
+                caller = None
+                # Results which reference memory were allocated by the call
+                for index in results:
+                    struct = _struct(args[index])
+                    if (
+                        struct is not None and
+                        next(_pointers(struct), None) is not None
+                    ):
+                        caller = caller or _caller()
+                        tracker.allocated(
+                            addressof(struct), name, caller, type(struct)
+                        )
+                return result
+
+        # Cache the wrapper so that later calls skip __getattr__
+        setattr(self, name, call)
+        return call
+
+
+def _struct(argument):
+    """
+    Obtains the struct referenced by an argument passed using byref.
+
+    :param argument: the argument
+    :return: the struct (or the argument itself if it isn't a reference)
+    """
+
+    return getattr(argument, '_obj', argument)
+
+
+def _pointers(struct):
+    """
+    Yields the non-NULL pointers held by a struct, including those held by
+    nested structs and unions.
+
+    :param struct: the struct or union to inspect
+    :return: a generator of addresses
+    """
+
+    for field in struct._fields_:
+        name, field_type = field[0], field[1]
+
+        if issubclass(field_type, (_Pointer, c_char_p, c_void_p)):
+            # Read the raw address as ctypes converts c_char_p into bytes
+            address = c_void_p.from_address(
+                addressof(struct) + getattr(type(struct), name).offset
+            ).value
+            if not address:
+                continue
+            yield address
+
+        elif issubclass(field_type, (Structure, Union)):
+            for address in _pointers(getattr(struct, name)):
+                yield address
+
+
+def _caller():
+    """
+    Determines the method which called a wrapped function.
+
+    :return: the name of the calling function
+    """
+
+    frame = sys._getframe(2)
+    while (
+        frame.f_back is not None and
+        frame.f_globals.get('__name__') in WRAPPER_MODULES
+    ):
+        frame = frame.f_back
+    return frame.f_code.co_name
@@ -221,6 +221,86 @@ AR_NO_MAX_LIST_RETRIEVE = 0
 # the server will return
 AR_RETRIEVE_ALL_ENTRIES = 999999999
 
+# Entry statistics operations (ar.h).
+
+AR_STAT_OP_COUNT = 1
+AR_STAT_OP_SUM = 2
+AR_STAT_OP_AVERAGE = 3
+AR_STAT_OP_MINIMUM = 4
+AR_STAT_OP_MAXIMUM = 5
+
+# Core field ids (ar.h).
+
+# the entry id (Request ID) field present on every regular schema
+AR_CORE_ENTRY_ID = 1
+# the time at which an entry was last modified (Modified Date)
+AR_CORE_MODIFIED_DATE = 6
+
+# Sort orders (ar.h).
+
+AR_SORT_ASCENDING = 1
+AR_SORT_DESCENDING = 2
+
+# Session configuration variables (ar.h).
+
+# the maximum number of entries returned in each chunk of a response
+AR_SESS_CHUNK_RESPONSE_SIZE = 1
+# the timeout in seconds for normal operations
+AR_SESS_TIMEOUT_NORMAL = 2
+# the timeout in seconds for long operations (e.g. queries)
+AR_SESS_TIMEOUT_LONG = 3
+# the timeout in seconds for extra long operations (e.g. imports)
+AR_SESS_TIMEOUT_XLONG = 4
+
+# Qualifier operations (ar.h).
+
+# no qualification
+AR_COND_OP_NONE = 0
+# qualification AND qualification
+AR_COND_OP_AND = 1
+# qualification OR qualification
+AR_COND_OP_OR = 2
+# NOT qualification
+AR_COND_OP_NOT = 3
+# value/field relational operation
+AR_COND_OP_REL_OP = 4
+# qualification stored in a field
+AR_COND_OP_FROM_FIELD = 5
+
+# Relational operations (ar.h).
+
+# equal to
+AR_REL_OP_EQUAL = 1
+# greater than
+AR_REL_OP_GREATER = 2
+# greater than or equal to
+AR_REL_OP_GREATER_EQUAL = 3
+# less than
+AR_REL_OP_LESS = 4
+# less than or equal to
+AR_REL_OP_LESS_EQUAL = 5
+# not equal to
+AR_REL_OP_NOT_EQUAL = 6
+# matches the wildcard pattern of the right operand
+AR_REL_OP_LIKE = 7
+# contained in the set of values of the right operand
+AR_REL_OP_IN = 8
+# not contained in the set of values of the right operand
+AR_REL_OP_NOT_IN = 9
+
+# Operand types used in relational operations (ar.h).
+
+# operand is a field id
+AR_FIELD = 1
+# operand is a value
+AR_VALUE = 2
+# operand is an arithmetic operation
+AR_ARITHMETIC = 3
+# operand is a status history value
+AR_STAT_HISTORY = 4
+# operand is a set of values
+AR_VALUE_SET = 5
+
 # Enum styles (ar.h line 3845).
 
 # list auto-indexed starting at 0
@@ -272,6 +352,23 @@ AR_JOIN_DELOPTION_NONE = 0
 # existing.
 AR_JOIN_DELOPTION_FORCE = 1
 
+# Bulk entry transaction actions (ar.h).
+
+# send the queued calls to the server
+AR_BULK_ENTRY_ACTION_SEND = 1
+# discard the queued calls
+AR_BULK_ENTRY_ACTION_CANCEL = 2
+
+# Bulk entry call types (ar.h).
+
+AR_BULK_ENTRY_CREATE = 1
+AR_BULK_ENTRY_SET = 2
+AR_BULK_ENTRY_DELETE = 3
+AR_BULK_ENTRY_MERGE = 4
+AR_BULK_ENTRY_XMLCREATE = 5
+AR_BULK_ENTRY_XMLSET = 6
+AR_BULK_ENTRY_XMLDELETE = 7
+
 # Type definitions (ar.h line 275).
 
 # boolean flag set to TRUE or FALSE
@@ -337,6 +434,14 @@ class AREntryIdList(Structure):
     ]
 
 
+class AREntryIdListList(Structure):
+    """List of 0 or more entry id lists (ar.h)."""
+    _fields_ = [
+        ('numItems', c_uint),
+        ('entryIdList', POINTER(AREntryIdList))
+    ]
+
+
 class ARAccessNameList(Structure):
     """List of 0 or more access names (ar.h line 374)."""
     _fields_ = [
@@ -583,6 +688,22 @@ class ARValueList(Structure):
     ]
 
 
+class ARStatisticsResultStruct(Structure):
+    """A single group of entry statistics (ar.h)."""
+    _fields_ = [
+        ('groupByValues', ARValueList),
+        ('result', ARValueStruct)
+    ]
+
+
+class ARStatisticsResultList(Structure):
+    """List of 0 or more groups of entry statistics (ar.h)."""
+    _fields_ = [
+        ('numItems', c_uint),
+        ('resultList', POINTER(ARStatisticsResultStruct))
+    ]
+
+
 class AREntryListFieldStruct(Structure):
     """Definition for a field in the entry list (ar.h line 850)."""
     _fields_ = [
@@ -616,6 +737,14 @@ class ARFieldValueList(Structure):
     ]
 
 
+class ARFieldValueListList(Structure):
+    """List of 0 or more field/value lists (ar.h)."""
+    _fields_ = [
+        ('numItems', c_uint),
+        ('valueListList', POINTER(ARFieldValueList))
+    ]
+
+
 class AREntryListFieldValueStruct(Structure):
     """
     Parallel entry list structures which are used to return entryList as a
@@ -1169,3 +1298,69 @@ class ARFieldMappingList(Structure):
         ('numItems', c_uint),
         ('mappingList', POINTER(ARFieldMappingStruct))
     ]
+
+
+class ARCreateEntryReturn(Structure):
+    """Result of a create call in a bulk entry transaction (ar.h)."""
+    _fields_ = [
+        ('entryId', AREntryIdType),
+        ('status', ARStatusList)
+    ]
+
+
+class ARSetEntryReturn(Structure):
+    """Result of a set call in a bulk entry transaction (ar.h)."""
+    _fields_ = [
+        ('status', ARStatusList)
+    ]
+
+
+class ARDeleteEntryReturn(Structure):
+    """Result of a delete call in a bulk entry transaction (ar.h)."""
+    _fields_ = [
+        ('status', ARStatusList)
+    ]
+
+
+class ARMergeEntryReturn(Structure):
+    """Result of a merge call in a bulk entry transaction (ar.h)."""
+    _fields_ = [
+        ('entryId', AREntryIdType),
+        ('status', ARStatusList)
+    ]
+
+
+class ARXMLEntryReturn(Structure):
+    """Result of an XML call in a bulk entry transaction (ar.h)."""
+    _fields_ = [
+        ('outputDoc', c_char_p),
+        ('status', ARStatusList)
+    ]
+
+
+class ARBulkEntryReturnUnion(Union):
+    """Union used to hold the result of a bulk entry call (ar.h)."""
+    _fields_ = [
+        ('createEntryReturn', ARCreateEntryReturn),
+        ('setEntryReturn', ARSetEntryReturn),
+        ('deleteEntryReturn', ARDeleteEntryReturn),
+        ('mergeEntryReturn', ARMergeEntryReturn),
+        ('xmlEntryReturn', ARXMLEntryReturn)
+    ]
+
+
+class ARBulkEntryReturn(Structure):
+    """Result of a single call in a bulk entry transaction (ar.h)."""
+    _fields_ = [
+        # AR_BULK_ENTRY_xxx
+        ('entryCallType', c_uint),
+        ('u', ARBulkEntryReturnUnion)
+    ]
+
+
+class ARBulkEntryReturnList(Structure):
+    """List of 0 or more bulk entry call results (ar.h)."""
+    _fields_ = [
+        ('numItems', c_uint),
+        ('entryReturnList', POINTER(ARBulkEntryReturn))
+    ]
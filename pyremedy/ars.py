@@ -1,12 +1,56 @@
 from collections import OrderedDict
+from contextlib import contextmanager
 from ctypes import (
-    CDLL, sizeof, cast, byref, memset, c_char_p, c_int, c_uint, c_size_t,
-    c_void_p, POINTER
+    CDLL, sizeof, cast, byref, memset, pointer, c_char_p, c_int, c_uint,
+    POINTER
 )
-from datetime import datetime
+from itertools import count
+import threading
+import time
+from timeit import default_timer
 
 from . import arh
+from .allocations import TrackedLibrary
+from .cache import (
+    CachedQualifier, EnumMappings, QualifierCache, enum_id_to_name,
+    enum_name_to_id
+)
+from .columns import Columns
+from .compat import integer_types
+from .decoder import build_converter, build_plan, decode_value
 from .exceptions import ARSError
+from .instrumentation import InstrumentedLibrary
+from .qualifier import F, Qualifier
+from .rows import row_class
+from .scratch import ScratchStructs
+
+
+# The number of seconds subtracted from the time at which metadata was saved
+# when asking the server for schemas changed since then, allowing for clock
+# differences between the client and the server
+METADATA_CLOCK_SKEW = 300
+
+# Generations assigned to the field details of schemas each time they are
+# replaced (unique across all sessions)
+FIELD_GENERATIONS = count(1)
+
+# The operations supported by the statistics method
+STATISTICS_OPERATIONS = {
+    'count': arh.AR_STAT_OP_COUNT,
+    'sum': arh.AR_STAT_OP_SUM,
+    'avg': arh.AR_STAT_OP_AVERAGE,
+    'min': arh.AR_STAT_OP_MINIMUM,
+    'max': arh.AR_STAT_OP_MAXIMUM
+}
+
+# Session configuration options in the order they are applied, mapped to
+# the related session configuration variables
+SESSION_OPTIONS = OrderedDict([
+    ('timeout_normal', arh.AR_SESS_TIMEOUT_NORMAL),
+    ('timeout_long', arh.AR_SESS_TIMEOUT_LONG),
+    ('timeout_xlong', arh.AR_SESS_TIMEOUT_XLONG),
+    ('chunk_response_size', arh.AR_SESS_CHUNK_RESPONSE_SIZE)
+])
 
 
 class ARS(object):
@@ -23,16 +67,50 @@ class ARS(object):
     :param str password: the password to authenticate with
     :param int port: the port number of the server
     :param int rpc_program_number: the RPC program number of the server
+    :param int qualifier_cache_size: the number of loaded qualifiers to keep
+                                     for reuse by later queries (0 disables
+                                     the qualifier cache)
+    :param MetadataCache metadata_cache: a persistent cache used to store
+                                         field and enum details between
+                                         sessions
+    :param int timeout_normal: the number of seconds to wait for normal
+                               operations (e.g. get, create and update)
+    :param int timeout_long: the number of seconds to wait for long
+                             operations (e.g. queries)
+    :param int timeout_xlong: the number of seconds to wait for extra long
+                              operations
+    :param int chunk_response_size: the maximum number of entries the server
+                                    returns in each chunk of a response
+    :param Instrumentation instrumentation: an object which records the
+                                            time spent in each call to the
+                                            Remedy ARS C API and in
+                                            decoding entries
+    :param arlib: an implementation of the Remedy ARS C API to use in place
+                  of libar_lx64.so (e.g. the simulator used by the
+                  benchmarks)
+    :param AllocationTracker allocation_tracker: an object which tracks the
+                                                 native memory allocated and
+                                                 freed by the session (for
+                                                 debugging memory growth)
+    :param bool partial_fields: whether to only retrieve the data types and
+                                enum mappings of the fields used by each
+                                operation rather than those of all fields on
+                                a schema (see update_fields)
     :raises: ARSError
     """
 
-    def __init__(self, server, user, password, port=0, rpc_program_number=0):
+    def __init__(
+        self, server, user, password, port=0, rpc_program_number=0,
+        qualifier_cache_size=100, metadata_cache=None, timeout_normal=None,
+        timeout_long=None, timeout_xlong=None, chunk_response_size=None,
+        instrumentation=None, arlib=None, allocation_tracker=None,
+        partial_fields=False
+    ):
         #: The Remedy ARS C API shared object file which is used to interact
         #: with the Remedy server
-        self.arlib = CDLL('libar_lx64.so')
-
-        #: The standard C library used to run several lower-lever C functions
-        self.clib = CDLL('libc.so.6')
+        if arlib is None:
+            arlib = CDLL('libar_lx64.so')
+        self.arlib = arlib
 
         #: The control record for each operation containing details about the
         #: user and session performing each operation
@@ -44,9 +122,20 @@ class ARS(object):
         #: A list of tuples containing errors that occurred on the last call
         self.errors = []
 
+        #: The total number of entries matching the qualifier of the last
+        #: query (regardless of the offset and limit used)
+        self.match_count = None
+
         #: A cache containing all schemas
         self.schema_cache = None
 
+        #: The time at which the schema cache was last retrieved
+        self.schema_timestamp = None
+
+        #: A cache containing the time at which field details were last
+        #: retrieved for schemas
+        self.field_timestamp_cache = {}
+
         #: A cache containing field id to name mappings for schemas
         self.field_id_to_name_cache = {}
 
@@ -62,12 +151,53 @@ class ARS(object):
         #: A cache containing enum name to id mappings for a particular field
         self.enum_name_to_id_cache = {}
 
-        # Explicitly define argument and return types for C functions
-        self._register_clib_functions()
+        #: A cache containing the generation of the field details of
+        #: schemas, which changes each time they are replaced
+        self.field_generation_cache = {}
+
+        #: A lock held while the field and enum caches are updated (shared
+        #: by all sessions sharing the caches)
+        self.field_lock = threading.RLock()
+
+        #: A persistent cache used to store field and enum details between
+        #: sessions
+        self.metadata_cache = metadata_cache
+
+        #: Whether only the details of the fields used by each operation are
+        #: retrieved
+        self.partial_fields = partial_fields
+
+        #: A cache containing loaded qualifiers for schemas
+        self.qualifier_cache = QualifierCache(
+            self._free_qualifier, qualifier_cache_size
+        )
+
+        #: Request structs reused by each call to avoid repeated allocation
+        self.scratch = ScratchStructs()
+
+        #: The session configuration options which have been applied
+        self.session_options = {}
+
+        #: An object which records the time spent in each call to the Remedy
+        #: ARS C API and in decoding entries
+        self.instrumentation = instrumentation
+
+        #: An object which tracks the native memory allocated and freed by
+        #: the session
+        self.allocation_tracker = allocation_tracker
 
         # Explicitly define argument and return types for Remedy functions
         self._register_arlib_functions()
 
+        # Track allocations and frees once the functions have been registered
+        if allocation_tracker is not None:
+            self.arlib = TrackedLibrary(self.arlib, allocation_tracker)
+
+        # Time each call to Remedy once the functions have been registered
+        # (calls are made directly when instrumentation isn't required)
+        if instrumentation is not None:
+            self.arlib = InstrumentedLibrary(self.arlib, instrumentation)
+
         # Initialise control to 0 for safety
         memset(byref(self.control), 0, sizeof(arh.ARControlStruct))
 
@@ -136,6 +266,13 @@ class ARS(object):
 
             self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
 
+        # Apply any timeouts and RPC tuning requested
+        self.configure(
+            timeout_normal=timeout_normal, timeout_long=timeout_long,
+            timeout_xlong=timeout_xlong,
+            chunk_response_size=chunk_response_size
+        )
+
     def terminate(self):
         """
         Perform a cleanup and disconnect the session.
@@ -146,6 +283,9 @@ class ARS(object):
         # Clear previous errors
         self.errors = []
 
+        # Free all cached qualifiers while the session is still available
+        self.qualifier_cache.invalidate()
+
         if (
             self.arlib.ARTermination(
                 # ARControlStruct *control: the control record
@@ -162,6 +302,97 @@ class ARS(object):
 
         self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
 
+    def configure(
+        self, timeout_normal=None, timeout_long=None, timeout_xlong=None,
+        chunk_response_size=None
+    ):
+        """
+        Applies timeouts and RPC tuning to all subsequent calls made by the
+        session.  Options which are not specified are left unchanged.
+
+        :param int timeout_normal: the number of seconds to wait for normal
+                                   operations (e.g. get, create and update)
+        :param int timeout_long: the number of seconds to wait for long
+                                 operations (e.g. queries)
+        :param int timeout_xlong: the number of seconds to wait for extra
+                                  long operations
+        :param int chunk_response_size: the maximum number of entries the
+                                        server returns in each chunk of a
+                                        response
+        :raises: ARSError
+        """
+
+        # Clear previous errors
+        self.errors = []
+
+        options = {
+            'timeout_normal': timeout_normal,
+            'timeout_long': timeout_long,
+            'timeout_xlong': timeout_xlong,
+            'chunk_response_size': chunk_response_size
+        }
+
+        for option, variable_id in SESSION_OPTIONS.items():
+            value = options[option]
+            if value is None:
+                continue
+
+            self._set_session_configuration(variable_id, value)
+            self.session_options[option] = value
+
+    @contextmanager
+    def configuration(
+        self, timeout_normal=None, timeout_long=None, timeout_xlong=None,
+        chunk_response_size=None
+    ):
+        """
+        A context manager which applies timeouts and RPC tuning to the calls
+        made within the block and restores the previous configuration
+        afterwards::
+
+            with ars.configuration(timeout_long=10):
+                entries = ars.query(schema, qualifier, fields)
+
+        :param int timeout_normal: the number of seconds to wait for normal
+                                   operations (e.g. get, create and update)
+        :param int timeout_long: the number of seconds to wait for long
+                                 operations (e.g. queries)
+        :param int timeout_xlong: the number of seconds to wait for extra
+                                  long operations
+        :param int chunk_response_size: the maximum number of entries the
+                                        server returns in each chunk of a
+                                        response
+        :raises: ARSError
+        """
+
+        options = {
+            'timeout_normal': timeout_normal,
+            'timeout_long': timeout_long,
+            'timeout_xlong': timeout_xlong,
+            'chunk_response_size': chunk_response_size
+        }
+
+        # Determine the current value of each option being changed
+        previous = {}
+        for option, variable_id in SESSION_OPTIONS.items():
+            if options[option] is None:
+                continue
+            if option in self.session_options:
+                previous[option] = self.session_options[option]
+            else:
+                previous[option] = self._get_session_configuration(
+                    variable_id
+                )
+
+        self.configure(**options)
+        try:
+            yield self
+        finally:
+            # Keep the errors of the last call made within the block
+            errors = self.errors
+            self.configure(**previous)
+            self.errors = errors
+
     def schemas(self):
         """
         Retrieves a list of all available schemas on the specified Remedy
@@ -178,47 +409,9 @@ class ARS(object):
         if self.schema_cache is not None:
             return self.schema_cache
 
-        name_artype = arh.ARNameType()
-        name_artype.value = ''
-        schema_list = arh.ARNameList()
-
-        if (
-            self.arlib.ARGetListSchema(
-                # ARControlStruct *control: the control record
-                byref(self.control),
-                # ARTimestamp changedSince: retrieves forms with a chosen
-                # modification timestamp
-                0,
-                # unsigned int schemaType: get all schemas
-                arh.AR_LIST_SCHEMA_ALL | arh.AR_HIDDEN_INCREMENT,
-                # ARNameType name: specify which form this depends on (ignored
-                # with our schemaType)
-                name_artype,
-                # ARInternalIdList *fieldIdList: filter the schemas by a given
-                # set of fields
-                None,
-                # ARPropList *objPropList: search for specify object properties
-                None,
-
-                # (return) ARNameList *nameList: the list of schemas
-                byref(schema_list),
-                # (return) ARStatusList *status: notes, warnings or errors
-                # generated by the operation
-                byref(self.status)
-            ) >= arh.AR_RETURN_ERROR
-        ):
-            self._update_errors()
-            self.arlib.FreeARNameList(byref(schema_list), arh.FALSE)
-            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
-            raise ARSError('Unable to obtain a list of schemas')
-
         # Save the schema list into the cache
-        self.schema_cache = [
-            schema_list.nameList[i].value for i in range(schema_list.numItems)
-        ]
-
-        self.arlib.FreeARNameList(byref(schema_list), arh.FALSE)
-        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+        self.schema_timestamp = int(time.time())
+        self.schema_cache = self._get_list_schema()
 
         return self.schema_cache
 
@@ -230,13 +423,13 @@ class ARS(object):
         :raises: ARSError
         """
 
-        # Ensure we have all field and enum details for the schema
-        self.update_fields(schema)
+        # Ensure we have the names of all fields on the schema
+        self.update_fields(schema, [])
 
         # Return just the field names of the selected schema
         return self.field_name_to_id_cache[schema].keys()
 
-    def get(self, schema, entry_id, fields):
+    def get(self, schema, entry_id, fields, as_rows=False):
         """
         Retrieves a particular entry in the requested schema using the
         given entry id.
@@ -246,48 +439,31 @@ class ARS(object):
                              retrieve
         :param fields: a list of field names to retrieve from the schema
         :type fields: list of strings
-        :return: a dict containing the field names and values requested for
-                 the respective entry id
+        :param bool as_rows: whether to return entry values as Row objects
+                             rather than dicts
+        :return: a dict (or Row) containing the field names and values
+                 requested for the respective entry id
         :raises: ARSError
         """
 
-        # Ensure we have all field and enum details for the schema
-        self.update_fields(schema)
+        # Clear previous errors
+        self.errors = []
+
+        # Ensure we have the field and enum details of the fields used
+        self.update_fields(schema, fields)
 
-        # Validate that all fields exist.  Note that this is performed here
-        # so that we aren't in the middle of allocating memory to the
-        # AREntryListFieldList struct when we realise a field is invalid.
-        for field in fields:
-            if field not in self.field_name_to_id_cache[schema]:
-                raise ARSError(
-                    'A field with name {} does not exist in schema '
-                    '{}'.format(field, schema)
-                )
+        # Validate that all fields exist before building the request structs
+        self._validate_fields(schema, fields)
 
-        entry_id_list = arh.AREntryIdList()
-        entry_id_list.numItems = 1
-        entry_id_list.entryIdList = cast(
-            self.clib.malloc(
-                entry_id_list.numItems * sizeof(arh.AREntryIdType)
-            ), POINTER(arh.AREntryIdType)
-        )
-        entry_id_list.entryIdList[0].value = entry_id
-
-        internal_id_list = arh.ARInternalIdList()
-        internal_id_list.numItems = len(fields)
-        internal_id_list.internalIdList = cast(
-            self.clib.malloc(
-                internal_id_list.numItems * sizeof(arh.ARInternalId)
-            ), POINTER(arh.ARInternalId)
-        )
+        field_ids = [
+            self.field_name_to_id_cache[schema][field] for field in fields
+        ]
 
-        for i, field in enumerate(fields):
-            internal_id_list.internalIdList[i] = (
-                self.field_name_to_id_cache[schema][field]
-            )
+        # The request structs are reused between calls and must not be freed
+        entry_id_list = self.scratch.entry_id_list(entry_id)
+        internal_id_list = self.scratch.internal_id_list(field_ids)
+        schema_artype = self.scratch.name(schema)
 
-        schema_artype = arh.ARNameType()
-        schema_artype.value = schema
         field_value_list = arh.ARFieldValueList()
 
         if (
@@ -309,8 +485,7 @@ class ARS(object):
                 byref(self.status)
             ) >= arh.AR_RETURN_ERROR
         ):
-            self.arlib.FreeAREntryIdList(byref(entry_id_list), arh.FALSE)
-            self.arlib.FreeARInternalIdList(byref(internal_id_list), arh.FALSE)
+            self._update_errors()
             self.arlib.FreeARFieldValueList(byref(field_value_list), arh.FALSE)
             self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
             raise ARSError(
@@ -318,495 +493,2288 @@ class ARS(object):
                 '{}'.format(entry_id, schema)
             )
 
-        # Create an empty dict for the values
-        entry_values = {}
-
-        for i in range(field_value_list.numItems):
-            field_id = field_value_list.fieldValueList[i].fieldId
-            field_name = self.field_id_to_name_cache[schema][field_id]
-            value_struct = field_value_list.fieldValueList[i].value
-            try:
-                entry_values[field_name] = self._extract_field(
-                    schema, field_id, value_struct
-                )
-            except ARSError:
-                self.arlib.FreeAREntryIdList(byref(entry_id_list), arh.FALSE)
-                self.arlib.FreeARInternalIdList(
-                    byref(internal_id_list), arh.FALSE
-                )
-                self.arlib.FreeARFieldValueList(
-                    byref(field_value_list), arh.FALSE
+        try:
+            started = default_timer()
+            plan = build_plan(self, schema, field_ids)
+            entry_values = self._extract_field_values(
+                field_value_list, plan, self._row_type(schema, plan, as_rows)
+            )
+            if self.instrumentation is not None:
+                self._record_decode(
+                    schema, started, [(entry_id, entry_values)]
                 )
-                self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
-                raise
+        except ARSError:
+            self.arlib.FreeARFieldValueList(byref(field_value_list), arh.FALSE)
+            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+            raise
 
-        self.arlib.FreeAREntryIdList(byref(entry_id_list), arh.FALSE)
-        self.arlib.FreeARInternalIdList(byref(internal_id_list), arh.FALSE)
         self.arlib.FreeARFieldValueList(byref(field_value_list), arh.FALSE)
         self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
 
         return entry_values
 
+    def get_many(self, schema, entry_ids, fields, as_rows=False):
+        """
+        Retrieves several entries in the requested schema using the given
+        entry ids.  Entries are retrieved in batches of up to
+        AR_MAX_MULT_ENTRIES entries per call to the server.
+
+        :param str schema: the schema name to retrieve the entries for
+        :param entry_ids: the entry ids of the entries that you wish to
+                          retrieve
+        :type entry_ids: list of strings
+        :param fields: a list of field names to retrieve from the schema
+        :type fields: list of strings
+        :param bool as_rows: whether to return entry values as Row objects
+                             rather than dicts
+        :return: a list of tuples in the same order as the entry ids
+                 requested whereby each tuple contains the entry id and
+                 entry values (or None if the entry doesn't exist)
+        :raises: ARSError
+        """
+
+        # Ensure we have the field and enum details of the fields used
+        self.update_fields(schema, fields)
+
+        # Validate that all fields exist before allocating any memory
+        self._validate_fields(schema, fields)
+
+        entry_ids = list(entry_ids)
+        entries = []
+
+        for start in range(0, len(entry_ids), arh.AR_MAX_MULT_ENTRIES):
+            entries.extend(
+                self._get_multiple_entries(
+                    schema, entry_ids[start:start + arh.AR_MAX_MULT_ENTRIES],
+                    fields, as_rows
+                )
+            )
+
+        return entries
+
     def query(
         self, schema, qualifier, fields, offset=arh.AR_START_WITH_FIRST_ENTRY,
-        limit=arh.AR_NO_MAX_LIST_RETRIEVE
+        limit=arh.AR_NO_MAX_LIST_RETRIEVE, as_rows=False, sort=None
     ):
         """
         Runs a specified qualification string against a chosen schema and
         returns the all related records with the fields specified by the
-        caller.
+        caller.  The total number of matching records is available in the
+        match_count attribute afterwards.
 
         :param str schema: the schema name to run the query against
-        :param str qualifier: the query determining which records to retrieve
+        :param qualifier: the query determining which records to retrieve
+        :type qualifier: string or Qualifier
         :param fields: a list of field names to retrieve from the schema
         :type fields: list of strings
         :param int offset: the index of the first record to retrieve
         :param int limit: limit the number of returned results to a given
                           number
+        :param bool as_rows: whether to return entry values as Row objects
+                             rather than dicts
+        :param sort: the fields to sort the records by on the server, given
+                     as field names (or field ids) or as tuples of the field
+                     and 'asc' or 'desc' (e.g. [('Modified Date', 'desc')])
+        :type sort: list of strings or tuples
         :return: a list of tuples containing the entries matching the criteria
                  specified whereby each tuple contains the entry id and
                  entry values
         :raises: ARSError
         """
 
-        # Ensure we have all field and enum details for the schema
-        self.update_fields(schema)
-
-        # Validate that all fields exist.  Note that this is performed here
-        # so that we aren't in the middle of allocating memory to the
-        # AREntryListFieldList struct when we realise a field is invalid.
-        for field in fields:
-            if field not in self.field_name_to_id_cache[schema]:
-                raise ARSError(
-                    'A field with name {} does not exist in schema '
-                    '{}'.format(field, schema)
-                )
-
-        schema_artype = arh.ARNameType()
-        schema_artype.value = schema
-        display_tag_artype = arh.ARNameType()
-        display_tag_artype.value = ''
-        qualifier_struct = arh.ARQualifierStruct()
+        entries, timestamps = self._query(
+            schema, qualifier, fields, offset, limit, as_rows, sort
+        )
+        return entries
 
-        if (
-            self.arlib.ARLoadARQualifierStruct(
-                # ARControlStruct *control: the control record
-                byref(self.control),
-                # ARNameType schema: the schema to build the qualifier for
-                schema_artype,
-                # ARNameType displayTag: the name of the form view to use for
-                # resolving field names
-                display_tag_artype,
-                # char *qualString: the qualification string (query) to search
-                # with
-                qualifier,
+    def _query(
+        self, schema, qualifier, fields, offset, limit, as_rows, sort,
+        restriction=None, timestamp_field_id=None
+    ):
+        """
+        Runs a query as per query, optionally restricting the qualifier
+        further and reading the epoch timestamps of a time field as
+        retrieved (rather than as datetime objects in local time).
 
-                # (return) ARQualifierStruct *qualifier: the newly built
-                # ARQualifierStruct
-                byref(qualifier_struct),
-                # (return) ARStatusList *status: notes, warnings or errors
-                # generated by the operation
-                byref(self.status)
-            ) >= arh.AR_RETURN_ERROR
-        ):
-            self._update_errors()
-            self.arlib.FreeARQualifierStruct(
-                byref(qualifier_struct), arh.FALSE
-            )
-            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
-            raise ARSError(
-                'Unable to load the qualifier using the provided '
-                'qualification string for schema {}'.format(schema)
-            )
+        :param str schema: the schema name to run the query against
+        :param qualifier: the query determining which records to retrieve
+        :type qualifier: string or Qualifier
+        :param fields: a list of field names to retrieve from the schema
+        :type fields: list of strings
+        :param int offset: the index of the first record to retrieve
+        :param int limit: limit the number of returned results to a given
+                          number
+        :param bool as_rows: whether to return entry values as Row objects
+                             rather than dicts
+        :param sort: the fields to sort the records by as per query
+        :type sort: list of strings or tuples
+        :param Qualifier restriction: a qualifier which records must also
+                                      match (None applies no restriction)
+        :param int timestamp_field_id: the field id of a retrieved time field
+                                       whose epoch timestamps are returned
+        :return: a tuple containing a list of the entries retrieved as per
+                 query and a list of the epoch timestamps of the time field
+                 for each entry (None if no time field was requested)
+        :raises: ARSError
+        """
 
-        # Note that we don't run FreeARQualifierStruct here as we need the
-        # qualifier for the next call
-        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+        # Ensure we have the field and enum details of the fields used
+        self.update_fields(schema, fields)
 
-        field_list = arh.AREntryListFieldList()
-        field_list.numItems = len(fields)
-        field_list.fieldsList = cast(
-            self.clib.malloc(
-                field_list.numItems * sizeof(arh.AREntryListFieldStruct)
-            ), POINTER(arh.AREntryListFieldStruct)
-        )
+        # Validate that all fields exist before building the
+        # AREntryListFieldList struct
+        self._validate_fields(schema, fields)
+        sort_list = self._build_sort_list(schema, sort)
 
-        for i, field in enumerate(fields):
-            field_list.fieldsList[i].fieldId = (
-                self.field_name_to_id_cache[schema][field]
-            )
-            # From the C API Reference document (Chapter 3 / Entries)
-            # For ARGetListEntryWithFields, set this value to a number greater
-            # than 0.
-            field_list.fieldsList[i].columnWidth = 1
-            # From the C API Reference document (Chapter 3 / Entries)
-            # For ARGetListEntryWithFields, set this value to one blank space.
-            field_list.fieldsList[i].separator = b' '
+        cached_qualifier = self._acquire_qualifier(schema, qualifier)
 
-        schema_artype = arh.ARNameType()
-        schema_artype.value = schema
-        num_matches = c_uint()
-        entry_list = arh.AREntryListFieldValueList()
+        # The request struct is reused between calls and must not be freed
+        field_list = self.scratch.entry_list_field_list([
+            self.field_name_to_id_cache[schema][field] for field in fields
+        ])
 
-        if (
-            self.arlib.ARGetListEntryWithFields(
-                # ARControlStruct *control: the control record
-                byref(self.control),
-                # ARNameType schema: the schema to get entries for
-                schema_artype,
-                # ARQualifierStruct *qualifier: a query specifying entries to
-                # retrieve
-                byref(qualifier_struct),
-                # AREntryListFieldList *getListFields: a list of fields to
-                # retrieve with each entry
-                byref(field_list),
-                # ARSortList *sortList: list of fields to sort results by
-                # (NULL for default sort)
-                None,
-                # unsigned int firstRetrieve: the first record to retrieve
-                offset,
-                # unsigned int maxRetrieve: the maximum number of items to
-                # retrieve
-                limit,
-                # ARBoolean useLocale: whether to search based on locale
-                arh.FALSE,
+        try:
+            qualifier_struct = cached_qualifier.struct
+            if restriction is not None:
+                qualifier_struct = self._restrict_qualifier(
+                    schema, qualifier_struct, restriction
+                )
 
-                # (return) AREntryListFieldValueList *entryList: the entries
-                # retrieved
-                byref(entry_list),
-                # (return) unsigned int numMatches: the number of entries
-                # retrieved
-                byref(num_matches),
-                # (return) ARStatusList *status: notes, warnings or errors
-                # generated by the operation
-                byref(self.status)
-            ) >= arh.AR_RETURN_ERROR
-        ):
-            self._update_errors()
-            self.arlib.FreeARQualifierStruct(
-                byref(qualifier_struct), arh.FALSE
-            )
-            self.arlib.FreeAREntryListFieldList(byref(field_list), arh.FALSE)
-            self.arlib.FreeAREntryListFieldValueList(
-                byref(entry_list), arh.FALSE
-            )
-            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
-            raise ARSError(
-                'Unable to obtain a list of entries using the provided '
-                'qualification string for schema {}'.format(schema)
+            entry_list, self.match_count = self._get_list_entry_with_fields(
+                schema, qualifier_struct, field_list, offset, limit,
+                sort_list
             )
+            try:
+                timestamps = None
+                if timestamp_field_id is not None:
+                    timestamps = self._extract_timestamps(
+                        entry_list, timestamp_field_id
+                    )
 
-        entries = []
-
-        for i in range(entry_list.numItems):
-            # Entries containing more than one id are not supported
-            # (ids are supposed to be unique aren't they?)
-            if entry_list.entryList[i].entryId.numItems != 1:
-                self.arlib.FreeARQualifierStruct(
-                    byref(qualifier_struct), arh.FALSE
-                )
-                self.arlib.FreeAREntryListFieldList(
-                    byref(field_list), arh.FALSE
+                started = default_timer()
+                plan = self._decoding_plan(schema, fields)
+                entries = self._extract_entries(
+                    entry_list, plan, self._row_type(schema, plan, as_rows)
                 )
+                if self.instrumentation is not None:
+                    self._record_decode(schema, started, entries)
+                return entries, timestamps
+            finally:
                 self.arlib.FreeAREntryListFieldValueList(
                     byref(entry_list), arh.FALSE
                 )
-                self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
-                raise ARSError(
-                    'One or more entries contained multiple IDs that are not '
-                    'supported by PyRemedy'
-                )
+        finally:
+            self.qualifier_cache.release(cached_qualifier)
+
+    def iter_query(
+        self, schema, qualifier, fields, page_size=100,
+        offset=arh.AR_START_WITH_FIRST_ENTRY,
+        limit=arh.AR_NO_MAX_LIST_RETRIEVE, as_rows=False, sort=None,
+        keyset=False
+    ):
+        """
+        Runs a specified qualification string against a chosen schema and
+        yields the related records one at a time.  Records are retrieved from
+        the server in pages of page_size entries and each page is freed
+        before the next is requested, so memory usage depends on the page
+        size rather than on the size of the result set.
 
-            # Extract the entry id and create an empty dict for the values
-            entry_id = entry_list.entryList[i].entryId.entryIdList[0].value
-            entry_values = {}
+        Offset paging requires the server to skip all earlier records for
+        each page, so pages become slower towards the end of large result
+        sets.  With keyset enabled, records are retrieved in entry id order
+        and each page continues from the last entry id of the previous page
+        instead, keeping the cost of each page constant and ensuring that
+        records created during iteration don't shift later pages.
 
-            # Grab the values list for the entry
-            field_value_list = entry_list.entryList[i].entryValues.contents
+        Please note that as this is a generator, the query is only sent to
+        the server once iteration begins.
 
-            for j in range(field_value_list.numItems):
-                field_id = field_value_list.fieldValueList[j].fieldId
-                field_name = self.field_id_to_name_cache[schema][field_id]
-                value_struct = field_value_list.fieldValueList[j].value
+        :param str schema: the schema name to run the query against
+        :param qualifier: the query determining which records to retrieve
+        :type qualifier: string or Qualifier
+        :param fields: a list of field names to retrieve from the schema
+        :type fields: list of strings
+        :param int page_size: the number of records to retrieve per call to
+                              the server
+        :param int offset: the index of the first record to retrieve
+        :param int limit: limit the number of returned results to a given
+                          number
+        :param bool as_rows: whether to return entry values as Row objects
+                             rather than dicts
+        :param sort: the fields to sort the records by on the server, given
+                     as field names (or field ids) or as tuples of the field
+                     and 'asc' or 'desc' (e.g. [('Modified Date', 'desc')])
+        :type sort: list of strings or tuples
+        :param bool keyset: whether to page through records in entry id
+                            order using the last entry id of each page
+                            rather than an offset (which can't be combined
+                            with offset or sort)
+        :return: a generator of tuples containing the entries matching the
+                 criteria specified whereby each tuple contains the entry id
+                 and entry values
+        :raises: ARSError
+        """
 
-                # Extract the appropriate piece of data depending on its type
+        # Clear previous errors
+        self.errors = []
+
+        if page_size < 1:
+            raise ARSError(
+                'The page size must be a positive number but {} was '
+                'specified'.format(page_size)
+            )
+
+        # Ensure we have the field and enum details of the fields used
+        self.update_fields(schema, fields)
+
+        # Validate that all fields exist before allocating any memory
+        self._validate_fields(schema, fields)
+        sort_list = self._build_keyset_sort_list(schema, sort, offset, keyset)
+
+        # The same decoding plan is used for every page
+        plan = self._decoding_plan(schema, fields)
+        row_type = self._row_type(schema, plan, as_rows)
+
+        def decode(entry_list):
+            started = default_timer()
+            entries = self._extract_entries(entry_list, plan, row_type)
+            if self.instrumentation is not None:
+                self._record_decode(schema, started, entries)
+            return entries
+
+        pages = self._iter_pages(
+            schema, qualifier, fields, page_size, offset, limit, sort_list,
+            decode, keyset
+        )
+
+        try:
+            for entries in pages:
+                for entry in entries:
+                    yield entry
+        finally:
+            pages.close()
+
+    def query_columns(
+        self, schema, qualifier, fields, page_size=1000,
+        offset=arh.AR_START_WITH_FIRST_ENTRY,
+        limit=arh.AR_NO_MAX_LIST_RETRIEVE, sort=None, keyset=False
+    ):
+        """
+        Runs a specified qualification string against a chosen schema and
+        returns the related records as columns of values rather than one
+        dict per record, which greatly reduces the memory required by large
+        result sets.  Records are retrieved in pages as per iter_query.
+
+        Integer and real fields are returned as array.array columns, time
+        fields as arrays of epoch timestamps and enum fields as arrays of
+        enum ids (see the labels attribute for the related names).  All
+        other fields are returned as lists.  NULL values are stored as 0 in
+        arrays and None in lists and are flagged in the nulls attribute.
+
+        :param str schema: the schema name to run the query against
+        :param qualifier: the query determining which records to retrieve
+        :type qualifier: string or Qualifier
+        :param fields: a list of field names to retrieve from the schema
+        :type fields: list of strings
+        :param int page_size: the number of records to retrieve per call to
+                              the server
+        :param int offset: the index of the first record to retrieve
+        :param int limit: limit the number of returned results to a given
+                          number
+        :param sort: the fields to sort the records by on the server, given
+                     as field names (or field ids) or as tuples of the field
+                     and 'asc' or 'desc' (e.g. [('Modified Date', 'desc')])
+        :type sort: list of strings or tuples
+        :param bool keyset: whether to page through records in entry id
+                            order using the last entry id of each page
+                            rather than an offset (which can't be combined
+                            with offset or sort)
+        :return: a Columns object containing the entry ids and the column of
+                 values for each field
+        :raises: ARSError
+        """
+
+        # Clear previous errors
+        self.errors = []
+
+        if page_size < 1:
+            raise ARSError(
+                'The page size must be a positive number but {} was '
+                'specified'.format(page_size)
+            )
+
+        # Ensure we have the field and enum details of the fields used
+        self.update_fields(schema, fields)
+
+        # Validate that all fields exist before allocating any memory
+        self._validate_fields(schema, fields)
+        sort_list = self._build_keyset_sort_list(schema, sort, offset, keyset)
+
+        columns = Columns(self, schema, fields)
+
+        def decode(entry_list):
+            started = default_timer()
+            added = columns._add_entries(entry_list)
+            if self.instrumentation is not None:
+                self.instrumentation.decode(
+                    schema, added, columns._string_bytes(added),
+                    default_timer() - started
+                )
+            return added
+
+        for added in self._iter_pages(
+            schema, qualifier, fields, page_size, offset, limit, sort_list,
+            decode, keyset
+        ):
+            pass
+
+        columns._finish()
+        return columns
+
+    def count(self, schema, qualifier):
+        """
+        Determines the number of records matching a specified qualification
+        string without transferring the records themselves.
+
+        :param str schema: the schema name to run the query against
+        :param qualifier: the query determining which records to count
+        :type qualifier: string or Qualifier
+        :return: the number of matching records
+        :raises: ARSError
+        """
+
+        # Ensure we have the names of all fields on the schema (the fields
+        # of the qualifier are resolved when it is compiled)
+        self.update_fields(schema, [])
+
+        # Request a single entry with only its entry id, as the number of
+        # matches is returned along with the entries retrieved.  The field
+        # list is reused between calls and must not be freed.
+        field_list = self.scratch.entry_list_field_list([
+            arh.AR_CORE_ENTRY_ID
+        ])
+
+        cached_qualifier = self._acquire_qualifier(schema, qualifier)
+
+        try:
+            entry_list, self.match_count = self._get_list_entry_with_fields(
+                schema, cached_qualifier.struct, field_list,
+                arh.AR_START_WITH_FIRST_ENTRY, 1
+            )
+            self.arlib.FreeAREntryListFieldValueList(
+                byref(entry_list), arh.FALSE
+            )
+        finally:
+            self.qualifier_cache.release(cached_qualifier)
+
+        return self.match_count
+
+    def statistics(
+        self, schema, qualifier, operation, target_field=None, group_by=None
+    ):
+        """
+        Calculates a statistic over the records matching a specified
+        qualification string on the server, optionally grouped by the values
+        of one or more fields, so that only the results are transferred::
+
+            # The number of open tickets for each status and priority
+            ars.statistics(
+                'HPD:Help Desk', "'Status' < \"Resolved\"", 'count',
+                group_by=['Status', 'Priority']
+            )
+
+        :param str schema: the schema name to calculate statistics for
+        :param qualifier: the query determining which records to include
+        :type qualifier: string or Qualifier
+        :param str operation: the statistic to calculate ('count', 'sum',
+                              'avg', 'min' or 'max')
+        :param target_field: the field name (or field id) to calculate the
+                             statistic for (optional for 'count')
+        :type target_field: string or int
+        :param group_by: the field names (or field ids) to group results by
+        :type group_by: list of strings or ints
+        :return: a list of tuples containing the values of the group by
+                 fields followed by the statistic for each group
+        :raises: ARSError
+        """
+
+        # Clear previous errors
+        self.errors = []
+
+        try:
+            statistic = STATISTICS_OPERATIONS[operation]
+        except KeyError:
+            raise ARSError(
+                'An invalid statistics operation {} was specified (expected '
+                'one of {})'.format(
+                    operation, ', '.join(sorted(STATISTICS_OPERATIONS))
+                )
+            )
+
+        if target_field is None and statistic != arh.AR_STAT_OP_COUNT:
+            raise ARSError(
+                'A target field is required to calculate the {} '
+                'statistic'.format(operation)
+            )
+
+        # Ensure we have the field and enum details of the fields used
+        self.update_fields(schema, group_by or [])
+
+        # Resolve all fields before allocating any memory
+        group_by_ids = [
+            self._resolve_field(schema, field) for field in group_by or []
+        ]
+        converters = [
+            build_converter(self, schema, field_id)
+            for field_id in group_by_ids
+        ]
+
+        # The target is not required when counting records
+        target = None
+        if target_field is not None:
+            target = arh.ARFieldValueOrArithStruct()
+            target.tag = arh.AR_FIELD
+            target.u.fieldId = self._resolve_field(schema, target_field)
+
+        cached_qualifier = self._acquire_qualifier(schema, qualifier)
+
+        # The request structs are reused between calls and must not be freed
+        schema_artype = self.scratch.name(schema)
+        group_by_list = (
+            self.scratch.internal_id_list(group_by_ids)
+            if group_by_ids else None
+        )
+
+        results = arh.ARStatisticsResultList()
+
+        try:
+            if (
+                self.arlib.ARGetEntryStatistics(
+                    # ARControlStruct *control: the control record
+                    byref(self.control),
+                    # ARNameType schema: the schema to calculate statistics
+                    # for
+                    schema_artype,
+                    # ARQualifierStruct *qualifier: a query specifying the
+                    # entries to include
+                    byref(cached_qualifier.struct),
+                    # ARFieldValueOrArithStruct *target: the value to
+                    # calculate the statistic for (NULL when counting)
+                    byref(target) if target is not None else None,
+                    # unsigned int statistic: the statistic to calculate
+                    statistic,
+                    # ARInternalIdList *groupByList: the fields to group
+                    # results by (NULL for a single result)
+                    (
+                        byref(group_by_list)
+                        if group_by_list is not None else None
+                    ),
+
+                    # (return) ARStatisticsResultList *results: the statistic
+                    # calculated for each group
+                    byref(results),
+                    # (return) ARStatusList *status: notes, warnings or
+                    # errors generated by the operation
+                    byref(self.status)
+                ) >= arh.AR_RETURN_ERROR
+            ):
+                self._update_errors()
+                self.arlib.FreeARStatisticsResultList(
+                    byref(results), arh.FALSE
+                )
+                self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+                raise ARSError(
+                    'Unable to calculate the {} statistic for schema '
+                    '{}'.format(operation, schema)
+                )
+        finally:
+            self.qualifier_cache.release(cached_qualifier)
+
+        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+
+        try:
+            rows = []
+            for i in range(results.numItems):
+                result = results.resultList[i]
+                group_values = result.groupByValues
+                rows.append(tuple(
+                    [
+                        convert(group_values.valueList[j])
+                        for j, convert in enumerate(converters)
+                    ] + [decode_value(result.result)]
+                ))
+        finally:
+            self.arlib.FreeARStatisticsResultList(byref(results), arh.FALSE)
+
+        return rows
+
+    def create(self, schema, entry_values):
+        """
+        Creates a new entry in a given schema using the provided entry
+        values.
+
+        :param str schema: the schema where the entry is to be created
+        :param entry_values: a dict containing the field names and values
+                             for the new entry
+        :type entry_values: dict of string to values corresponding to the type
+                            of the respective field
+        :return: the entry id of the newly created entry
+        :raises: ARSError
+        """
+
+        # Ensure we have the field and enum details of the fields used
+        self.update_fields(schema, entry_values.keys())
+
+        # Validate that all fields exist.  Note that this is performed here
+        # so that we aren't in the middle of allocating memory to the
+        # ARFieldValueList struct when we realise a field is invalid.
+        self._validate_fields(schema, entry_values.keys())
+
+        field_value_list = self._build_field_value_list(schema, entry_values)
+        return self._create_entry(schema, field_value_list)
+
+    def update(self, schema, entry_id, entry_values):
+        """
+        Updates a chosen entry in a given schema using the provided
+        entry values.
+
+        :param str schema: the schema where the entry is located
+        :param str entry_id: the entry id of the record to be updated
+        :param entry_values: a dict containing the field names and values
+                             to be updated
+        :type entry_values: dict of string to values corresponding to the type
+                            of the respective field
+        :raises: ARSError
+        """
+
+        # Ensure we have the field and enum details of the fields used
+        self.update_fields(schema, entry_values.keys())
+
+        # Validate that all fields exist.  Note that this is performed here
+        # so that we aren't in the middle of allocating memory to the
+        # ARFieldValueList struct when we realise a field is invalid.
+        self._validate_fields(schema, entry_values.keys())
+
+        field_value_list = self._build_field_value_list(schema, entry_values)
+        self._set_entry(schema, entry_id, field_value_list)
+
+    def delete(self, schema, entry_id):
+        """
+        Deletes a particular entry in the requested schema using the
+        given entry id.
+
+        :param str schema: the schema name to delete the entry from
+        :param str entry_id: the entry id of the entry that you wish to delete
+        :raises: ARSError
+        """
+
+        # Clear previous errors
+        self.errors = []
+
+        self._delete_entry(schema, entry_id)
+
+    def bulk_create(self, schema, entries, batch_size=100):
+        """
+        Creates several new entries in a given schema, sending up to
+        batch_size entries to the server at a time in a single bulk entry
+        transaction.
+
+        The values of every entry are converted before the first transaction
+        is sent, so an invalid field or value raises ARSError without any
+        entries being created.  The server applies each transaction as a
+        whole, so if any entry in a batch fails on the server, none of the
+        entries in that batch are created.  Entries which failed report
+        their own errors while the remaining entries of the batch report the
+        errors of the transaction itself.
+
+        If a transaction can't be sent at all, the ARSError raised has a
+        results attribute containing the results of the entries in the
+        batches which were already sent.
+
+        :param str schema: the schema where the entries are to be created
+        :param entries: a list of dicts containing the field names and values
+                        for each new entry
+        :type entries: list of dicts of string to values corresponding to the
+                       type of the respective field
+        :param int batch_size: the maximum number of entries sent in each
+                               transaction
+        :return: a list containing a tuple for each entry whereby each tuple
+                 contains the entry id of the new entry (or None if it wasn't
+                 created) and a list of the errors encountered for the entry
+        :raises: ARSError
+        """
+
+        # Ensure we have the field and enum details of the fields used
+        entries = list(entries)
+        self.update_fields(schema, set(
+            field for entry_values in entries for field in entry_values
+        ))
+
+        # Convert all entries before any of them are sent to the server
+        self._convert_entries(schema, entries)
+
+        return self._bulk_entry_transactions(
+            schema, entries, batch_size,
+            lambda entry_values, scratch: self._create_entry(
+                schema,
+                self._build_field_value_list(schema, entry_values, scratch),
+                scratch
+            )
+        )
+
+    def bulk_update(self, schema, entries, batch_size=100):
+        """
+        Updates several entries in a given schema, sending up to batch_size
+        updates to the server at a time in a single bulk entry transaction.
+        Values are converted up front and failures are reported per entry as
+        per bulk_create.
+
+        :param str schema: the schema where the entries are located
+        :param entries: a list of tuples containing the entry id of each
+                        record to be updated and a dict of the field names
+                        and values to be updated
+        :type entries: list of (string, dict) tuples
+        :param int batch_size: the maximum number of updates sent in each
+                               transaction
+        :return: a list containing a tuple for each entry whereby each tuple
+                 contains the entry id and a list of the errors encountered
+                 for the entry (which is empty if the entry was updated)
+        :raises: ARSError
+        """
+
+        # Ensure we have the field and enum details of the fields used
+        entries = list(entries)
+        self.update_fields(schema, set(
+            field for entry_id, entry_values in entries
+            for field in entry_values
+        ))
+
+        # Convert all entries before any of them are sent to the server
+        self._convert_entries(
+            schema, [entry_values for entry_id, entry_values in entries]
+        )
+
+        return self._bulk_entry_transactions(
+            schema, entries, batch_size,
+            lambda entry, scratch: self._set_entry(
+                schema, entry[0],
+                self._build_field_value_list(schema, entry[1], scratch),
+                scratch
+            ),
+            [entry_id for entry_id, entry_values in entries]
+        )
+
+    def bulk_delete(self, schema, entry_ids, batch_size=100):
+        """
+        Deletes several entries in the requested schema, sending up to
+        batch_size deletions to the server at a time in a single bulk entry
+        transaction.  Failures are reported per entry as per bulk_create.
+
+        :param str schema: the schema name to delete the entries from
+        :param entry_ids: the entry ids of the entries to delete
+        :type entry_ids: list of strings
+        :param int batch_size: the maximum number of deletions sent in each
+                               transaction
+        :return: a list containing a tuple for each entry whereby each tuple
+                 contains the entry id and a list of the errors encountered
+                 for the entry (which is empty if the entry was deleted)
+        :raises: ARSError
+        """
+
+        entry_ids = list(entry_ids)
+
+        return self._bulk_entry_transactions(
+            schema, entry_ids, batch_size,
+            lambda entry_id, scratch: self._delete_entry(
+                schema, entry_id, scratch
+            ),
+            entry_ids
+        )
+
+    def update_fields(self, schema, fields=None):
+        """
+        Determines the field IDs for all data fields on a chosen schema and
+        then retrieves the related field names and enum mappings.  This method
+        assumes that all field names are unique.
+
+        If the session was created with partial_fields, the fields used by
+        an operation may be provided so that only the names of all fields
+        are retrieved along with the data types and enum mappings of the
+        fields provided.  Details of further fields are retrieved and merged
+        into the caches as they are used.
+
+        :param str schema: the schema name to retrieve field information for
+        :param fields: the field names (or field ids) whose data types and
+                       enum mappings are required (None requires the details
+                       of all fields)
+        :type fields: list of strings or ints
+        :raises: ARSError
+        """
+
+        # Clear previous errors
+        self.errors = []
+
+        if not self.partial_fields:
+            fields = None
+
+        # Use the cache (or else the persistent cache) if possible
+        if not self._fields_cached(schema) and (
+            self.metadata_cache is None or not self._load_fields(schema)
+        ):
+            # Note the time before retrieving fields so that any changes made
+            # while they are being retrieved are picked up by a later refresh
+            retrieved_at = int(time.time())
+
+            # Only field names are retrieved when just a few fields are used
+            fields_retrieved = self._get_multiple_fields(
+                schema, self._get_list_field(schema), limits=fields is None
+            )
+
+            with self.field_lock:
+                # Another session sharing the caches may have published the
+                # schema while its fields were being retrieved, in which case
+                # its caches are kept and only gain any missing details
+                if self._fields_cached(schema):
+                    self._merge_fields(schema, fields_retrieved)
+                else:
+                    self._publish_fields(
+                        schema, fields_retrieved, retrieved_at
+                    )
+
+                    # Save the field details for use by future sessions
+                    if self.metadata_cache is not None:
+                        self._save_fields(schema)
+
+        # Retrieve the details of any fields that have only been listed
+        field_ids = self._unresolved_field_ids(schema, fields)
+        if field_ids:
+            self._merge_fields(
+                schema, self._get_multiple_fields(schema, field_ids)
+            )
+
+    def refresh(self):
+        """
+        Refreshes the cached schema list and the cached field and enum
+        details of any schemas which have been modified on the server since
+        they were retrieved.  Only the fields that were added, modified or
+        removed are retrieved again, while schemas which have been deleted
+        on the server are removed from the caches.
+
+        :return: a list of schema names whose field details were refreshed
+                 or removed
+        :raises: ARSError
+        """
+
+        # Clear previous errors
+        self.errors = []
+
+        timestamps = list(self.field_timestamp_cache.values())
+        if self.schema_cache is not None:
+            timestamps.append(self.schema_timestamp)
+
+        # Nothing has been cached yet so there is nothing to refresh
+        if not timestamps:
+            return []
+
+        # Deleted schemas are only found by listing every schema, as they
+        # aren't among the schemas changed since a given time
+        refreshed_at = int(time.time())
+        schemas = self._get_list_schema()
+        changed_schemas = self._get_list_schema(
+            min(timestamps) - METADATA_CLOCK_SKEW
+        )
+
+        if self.schema_cache is not None:
+            self.schema_cache = schemas
+            self.schema_timestamp = refreshed_at
+
+        refreshed_schemas = []
+
+        existing_schemas = set(schemas)
+        for schema in list(self.field_timestamp_cache):
+            if schema not in existing_schemas:
+                with self.field_lock:
+                    self._drop_fields(schema)
+                refreshed_schemas.append(schema)
+
+        for schema in changed_schemas:
+            timestamp = self.field_timestamp_cache.get(schema)
+            if timestamp is None:
+                continue
+
+            changed_since = timestamp - METADATA_CLOCK_SKEW
+            if self._refresh_fields(schema, changed_since, refreshed_at):
+                refreshed_schemas.append(schema)
+
+        return refreshed_schemas
+
+    def _refresh_fields(self, schema, changed_since, refreshed_at):
+        """
+        Updates the cached field and enum details of a schema with the
+        fields added, modified or removed since a given time.  Fields are
+        retrieved without holding the field lock, which is only held while
+        the refreshed details are published, so that sessions sharing the
+        caches aren't held up by the calls made to the server.
+
+        :param str schema: the schema name to refresh field information for
+        :param int changed_since: the epoch timestamp to retrieve fields
+                                  modified since
+        :param int refreshed_at: the epoch timestamp at which the refresh
+                                 started
+        :return: whether any fields were added, modified or removed
+        :raises: ARSError
+        """
+
+        # Listing field ids is cheap and is the only way to find out which
+        # fields have been removed
+        field_ids = self._get_list_field(schema)
+        changed_field_ids = set(self._get_list_field(schema, changed_since))
+
+        with self.field_lock:
+            if not self._fields_cached(schema):
+                return False
+            cached_fields = self._cached_fields(schema)
+
+        detailed_field_ids = set(
+            field_id for field_id, field_name, data_type, enums
+            in cached_fields if data_type is not None
+        )
+        cached_field_ids = set(field[0] for field in cached_fields)
+
+        changed_field_ids.update(
+            field_id for field_id in field_ids
+            if field_id not in cached_field_ids
+        )
+
+        if not changed_field_ids and cached_field_ids.issubset(field_ids):
+            with self.field_lock:
+                if self._fields_cached(schema):
+                    self.field_timestamp_cache[schema] = max(
+                        self.field_timestamp_cache[schema], refreshed_at
+                    )
+            return False
+
+        # Fields which have only been listed are listed again, while all
+        # others have their details retrieved
+        listed_field_ids = [
+            field_id for field_id in field_ids
+            if field_id in changed_field_ids and
+            self.partial_fields and field_id not in detailed_field_ids
+        ]
+        retrieved_field_ids = [
+            field_id for field_id in field_ids
+            if field_id in changed_field_ids and
+            field_id not in listed_field_ids
+        ]
+
+        changed_fields = {}
+        for retrieve_field_ids, limits in [
+            (retrieved_field_ids, True), (listed_field_ids, False)
+        ]:
+            if retrieve_field_ids:
+                changed_fields.update(
+                    (field[0], field) for field in self._get_multiple_fields(
+                        schema, retrieve_field_ids, limits
+                    )
+                )
+
+        with self.field_lock:
+            # The schema may have been removed by another session sharing
+            # the caches in the meantime
+            if not self._fields_cached(schema):
+                return False
+
+            # Details merged by other sessions since the fields were
+            # retrieved are kept.  Modified fields are replaced in place and
+            # new fields are added to the end.
+            existing_field_ids = set(field_ids)
+            fields = [
+                changed_fields.pop(field[0], field)
+                for field in self._cached_fields(schema)
+                if field[0] in existing_field_ids
+            ]
+            fields.extend(
+                changed_fields[field_id] for field_id in field_ids
+                if field_id in changed_fields
+            )
+
+            self._publish_fields(schema, fields, refreshed_at)
+
+            if self.metadata_cache is not None:
+                self._save_fields(schema)
+
+        return True
+
+    def _drop_fields(self, schema):
+        """
+        Removes the field and enum details of a schema which no longer
+        exists from the caches.  The field lock must be held by the caller.
+
+        :param str schema: the schema name to remove
+        """
+
+        # The enum caches are removed first as the cache check in
+        # update_fields relies on their presence
+        for cache in [
+            self.enum_name_to_id_cache, self.enum_id_to_name_cache,
+            self.field_id_to_type_cache, self.field_name_to_id_cache,
+            self.field_id_to_name_cache, self.field_timestamp_cache,
+            self.field_generation_cache
+        ]:
+            cache.pop(schema, None)
+
+        self.qualifier_cache.invalidate(schema)
+
+    def _unresolved_field_ids(self, schema, fields):
+        """
+        Determines which fields have been listed without their data types
+        and enum mappings having been retrieved.
+
+        :param str schema: the schema name the fields belong to
+        :param fields: the field names (or field ids) to check (None checks
+                       all fields)
+        :type fields: list of strings or ints
+        :return: a list of field ids
+        """
+
+        field_id_to_name = self.field_id_to_name_cache[schema]
+        field_id_to_type = self.field_id_to_type_cache[schema]
+
+        if fields is None:
+            if len(field_id_to_type) == len(field_id_to_name):
+                return []
+            return [
+                field_id for field_id in field_id_to_name
+                if field_id not in field_id_to_type
+            ]
+
+        field_ids = []
+        for field in fields:
+            if not isinstance(field, integer_types):
+                field = self.field_name_to_id_cache[schema].get(field)
+
+            # Fields which don't exist are reported once they are validated
+            if (
+                field in field_id_to_name and
+                field not in field_id_to_type and field not in field_ids
+            ):
+                field_ids.append(field)
+
+        return field_ids
+
+    def _merge_fields(self, schema, fields):
+        """
+        Adds the details of fields which have been retrieved to the cached
+        field and enum details of a schema.  The caches are updated in place
+        so that details merged concurrently by sessions sharing the caches
+        are kept, and qualifiers loaded against the schema remain valid.
+
+        :param str schema: the schema name the details belong to
+        :param list fields: a list of tuples containing the field id, field
+                            name, data type and enum mappings (or None) of
+                            each field
+        """
+
+        with self.field_lock:
+            field_id_to_name = self.field_id_to_name_cache[schema]
+            field_id_to_type = self.field_id_to_type_cache[schema]
+            enum_tables = self.enum_id_to_name_cache[schema].tables
+            merged = False
+
+            for field_id, field_name, data_type, enums in fields:
+                # Skip fields which have been removed by a refresh or whose
+                # details are already known
+                if (
+                    data_type is None or field_id not in field_id_to_name or
+                    field_id in field_id_to_type
+                ):
+                    continue
+
+                # The data type is added last as it marks the details of the
+                # field as known
+                if enums is not None:
+                    enum_tables[field_id] = enums
+                field_id_to_type[field_id] = data_type
+                merged = True
+
+            if merged and self.metadata_cache is not None:
+                self._save_fields(schema)
+
+    def _load_fields(self, schema):
+        """
+        Loads the field and enum details of a schema from the persistent
+        metadata cache, provided the schema hasn't been modified on the server
+        since they were saved.
+
+        :param str schema: the schema name to load field information for
+        :return: whether the field details were loaded
+        :raises: ARSError
+        """
+
+        record = self.metadata_cache.load(self.control.server, schema)
+        if record is None:
+            return False
+
+        saved_at, metadata = record
+
+        # A single call listing the schemas changed since the details were
+        # saved is far cheaper than retrieving all field details again
+        if schema in self._get_list_schema(saved_at - METADATA_CLOCK_SKEW):
+            return False
+
+        enums = dict(metadata['enums'])
+        fields = [
+            (field_id, field_name, data_type, enums.get(field_id))
+            for field_id, field_name, data_type in metadata['fields']
+        ]
+
+        with self.field_lock:
+            # Another session sharing the caches may have published the
+            # schema in the meantime
+            if not self._fields_cached(schema):
+                self._publish_fields(schema, fields, saved_at)
+
+        return True
+
+    def _save_fields(self, schema):
+        """
+        Saves the cached field and enum details of a schema to the
+        persistent metadata cache.
+
+        :param str schema: the schema name to save field information for
+        """
+
+        fields = self._cached_fields(schema)
+
+        self.metadata_cache.save(
+            self.control.server, schema, self.field_timestamp_cache[schema], {
+                'fields': [
+                    (field_id, field_name, data_type)
+                    for field_id, field_name, data_type, enums in fields
+                ],
+                'enums': [
+                    (field_id, enums)
+                    for field_id, field_name, data_type, enums in fields
+                    if enums is not None
+                ]
+            }
+        )
+
+    def _fields_cached(self, schema):
+        """
+        Determines whether the field and enum details of a schema are held
+        in the caches.
+
+        :param str schema: the schema name to check
+        :return: whether the schema has been cached
+        """
+
+        return (
+            schema in self.field_id_to_name_cache and
+            schema in self.field_name_to_id_cache and
+            schema in self.field_id_to_type_cache and
+            schema in self.enum_id_to_name_cache and
+            schema in self.enum_name_to_id_cache
+        )
+
+    def _cached_fields(self, schema):
+        """
+        Returns the cached field and enum details of a schema in the form
+        returned by _get_multiple_fields.
+
+        :param str schema: the schema name to return field information for
+        :return: a list of tuples containing the field id, field name, data
+                 type and enum mappings (or None) of each field (the data
+                 type is None if the field has only been listed)
+        """
+
+        enum_tables = self.enum_id_to_name_cache[schema].tables
+
+        return [
+            (
+                field_id, field_name,
+                self.field_id_to_type_cache[schema].get(field_id),
+                enum_tables.get(field_id)
+            )
+            for field_id, field_name
+            in self.field_id_to_name_cache[schema].items()
+        ]
+
+    def _publish_fields(self, schema, fields, retrieved_at):
+        """
+        Replaces the cached field and enum details of a schema.  The field
+        lock must be held by the caller.
+
+        :param str schema: the schema name the details belong to
+        :param list fields: a list of tuples containing the field id, field
+                            name, data type and enum mappings (or None) of
+                            each field
+        :param int retrieved_at: the epoch timestamp at which the details
+                                 were retrieved
+        """
+
+        # Build the name and enum caches for this schema locally so that
+        # they are only published once complete (the caches may be shared
+        # between sessions running in other threads)
+        field_id_to_name = OrderedDict()
+        field_name_to_id = OrderedDict()
+        field_id_to_type = OrderedDict()
+        enum_tables = OrderedDict()
+
+        for field_id, field_name, data_type, enums in fields:
+            # Save the field id to name mapping in the cache
+            field_id_to_name[field_id] = field_name
+
+            # Save the field name to id mapping in the cache
+            field_name_to_id[field_name] = field_id
+
+            # Save the field id to type mapping in the cache (unless only
+            # the name of the field has been retrieved)
+            if data_type is not None:
+                field_id_to_type[field_id] = data_type
+
+            # Save the enum ids and names if this field is an enum type (the
+            # mappings are only built once the field is used)
+            if enums is not None:
+                enum_tables[field_id] = enums
+
+        # Publish the completed caches for this schema.  The enum caches are
+        # published last as the cache check in update_fields relies on their
+        # presence.
+        self.field_timestamp_cache[schema] = retrieved_at
+        self.field_id_to_name_cache[schema] = field_id_to_name
+        self.field_name_to_id_cache[schema] = field_name_to_id
+        self.field_id_to_type_cache[schema] = field_id_to_type
+        self.enum_id_to_name_cache[schema] = EnumMappings(
+            enum_tables, enum_id_to_name
+        )
+        self.enum_name_to_id_cache[schema] = EnumMappings(
+            enum_tables, enum_name_to_id
+        )
+
+        # Qualifiers loaded against previous field definitions may no longer
+        # be valid.  Those of this session are freed straight away, while
+        # sessions sharing the caches reload theirs once they see the new
+        # generation.
+        self.field_generation_cache[schema] = next(FIELD_GENERATIONS)
+        self.qualifier_cache.invalidate(schema)
+
+    def _validate_fields(self, schema, fields):
+        """
+        Ensures that all the field names provided exist in the chosen schema.
+
+        :param str schema: the schema name the fields belong to
+        :param fields: a list of field names to validate
+        :type fields: list of strings
+        :raises: ARSError
+        """
+
+        for field in fields:
+            if field not in self.field_name_to_id_cache[schema]:
+                raise ARSError(
+                    'A field with name {} does not exist in schema '
+                    '{}'.format(field, schema)
+                )
+
+    def _build_field_value_list(self, schema, entry_values, scratch=None):
+        """
+        Populates a scratch ARFieldValueList from a dict of field names and
+        values.  The list is reused between calls and must not be freed.
+
+        :param str schema: the schema name the fields belong to
+        :param dict entry_values: the field names and values to include
+        :param ScratchStructs scratch: the structs to populate (defaults to
+                                       those of the session)
+        :return: the populated ARFieldValueList
+        :raises: ARSError
+        """
+
+        if scratch is None:
+            scratch = self.scratch
+
+        field_value_list = scratch.field_value_list(len(entry_values))
+
+        for i, (field_name, value) in enumerate(entry_values.items()):
+            field_id = self.field_name_to_id_cache[schema][field_name]
+            self._update_field(
+                schema, field_id, value, field_value_list.fieldValueList[i]
+            )
+
+        return field_value_list
+
+    def _create_entry(self, schema, field_value_list, scratch=None):
+        """
+        Creates a new entry using ARCreateEntry.  Within a bulk entry
+        transaction, the call is queued and the entry id returned is empty.
+
+        :param str schema: the schema where the entry is to be created
+        :param ARFieldValueList field_value_list: the field values of the
+                                                  new entry
+        :param ScratchStructs scratch: the structs used for the call
+                                       (defaults to those of the session)
+        :return: the entry id of the newly created entry
+        :raises: ARSError
+        """
+
+        if scratch is None:
+            scratch = self.scratch
+
+        entry_id_artype = arh.AREntryIdType()
+        schema_artype = scratch.name(schema)
+
+        if (
+            self.arlib.ARCreateEntry(
+                # ARControlStruct *control: the control record
+                byref(self.control),
+                # ARNameType schema: the name of the schema to create the
+                # entry in
+                schema_artype,
+                # ARFieldValueList *fieldList: a list of key/value pairs which
+                # identify the data for the new entry
+                byref(field_value_list),
+
+                # (return) AREntryIdType entryId: the entry id of the newly
+                # created entry
+                entry_id_artype,
+                # (return) ARStatusList *status: notes, warnings or errors
+                # generated by the operation
+                byref(self.status)
+            ) >= arh.AR_RETURN_ERROR
+        ):
+            self._update_errors(schema)
+            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+            raise ARSError(
+                'Unable to create a new entry for schema {}'.format(schema)
+            )
+
+        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+
+        # Return the newly created entry id to the caller
+        return entry_id_artype.value
+
+    def _set_entry(self, schema, entry_id, field_value_list, scratch=None):
+        """
+        Updates an entry using ARSetEntry.
+
+        :param str schema: the schema where the entry is located
+        :param str entry_id: the entry id of the record to be updated
+        :param ARFieldValueList field_value_list: the field values to be
+                                                  updated
+        :param ScratchStructs scratch: the structs used for the call
+                                       (defaults to those of the session)
+        :raises: ARSError
+        """
+
+        if scratch is None:
+            scratch = self.scratch
+
+        # Prepare the entry id struct
+        entry_id_list = scratch.entry_id_list(entry_id)
+        schema_artype = scratch.name(schema)
+
+        if (
+            self.arlib.ARSetEntry(
+                # ARControlStruct *control: the control record
+                byref(self.control),
+                # ARNameType schema: the name of the schema containing the
+                # entry to be updated
+                schema_artype,
+                # AREntryIdList *entryId: the id of the entry to update
+                byref(entry_id_list),
+                # ARFieldValueList *fieldList: a list of key/value pairs to
+                # update
+                byref(field_value_list),
+                # ARTimestamp getTime: the timestamp specifying when the entry
+                # was last retrieved for validation against the modified date
+                # (to bypass this comparison, pass 0)
+                0,
+                # unsigned int option: whether to update fields in a join
+                # qualification (only applies to join forms)
+                arh.AR_JOIN_SETOPTION_REF,
+
+                # (return) ARStatusList *status: notes, warnings or errors
+                # generated by the operation
+                byref(self.status)
+            ) >= arh.AR_RETURN_ERROR
+        ):
+            self._update_errors(schema)
+            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+            raise ARSError(
+                'Unable to modify entry id {} for schema {}'.format(
+                    entry_id, schema
+                )
+            )
+
+        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+
+    def _delete_entry(self, schema, entry_id, scratch=None):
+        """
+        Deletes an entry using ARDeleteEntry.
+
+        :param str schema: the schema name to delete the entry from
+        :param str entry_id: the entry id of the entry to delete
+        :param ScratchStructs scratch: the structs used for the call
+                                       (defaults to those of the session)
+        :raises: ARSError
+        """
+
+        if scratch is None:
+            scratch = self.scratch
+
+        schema_artype = scratch.name(schema)
+        entry_id_list = scratch.entry_id_list(entry_id)
+
+        if (
+            self.arlib.ARDeleteEntry(
+                # ARControlStruct *control: the control record
+                byref(self.control),
+                # ARNameType schema: the name of the schema containing the
+                # entry to be deleted
+                schema_artype,
+                # AREntryIdList *entryId: the entry to delete
+                byref(entry_id_list),
+                # unsigned int option: the policy used when deleting the entry
+                arh.AR_JOIN_DELOPTION_NONE,
+
+                # (return) ARStatusList *status: notes, warnings or errors
+                # generated by the operation
+                byref(self.status)
+            ) >= arh.AR_RETURN_ERROR
+        ):
+            self._update_errors()
+            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+            raise ARSError(
+                'Unable to delete entry id {} for schema {}'.format(
+                    entry_id, schema
+                )
+            )
+
+        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+
+    def _convert_entries(self, schema, entries):
+        """
+        Ensures that the fields and values of several entries can be
+        converted for a call.  A single set of request structs is reused for
+        every entry, so converting a large number of entries requires no
+        more memory than converting one.
+
+        :param str schema: the schema name the fields belong to
+        :param entries: the field names and values of each entry
+        :type entries: list of dicts
+        :raises: ARSError
+        """
+
+        scratch = ScratchStructs()
+
+        for entry_values in entries:
+            self._validate_fields(schema, entry_values.keys())
+            self._build_field_value_list(schema, entry_values, scratch)
+
+    def _bulk_entry_transactions(
+        self, schema, items, batch_size, queue_call, entry_ids=None
+    ):
+        """
+        Queues a call for each item in bulk entry transactions of up to
+        batch_size items and collects the result of every call.
+
+        Queued calls are only sent when their transaction ends, so each call
+        in a transaction is given its own request structs (rather than the
+        scratch structs of the session, which the next call overwrites).
+        The same batch_size sets of structs are reused by every transaction.
+
+        If a transaction can't be sent, the ARSError raised has a results
+        attribute containing the results of the items in earlier
+        transactions, which have already been applied by the server.
+
+        :param str schema: the schema name the entries belong to
+        :param list items: the items to queue calls for
+        :param int batch_size: the maximum number of calls in a transaction
+        :param queue_call: a function which makes the call for an item using
+                           the ScratchStructs provided
+        :param list entry_ids: the entry id related to each item (None to
+                               use the entry ids returned by create calls)
+        :return: a list of tuples containing the entry id and errors related
+                 to each item
+        :raises: ARSError
+        """
+
+        # Clear previous errors
+        self.errors = []
+
+        if batch_size < 1:
+            raise ARSError(
+                'The batch size must be a positive number but {} was '
+                'specified'.format(batch_size)
+            )
+
+        scratches = [
+            ScratchStructs() for i in range(min(batch_size, len(items)))
+        ]
+
+        results = []
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            if entry_ids is None:
+                batch_entry_ids = [None] * len(batch)
+            else:
+                batch_entry_ids = entry_ids[start:start + batch_size]
+
+            try:
+                self._begin_bulk_entry_transaction()
+
+                # Calls are only queued by the API until the transaction
+                # ends, so any failure here is local and the transaction is
+                # cancelled
                 try:
-                    entry_values[field_name] = self._extract_field(
-                        schema, field_id, value_struct
-                    )
+                    for item, scratch in zip(batch, scratches):
+                        queue_call(item, scratch)
                 except ARSError:
-                    self.arlib.FreeARQualifierStruct(
-                        byref(qualifier_struct), arh.FALSE
-                    )
-                    self.arlib.FreeAREntryListFieldList(
-                        byref(field_list), arh.FALSE
-                    )
-                    self.arlib.FreeAREntryListFieldValueList(
-                        byref(entry_list), arh.FALSE
+                    self._end_bulk_entry_transaction(
+                        schema, arh.AR_BULK_ENTRY_ACTION_CANCEL,
+                        batch_entry_ids
                     )
-                    self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
                     raise
 
-            entries.append((entry_id, entry_values))
+                results.extend(
+                    self._end_bulk_entry_transaction(
+                        schema, arh.AR_BULK_ENTRY_ACTION_SEND, batch_entry_ids
+                    )
+                )
+            except ARSError as e:
+                # Earlier transactions have already been applied, so their
+                # results are reported along with the error
+                e.results = results
+                raise
+
+        return results
+
+    def _begin_bulk_entry_transaction(self):
+        """
+        Starts a bulk entry transaction whereby subsequent entry calls are
+        queued until the transaction ends.
+
+        :raises: ARSError
+        """
+
+        if (
+            self.arlib.ARBeginBulkEntryTransaction(
+                # ARControlStruct *control: the control record
+                byref(self.control),
+
+                # (return) ARStatusList *status: notes, warnings or errors
+                # generated by the operation
+                byref(self.status)
+            ) >= arh.AR_RETURN_ERROR
+        ):
+            self._update_errors()
+            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+            raise ARSError('Unable to begin a bulk entry transaction')
+
+        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+
+    def _end_bulk_entry_transaction(self, schema, action, entry_ids):
+        """
+        Ends a bulk entry transaction, either sending the queued calls to
+        the server or discarding them.
+
+        :param str schema: the schema name the entries belong to
+        :param int action: AR_BULK_ENTRY_ACTION_SEND or
+                           AR_BULK_ENTRY_ACTION_CANCEL
+        :param list entry_ids: the entry id related to each queued call (None
+                               for create calls)
+        :return: a list of tuples containing the entry id and errors related
+                 to each queued call (empty when cancelling)
+        :raises: ARSError
+        """
+
+        bulk_entry_return_list = arh.ARBulkEntryReturnList()
+
+        failed = self.arlib.AREndBulkEntryTransaction(
+            # ARControlStruct *control: the control record
+            byref(self.control),
+            # unsigned int actionType: whether to send or cancel the queued
+            # calls
+            action,
+
+            # (return) ARBulkEntryReturnList *returnList: the result of each
+            # queued call in the order they were made
+            byref(bulk_entry_return_list),
+            # (return) ARStatusList *status: notes, warnings or errors
+            # generated by the operation
+            byref(self.status)
+        ) >= arh.AR_RETURN_ERROR
+
+        transaction_errors = []
+        if failed:
+            self._update_errors(schema)
+            transaction_errors = self._status_errors(self.status, schema)
+        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+
+        if action == arh.AR_BULK_ENTRY_ACTION_CANCEL:
+            self.arlib.FreeARBulkEntryReturnList(
+                byref(bulk_entry_return_list), arh.FALSE
+            )
+            return []
+
+        if failed and bulk_entry_return_list.numItems == 0:
+            raise ARSError(
+                'Unable to complete the bulk entry transaction for schema '
+                '{}'.format(schema)
+            )
+
+        results = []
+        for i, entry_id in enumerate(entry_ids):
+            if i >= bulk_entry_return_list.numItems:
+                results.append((entry_id, transaction_errors))
+                continue
+
+            entry_return = bulk_entry_return_list.entryReturnList[i]
+            if entry_return.entryCallType == arh.AR_BULK_ENTRY_CREATE:
+                status = entry_return.u.createEntryReturn.status
+                entry_id = entry_return.u.createEntryReturn.entryId
+            elif entry_return.entryCallType == arh.AR_BULK_ENTRY_SET:
+                status = entry_return.u.setEntryReturn.status
+            else:
+                status = entry_return.u.deleteEntryReturn.status
+
+            # Only errors determine whether a call failed, as notes and
+            # warnings may accompany successful calls
+            errors = self._status_errors(
+                status, schema, arh.AR_RETURN_ERROR
+            )
+
+            # Calls which succeeded are still rolled back if any other call
+            # in the transaction failed
+            if failed and not errors:
+                errors = transaction_errors
+
+            if errors and entry_ids[i] is None:
+                entry_id = None
+
+            results.append((entry_id, errors))
+
+        self.arlib.FreeARBulkEntryReturnList(
+            byref(bulk_entry_return_list), arh.FALSE
+        )
+
+        return results
+
+    def _load_qualifier(self, schema, qualifier):
+        """
+        Builds an ARQualifierStruct from a qualification string.  The caller
+        is responsible for freeing the struct using FreeARQualifierStruct.
+
+        :param str schema: the schema name to build the qualifier for
+        :param str qualifier: the qualification string to load
+        :return: the loaded ARQualifierStruct
+        :raises: ARSError
+        """
+
+        schema_artype = arh.ARNameType()
+        schema_artype.value = schema
+        display_tag_artype = arh.ARNameType()
+        display_tag_artype.value = b''
+        qualifier_struct = arh.ARQualifierStruct()
+
+        if (
+            self.arlib.ARLoadARQualifierStruct(
+                # ARControlStruct *control: the control record
+                byref(self.control),
+                # ARNameType schema: the schema to build the qualifier for
+                schema_artype,
+                # ARNameType displayTag: the name of the form view to use for
+                # resolving field names
+                display_tag_artype,
+                # char *qualString: the qualification string (query) to search
+                # with
+                qualifier,
+
+                # (return) ARQualifierStruct *qualifier: the newly built
+                # ARQualifierStruct
+                byref(qualifier_struct),
+                # (return) ARStatusList *status: notes, warnings or errors
+                # generated by the operation
+                byref(self.status)
+            ) >= arh.AR_RETURN_ERROR
+        ):
+            self._update_errors()
+            self.arlib.FreeARQualifierStruct(
+                byref(qualifier_struct), arh.FALSE
+            )
+            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+            raise ARSError(
+                'Unable to load the qualifier using the provided '
+                'qualification string for schema {}'.format(schema)
+            )
+
+        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+
+        return qualifier_struct
+
+    def _acquire_qualifier(self, schema, qualifier):
+        """
+        Obtains a loaded qualifier from the qualifier cache, loading it if
+        necessary.  The caller must return the qualifier using the release
+        method of the qualifier cache.
+
+        :param str schema: the schema name to build the qualifier for
+        :param qualifier: the qualification string to load or a qualifier
+                          built in Python
+        :type qualifier: string or Qualifier
+        :return: the CachedQualifier containing the loaded ARQualifierStruct
+        :raises: ARSError
+        """
+
+        # Qualifiers built in Python are converted locally.  Their structs are
+        # owned by Python and must never be passed to FreeARQualifierStruct,
+        # so they bypass the cache and are never marked as evicted.
+        if isinstance(qualifier, Qualifier):
+            cached_qualifier = CachedQualifier(
+                schema, qualifier.compile(self, schema)
+            )
+            cached_qualifier.users = 1
+            return cached_qualifier
+
+        # Qualifiers loaded against previous field details (which may have
+        # been replaced by another session sharing the caches) are reloaded
+        generation = self.field_generation_cache.get(schema)
+
+        cached_qualifier = self.qualifier_cache.acquire(
+            schema, qualifier, generation
+        )
+        if cached_qualifier is None:
+            cached_qualifier = self.qualifier_cache.add(
+                schema, qualifier, self._load_qualifier(schema, qualifier),
+                generation
+            )
+        return cached_qualifier
+
+    def _free_qualifier(self, qualifier_struct):
+        """
+        Frees the contents of a loaded qualifier.
+
+        :param ARQualifierStruct qualifier_struct: the qualifier to free
+        """
 
         self.arlib.FreeARQualifierStruct(byref(qualifier_struct), arh.FALSE)
-        self.arlib.FreeAREntryListFieldList(byref(field_list), arh.FALSE)
-        self.arlib.FreeAREntryListFieldValueList(byref(entry_list), arh.FALSE)
-        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+
+    def _get_multiple_entries(self, schema, entry_ids, fields, as_rows):
+        """
+        Retrieves up to AR_MAX_MULT_ENTRIES entries in a single call.
+
+        :param str schema: the schema name to retrieve the entries for
+        :param list entry_ids: the entry ids of the entries to retrieve
+        :param fields: a list of field names to retrieve from the schema
+        :type fields: list of strings
+        :param bool as_rows: whether to return entry values as Row objects
+                             rather than dicts
+        :return: a list of tuples whereby each tuple contains the entry id and
+                 entry values (or None if the entry doesn't exist)
+        :raises: ARSError
+        """
+
+        field_ids = [
+            self.field_name_to_id_cache[schema][field] for field in fields
+        ]
+
+        # The request structs are reused between calls and must not be freed
+        entry_id_list_list = self.scratch.entry_id_list_list(entry_ids)
+        internal_id_list = self.scratch.internal_id_list(field_ids)
+        schema_artype = self.scratch.name(schema)
+
+        exist_list = arh.ARBooleanList()
+        field_value_list_list = arh.ARFieldValueListList()
+
+        if (
+            self.arlib.ARGetMultipleEntries(
+                # ARControlStruct *control: the control record
+                byref(self.control),
+                # ARNameType schema: the schema to retrieve the entries for
+                schema_artype,
+                # AREntryIdListList *entryId: the entry ids to retrieve
+                byref(entry_id_list_list),
+                # ARInternalIdList *idList: the field ids to retrieve
+                byref(internal_id_list),
+
+                # (return) ARBooleanList *existList: whether each of the
+                # entries exist or not
+                byref(exist_list),
+                # (return) ARFieldValueListList *fieldList: a list of key/value
+                # pairs for each of the entries retrieved
+                byref(field_value_list_list),
+                # (return) ARStatusList *status: notes, warnings or errors
+                # generated by the operation
+                byref(self.status)
+            ) >= arh.AR_RETURN_ERROR
+        ):
+            self._update_errors()
+            self.arlib.FreeARBooleanList(byref(exist_list), arh.FALSE)
+            self.arlib.FreeARFieldValueListList(
+                byref(field_value_list_list), arh.FALSE
+            )
+            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+            raise ARSError(
+                'Unable to retrieve {} entries from schema {}'.format(
+                    len(entry_ids), schema
+                )
+            )
+
+        entries = []
+
+        try:
+            started = default_timer()
+            plan = build_plan(self, schema, field_ids)
+            row_type = self._row_type(schema, plan, as_rows)
+            for i, entry_id in enumerate(entry_ids):
+                if exist_list.booleanList[i]:
+                    entries.append((
+                        entry_id, self._extract_field_values(
+                            field_value_list_list.valueListList[i], plan,
+                            row_type
+                        )
+                    ))
+                else:
+                    entries.append((entry_id, None))
+            if self.instrumentation is not None:
+                self._record_decode(schema, started, entries)
+        finally:
+            self.arlib.FreeARBooleanList(byref(exist_list), arh.FALSE)
+            self.arlib.FreeARFieldValueListList(
+                byref(field_value_list_list), arh.FALSE
+            )
+            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
 
         return entries
 
-    def create(self, schema, entry_values):
+    def _resolve_field(self, schema, field):
         """
-        Creates a new entry in a given schema using the provided entry
-        values.
+        Determines the field id of a field given its name or id.
 
-        :param str schema: the schema where the entry is to be created
-        :param entry_values: a dict containing the field names and values
-                             for the new entry
-        :type entry_values: dict of string to values corresponding to the type
-                            of the respective field
-        :return: the entry id of the newly created entry
+        :param str schema: the schema name the field belongs to
+        :param field: the field name or field id
+        :type field: string or int
+        :return: the field id
         :raises: ARSError
         """
 
-        # Ensure we have all field and enum details for the schema
-        self.update_fields(schema)
-
-        # Validate that all fields exist.  Note that this is performed here
-        # so that we aren't in the middle of allocating memory to the
-        # ARFieldValueList struct when we realise a field is invalid.
-        for field in entry_values.keys():
-            if field not in self.field_name_to_id_cache[schema]:
+        if isinstance(field, integer_types):
+            if field not in self.field_id_to_name_cache[schema]:
                 raise ARSError(
-                    'A field with name {} does not exist in schema '
+                    'A field with id {} does not exist in schema '
                     '{}'.format(field, schema)
                 )
+            return field
 
-        # Prepare the fields that will be added to the new entry
-        field_value_list = arh.ARFieldValueList()
-        field_value_list.numItems = len(entry_values)
-        field_value_list.fieldValueList = cast(
-            self.clib.calloc(
-                field_value_list.numItems, sizeof(arh.ARFieldValueStruct)
-            ), POINTER(arh.ARFieldValueStruct)
-        )
+        try:
+            return self.field_name_to_id_cache[schema][field]
+        except KeyError:
+            raise ARSError(
+                'A field with name {} does not exist in schema '
+                '{}'.format(field, schema)
+            )
 
-        for i, (field_name, value) in enumerate(entry_values.items()):
-            field_id = self.field_name_to_id_cache[schema][field_name]
-            self._update_field(
-                schema, field_id, value, field_value_list.fieldValueList[i]
+    def _build_sort_list(self, schema, sort):
+        """
+        Builds an ARSortList from a list of fields and sort directions.  The
+        list is owned by Python and must never be passed to FreeARSortList.
+
+        :param str schema: the schema name the fields belong to
+        :param sort: the fields to sort by as field names (or field ids) or
+                     tuples of the field and 'asc' or 'desc'
+        :type sort: list of strings or tuples
+        :return: the populated ARSortList or None if no sort was requested
+        :raises: ARSError
+        """
+
+        if not sort:
+            return None
+
+        sort_structs = (arh.ARSortStruct * len(sort))()
+
+        for i, item in enumerate(sort):
+            if isinstance(item, tuple):
+                field, direction = item
+            else:
+                field, direction = item, 'asc'
+
+            field_id = self._resolve_field(schema, field)
+
+            if direction in ('asc', b'asc'):
+                sort_order = arh.AR_SORT_ASCENDING
+            elif direction in ('desc', b'desc'):
+                sort_order = arh.AR_SORT_DESCENDING
+            else:
+                raise ARSError(
+                    'An invalid sort direction {} was specified for field '
+                    '{} (expected asc or desc)'.format(direction, field)
+                )
+
+            sort_structs[i].fieldId = field_id
+            sort_structs[i].sortOrder = sort_order
+
+        sort_list = arh.ARSortList()
+        sort_list.numItems = len(sort)
+        sort_list.sortList = cast(sort_structs, POINTER(arh.ARSortStruct))
+
+        # Keep a reference to the array so it lives as long as the list
+        sort_list.keep = sort_structs
+        return sort_list
+
+    def _build_keyset_sort_list(self, schema, sort, offset, keyset):
+        """
+        Builds the sort list of a paged query, which is always sorted by
+        entry id when keyset pagination is used.
+
+        :param str schema: the schema name the fields belong to
+        :param sort: the fields to sort by as accepted by _build_sort_list
+        :type sort: list of strings or tuples
+        :param int offset: the index of the first record to retrieve
+        :param bool keyset: whether keyset pagination is used
+        :return: the populated ARSortList or None if no sort is required
+        :raises: ARSError
+        """
+
+        if not keyset:
+            return self._build_sort_list(schema, sort)
+
+        if sort or offset != arh.AR_START_WITH_FIRST_ENTRY:
+            raise ARSError(
+                'Keyset pagination always sorts by entry id and may not be '
+                'combined with a sort or offset'
             )
 
-        entry_id_artype = arh.AREntryIdType()
+        return self._build_sort_list(schema, [arh.AR_CORE_ENTRY_ID])
+
+    def _get_list_entry_with_fields(
+        self, schema, qualifier_struct, field_list, offset, limit,
+        sort_list=None
+    ):
+        """
+        Retrieves a list of entries using a loaded qualifier and field list.
+        The caller is responsible for freeing the returned entry list using
+        FreeAREntryListFieldValueList.
+
+        :param str schema: the schema name to run the query against
+        :param ARQualifierStruct qualifier_struct: the loaded qualifier
+        :param AREntryListFieldList field_list: the fields to retrieve
+        :param int offset: the index of the first record to retrieve
+        :param int limit: the maximum number of records to retrieve
+        :param ARSortList sort_list: the sort order of the records (None for
+                                     the default order)
+        :return: a tuple containing the AREntryListFieldValueList retrieved
+                 and the total number of matches
+        :raises: ARSError
+        """
+
         schema_artype = arh.ARNameType()
         schema_artype.value = schema
+        num_matches = c_uint()
+        entry_list = arh.AREntryListFieldValueList()
 
         if (
-            self.arlib.ARCreateEntry(
+            self.arlib.ARGetListEntryWithFields(
                 # ARControlStruct *control: the control record
                 byref(self.control),
-                # ARNameType schema: the name of the schema to create the
-                # entry in
+                # ARNameType schema: the schema to get entries for
                 schema_artype,
-                # ARFieldValueList *fieldList: a list of key/value pairs which
-                # identify the data for the new entry
-                byref(field_value_list),
+                # ARQualifierStruct *qualifier: a query specifying entries to
+                # retrieve
+                byref(qualifier_struct),
+                # AREntryListFieldList *getListFields: a list of fields to
+                # retrieve with each entry
+                byref(field_list),
+                # ARSortList *sortList: list of fields to sort results by
+                # (NULL for default sort)
+                byref(sort_list) if sort_list is not None else None,
+                # unsigned int firstRetrieve: the first record to retrieve
+                offset,
+                # unsigned int maxRetrieve: the maximum number of items to
+                # retrieve
+                limit,
+                # ARBoolean useLocale: whether to search based on locale
+                arh.FALSE,
 
-                # (return) AREntryIdType entryId: the entry id of the newly
-                # created entry
-                entry_id_artype,
+                # (return) AREntryListFieldValueList *entryList: the entries
+                # retrieved
+                byref(entry_list),
+                # (return) unsigned int numMatches: the number of entries
+                # retrieved
+                byref(num_matches),
                 # (return) ARStatusList *status: notes, warnings or errors
                 # generated by the operation
                 byref(self.status)
             ) >= arh.AR_RETURN_ERROR
         ):
-            self._update_errors(schema)
-            self.arlib.FreeARFieldValueList(
-                byref(field_value_list), arh.FALSE
+            self._update_errors()
+            self.arlib.FreeAREntryListFieldValueList(
+                byref(entry_list), arh.FALSE
             )
             self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
             raise ARSError(
-                'Unable to create a new entry for schema {}'.format(schema)
+                'Unable to obtain a list of entries using the provided '
+                'qualification string for schema {}'.format(schema)
             )
 
-        self.arlib.FreeARFieldValueList(byref(field_value_list), arh.FALSE)
         self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
 
-        # Return the newly created entry id to the caller
-        return entry_id_artype.value
+        return entry_list, num_matches.value
 
-    def update(self, schema, entry_id, entry_values):
+    def _iter_pages(
+        self, schema, qualifier, fields, page_size, offset, limit, sort_list,
+        decode, keyset=False
+    ):
         """
-        Updates a chosen entry in a given schema using the provided
-        entry values.
+        Retrieves the records matching a qualifier in pages, decoding and
+        freeing each page before the next is requested.
 
-        :param str schema: the schema where the entry is located
-        :param str entry_id: the entry id of the record to be updated
-        :param entry_values: a dict containing the field names and values
-                             to be updated
-        :type entry_values: dict of string to values corresponding to the type
-                            of the respective field
+        :param str schema: the schema name to run the query against
+        :param qualifier: the query determining which records to retrieve
+        :type qualifier: string or Qualifier
+        :param fields: a list of validated field names to retrieve
+        :type fields: list of strings
+        :param int page_size: the number of records to retrieve per call to
+                              the server
+        :param int offset: the index of the first record to retrieve
+        :param int limit: limit the number of returned results to a given
+                          number
+        :param ARSortList sort_list: the sort order of the records (None for
+                                     the default order)
+        :param decode: a function converting an AREntryListFieldValueList
+                       into Python values
+        :param bool keyset: whether each page is requested using the entry
+                            id of the last record retrieved rather than an
+                            offset (records must be sorted by entry id)
+        :return: a generator of the decoded pages
         :raises: ARSError
         """
 
-        # Ensure we have all field and enum details for the schema
-        self.update_fields(schema)
+        # The qualifier and field list are loaded once and reused for every
+        # page that is retrieved.  The session may make other calls between
+        # pages, so the field list is held in scratch structs of its own.
+        cached_qualifier = self._acquire_qualifier(schema, qualifier)
+        field_list = ScratchStructs().entry_list_field_list([
+            self.field_name_to_id_cache[schema][field] for field in fields
+        ])
+
+        try:
+            remaining = limit
+            qualifier_struct = cached_qualifier.struct
+            first_page = True
+
+            while True:
+                if limit == arh.AR_NO_MAX_LIST_RETRIEVE:
+                    page_limit = page_size
+                else:
+                    page_limit = min(page_size, remaining)
 
-        # Validate that all fields exist.  Note that this is performed here
-        # so that we aren't in the middle of allocating memory to the
-        # ARFieldValueList struct when we realise a field is invalid.
-        for field in entry_values.keys():
-            if field not in self.field_name_to_id_cache[schema]:
+                entry_list, num_matches = self._get_list_entry_with_fields(
+                    schema, qualifier_struct, field_list, offset, page_limit,
+                    sort_list
+                )
+                num_entries = entry_list.numItems
+
+                # Later pages only match the remaining records when using
+                # keyset pagination
+                if first_page:
+                    self.match_count = num_matches
+                    first_page = False
+
+                # The next page starts after the last entry id of this page
+                if keyset and num_entries:
+                    qualifier_struct = self._restrict_qualifier(
+                        schema, cached_qualifier.struct,
+                        F(arh.AR_CORE_ENTRY_ID) > entry_list.entryList[
+                            num_entries - 1
+                        ].entryId.entryIdList[0].value
+                    )
+
+                # Decode the page and release the C buffer before handing any
+                # values to the caller
+                try:
+                    page = decode(entry_list)
+                finally:
+                    self.arlib.FreeAREntryListFieldValueList(
+                        byref(entry_list), arh.FALSE
+                    )
+
+                yield page
+
+                # The server may return fewer entries than requested when
+                # its Max-Entries-Returned-By-GetList limit is below the
+                # page size, so only an empty page or reaching the number
+                # of matches indicates that the result set is exhausted
+                if num_entries == 0:
+                    break
+
+                if keyset:
+                    if num_entries >= num_matches:
+                        break
+                else:
+                    offset += num_entries
+                    if offset >= num_matches:
+                        break
+
+                if limit != arh.AR_NO_MAX_LIST_RETRIEVE:
+                    remaining -= num_entries
+                    if remaining <= 0:
+                        break
+        finally:
+            self.qualifier_cache.release(cached_qualifier)
+
+    def _restrict_qualifier(self, schema, qualifier_struct, restriction):
+        """
+        Builds a qualifier which restricts a loaded qualifier (which may
+        have been loaded from a qualification string) to the entries also
+        matching a qualifier built in Python.  The struct is owned by Python
+        and must never be passed to FreeARQualifierStruct.
+
+        :param str schema: the schema name to build the qualifier for
+        :param ARQualifierStruct qualifier_struct: the loaded qualifier
+        :param Qualifier restriction: the qualifier entries must also match
+        :return: the populated ARQualifierStruct
+        :raises: ARSError
+        """
+
+        restriction_struct = restriction.compile(self, schema)
+
+        # An empty qualifier matches all entries
+        if qualifier_struct.operation == arh.AR_COND_OP_NONE:
+            return restriction_struct
+
+        restricted_struct = arh.ARQualifierStruct()
+        restricted_struct.operation = arh.AR_COND_OP_AND
+        restricted_struct.u.andor.operandLeft = pointer(qualifier_struct)
+        restricted_struct.u.andor.operandRight = pointer(restriction_struct)
+
+        # Keep a reference to the operands so they live as long as the
+        # qualifier itself
+        restricted_struct.keep = [qualifier_struct, restriction_struct]
+        return restricted_struct
+
+    def _decoding_plan(self, schema, fields):
+        """
+        Builds the decoding plan used to convert the values of the fields
+        requested.
+
+        :param str schema: the schema name the fields belong to
+        :param fields: a list of validated field names
+        :type fields: list of strings
+        :return: a dict of field ids to field name and converter tuples
+        """
+
+        return build_plan(self, schema, [
+            self.field_name_to_id_cache[schema][field] for field in fields
+        ])
+
+    def _row_type(self, schema, plan, as_rows):
+        """
+        Determines the Row class used for the entry values of a call.
+
+        :param str schema: the schema name the fields belong to
+        :param dict plan: the decoding plan of the fields retrieved
+        :param bool as_rows: whether entry values are returned as rows
+        :return: the Row class or None if dicts are to be returned
+        """
+
+        if not as_rows:
+            return None
+
+        fields = [None] * len(plan)
+        for field_name, index, convert in plan.values():
+            fields[index] = field_name
+        return row_class(schema, fields)
+
+    def _record_decode(self, schema, started, entries):
+        """
+        Reports decoded entries to the instrumentation of the session.
+
+        :param str schema: the schema name the entries belong to
+        :param float started: the timer value at which decoding started
+        :param list entries: tuples containing the entry id and entry values
+                             decoded (entry values are None for entries
+                             which don't exist)
+        """
+
+        seconds = default_timer() - started
+        rows = 0
+        string_bytes = 0
+
+        for entry_id, entry_values in entries:
+            if entry_values is None:
+                continue
+            rows += 1
+            if isinstance(entry_values, dict):
+                entry_values = entry_values.values()
+            for value in entry_values:
+                if isinstance(value, bytes):
+                    string_bytes += len(value)
+
+        self.instrumentation.decode(schema, rows, string_bytes, seconds)
+
+    def _extract_entries(self, entry_list, plan, row_type=None):
+        """
+        Converts a retrieved AREntryListFieldValueList into a list of Python
+        entries.  The entry list itself is not freed.
+
+        :param AREntryListFieldValueList entry_list: the retrieved entries
+        :param dict plan: the decoding plan of the fields retrieved
+        :param row_type: the Row class of the entry values (None for dicts)
+        :return: a list of tuples whereby each tuple contains the entry id and
+                 entry values
+        :raises: ARSError
+        """
+
+        entries = []
+
+        for i in range(entry_list.numItems):
+            entry = entry_list.entryList[i]
+
+            # Entries containing more than one id are not supported
+            # (ids are supposed to be unique aren't they?)
+            if entry.entryId.numItems != 1:
                 raise ARSError(
-                    'A field with name {} does not exist in schema '
-                    '{}'.format(field, schema)
+                    'One or more entries contained multiple IDs that are not '
+                    'supported by PyRemedy'
                 )
 
-        # Prepare the entry id struct
-        entry_id_list = arh.AREntryIdList()
-        entry_id_list.numItems = 1
-        entry_id_list.entryIdList = cast(
-            self.clib.malloc(
-                entry_id_list.numItems * sizeof(arh.AREntryIdType)
-            ), POINTER(arh.AREntryIdType)
-        )
-        entry_id_list.entryIdList[0].value = entry_id
+            # Extract the entry id and the values list for the entry
+            entry_id = entry.entryId.entryIdList[0].value
+            entry_values = self._extract_field_values(
+                entry.entryValues.contents, plan, row_type
+            )
+
+            entries.append((entry_id, entry_values))
+
+        return entries
+
+    def _extract_timestamps(self, entry_list, field_id):
+        """
+        Reads the epoch timestamps of a time field from a retrieved
+        AREntryListFieldValueList.  The entry list itself is not freed.
+
+        :param AREntryListFieldValueList entry_list: the retrieved entries
+        :param int field_id: the field id of the time field
+        :return: a list containing the timestamp of each entry (None where
+                 the value is NULL)
+        """
+
+        timestamps = []
+
+        for i in range(entry_list.numItems):
+            field_value_list = entry_list.entryList[i].entryValues.contents
+            timestamp = None
+
+            for j in range(field_value_list.numItems):
+                field_value = field_value_list.fieldValueList[j]
+                if field_value.fieldId == field_id:
+                    if field_value.value.dataType == arh.AR_DATA_TYPE_TIME:
+                        timestamp = field_value.value.u.timeVal
+                    break
+
+            timestamps.append(timestamp)
+
+        return timestamps
+
+    def _extract_field_values(self, field_value_list, plan, row_type=None):
+        """
+        Converts a retrieved ARFieldValueList into a dict (or Row) of field
+        names and values.  The field value list itself is not freed.
 
-        # Prepare the fields that will be updated
-        field_value_list = arh.ARFieldValueList()
-        field_value_list.numItems = len(entry_values)
-        field_value_list.fieldValueList = cast(
-            self.clib.calloc(
-                field_value_list.numItems, sizeof(arh.ARFieldValueStruct)
-            ), POINTER(arh.ARFieldValueStruct)
-        )
+        :param ARFieldValueList field_value_list: the retrieved values
+        :param dict plan: the decoding plan of the fields retrieved
+        :param row_type: the Row class to return (None for a dict)
+        :return: a dict or Row containing the field names and values
+        :raises: ARSError
+        """
 
-        for i, (field_name, value) in enumerate(entry_values.items()):
-            field_id = self.field_name_to_id_cache[schema][field_name]
-            self._update_field(
-                schema, field_id, value, field_value_list.fieldValueList[i]
-            )
+        if row_type is not None:
+            # Fields missing from the list are left as None
+            values = [None] * len(row_type.fields)
 
-        schema_artype = arh.ARNameType()
-        schema_artype.value = schema
+            for i in range(field_value_list.numItems):
+                field_value = field_value_list.fieldValueList[i]
+                field_name, index, convert = plan[field_value.fieldId]
+                values[index] = convert(field_value.value)
 
-        if (
-            self.arlib.ARSetEntry(
-                # ARControlStruct *control: the control record
-                byref(self.control),
-                # ARNameType schema: the name of the schema containing the
-                # entry to be updated
-                schema_artype,
-                # AREntryIdList *entryId: the id of the entry to update
-                byref(entry_id_list),
-                # ARFieldValueList *fieldList: a list of key/value pairs to
-                # update
-                byref(field_value_list),
-                # ARTimestamp getTime: the timestamp specifying when the entry
-                # was last retrieved for validation against the modified date
-                # (to bypass this comparison, pass 0)
-                0,
-                # unsigned int option: whether to update fields in a join
-                # qualification (only applies to join forms)
-                arh.AR_JOIN_SETOPTION_REF,
+            return row_type(values)
 
-                # (return) ARStatusList *status: notes, warnings or errors
-                # generated by the operation
-                byref(self.status)
-            ) >= arh.AR_RETURN_ERROR
-        ):
-            self._update_errors(schema)
-            self.arlib.FreeAREntryIdList(byref(entry_id_list), arh.FALSE)
-            self.arlib.FreeARFieldValueList(byref(field_value_list), arh.FALSE)
-            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
-            raise ARSError(
-                'Unable to modify entry id {} for schema {}'.format(
-                    entry_id, schema
-                )
-            )
+        # Create an empty dict for the values
+        entry_values = {}
 
-        self.arlib.FreeAREntryIdList(byref(entry_id_list), arh.FALSE)
-        self.arlib.FreeARFieldValueList(byref(field_value_list), arh.FALSE)
-        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+        for i in range(field_value_list.numItems):
+            field_value = field_value_list.fieldValueList[i]
 
-    def delete(self, schema, entry_id):
+            # Convert the value using the converter planned for its field
+            field_name, index, convert = plan[field_value.fieldId]
+            entry_values[field_name] = convert(field_value.value)
+
+        return entry_values
+
+    def _get_list_schema(self, changed_since=0):
         """
-        Deletes a particular entry in the requested schema using the
-        given entry id.
+        Retrieves the names of all schemas modified since a given time.
 
-        :param str schema: the schema name to delete the entry from
-        :param str entry_id: the entry id of the entry that you wish to delete
+        :param int changed_since: the epoch timestamp to retrieve schemas
+                                  modified since (0 retrieves all schemas)
+        :return: a list of schema names
         :raises: ARSError
         """
 
-        # Clear previous errors
-        self.errors = []
-
-        schema_artype = arh.ARNameType()
-        schema_artype.value = schema
-
-        entry_id_list = arh.AREntryIdList()
-        entry_id_list.numItems = 1
-        entry_id_list.entryIdList = cast(
-            self.clib.malloc(
-                entry_id_list.numItems * sizeof(arh.AREntryIdType)
-            ), POINTER(arh.AREntryIdType)
-        )
-        entry_id_list.entryIdList[0].value = entry_id
+        name_artype = arh.ARNameType()
+        name_artype.value = b''
+        schema_list = arh.ARNameList()
 
         if (
-            self.arlib.ARDeleteEntry(
+            self.arlib.ARGetListSchema(
                 # ARControlStruct *control: the control record
                 byref(self.control),
-                # ARNameType schema: the name of the schema containing the
-                # entry to be deleted
-                schema_artype,
-                # AREntryIdList *entryId: the entry to delete
-                byref(entry_id_list),
-                # unsigned int option: the policy used when deleting the entry
-                arh.AR_JOIN_DELOPTION_NONE,
+                # ARTimestamp changedSince: retrieves forms with a chosen
+                # modification timestamp
+                changed_since,
+                # unsigned int schemaType: get all schemas
+                arh.AR_LIST_SCHEMA_ALL | arh.AR_HIDDEN_INCREMENT,
+                # ARNameType name: specify which form this depends on (ignored
+                # with our schemaType)
+                name_artype,
+                # ARInternalIdList *fieldIdList: filter the schemas by a given
+                # set of fields
+                None,
+                # ARPropList *objPropList: search for specify object properties
+                None,
 
+                # (return) ARNameList *nameList: the list of schemas
+                byref(schema_list),
                 # (return) ARStatusList *status: notes, warnings or errors
                 # generated by the operation
                 byref(self.status)
             ) >= arh.AR_RETURN_ERROR
         ):
             self._update_errors()
-            self.arlib.FreeAREntryIdList(byref(entry_id_list), arh.FALSE)
+            self.arlib.FreeARNameList(byref(schema_list), arh.FALSE)
             self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
-            raise ARSError(
-                'Unable to delete entry id {} for schema {}'.format(
-                    entry_id, schema
-                )
-            )
+            raise ARSError('Unable to obtain a list of schemas')
+
+        schemas = [
+            schema_list.nameList[i].value for i in range(schema_list.numItems)
+        ]
 
-        self.arlib.FreeAREntryIdList(byref(entry_id_list), arh.FALSE)
+        self.arlib.FreeARNameList(byref(schema_list), arh.FALSE)
         self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
 
-    def update_fields(self, schema):
+        return schemas
+
+    def _get_list_field(self, schema, changed_since=0):
         """
-        Determines the field IDs for all data fields on a chosen schema and
-        then retrieves the related field names and enum mappings.  This method
-        assumes that all field names are unique.
+        Retrieves the ids of all data fields on a schema modified since a
+        given time.
 
-        :param str schema: the schema name to retrieve field information for
+        :param str schema: the schema name to retrieve field ids for
+        :param int changed_since: the epoch timestamp to retrieve fields
+                                  modified since (0 retrieves all fields)
+        :return: a list of field ids
         :raises: ARSError
         """
 
-        # Clear previous errors
-        self.errors = []
-
-        # Use the cache if possible
-        if (
-            schema in self.field_id_to_name_cache and
-            schema in self.field_name_to_id_cache and
-            schema in self.field_id_to_type_cache and
-            schema in self.enum_id_to_name_cache and
-            schema in self.enum_name_to_id_cache
-        ):
-            return
-
         schema_artype = arh.ARNameType()
         schema_artype.value = schema
 
@@ -821,9 +2789,9 @@ class ARS(object):
                 # unsigned long fieldType: bitmask indicating what field types
                 # we want
                 arh.AR_FIELD_TYPE_DATA,
-                # ARTimestamp changedSince: retrieves fields with any
+                # ARTimestamp changedSince: retrieves fields with a chosen
                 # modification timestamp
-                0,
+                changed_since,
                 # ARPropList objPropList: object properties to search for
                 None,
 
@@ -841,10 +2809,41 @@ class ARS(object):
                 'Unable to obtain field ids for schema {}'.format(schema)
             )
 
-        # Note that we don't run FreeARInternalIdList here as we need the
-        # field_id_list for the next call
+        field_ids = [
+            field_id_list.internalIdList[i]
+            for i in range(field_id_list.numItems)
+        ]
+
+        self.arlib.FreeARInternalIdList(byref(field_id_list), arh.FALSE)
         self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
 
+        return field_ids
+
+    def _get_multiple_fields(self, schema, field_ids, limits=True):
+        """
+        Retrieves the names, data types and enum mappings of the chosen
+        fields on a schema.
+
+        :param str schema: the schema name the fields belong to
+        :param list field_ids: the field ids to retrieve details for
+        :param bool limits: whether to retrieve the field limits containing
+                            the data types and enum mappings (only names are
+                            retrieved otherwise, which is far cheaper)
+        :return: a list of tuples containing the field id, field name, data
+                 type and enum mappings (a list of enum id and enum name
+                 tuples or None if the field isn't an enum) of each field
+                 (the data type is None if limits weren't retrieved)
+        :raises: ARSError
+        """
+
+        schema_artype = arh.ARNameType()
+        schema_artype.value = schema
+
+        # The request struct is reused between calls and must not be freed
+        # (field details are always retrieved before any other request
+        # structs are populated)
+        field_id_list = self.scratch.internal_id_list(field_ids)
+
         field_name_list = arh.ARNameList()
         field_exist_list = arh.ARBooleanList()
         field_limits_list = arh.ARFieldLimitList()
@@ -890,7 +2889,7 @@ class ARS(object):
                 # access the fields
                 None,
                 # (return) ARFieldLimitList *limit: value limits fo fields
-                byref(field_limits_list),
+                byref(field_limits_list) if limits else None,
                 # (return) ARDisplayInstanceListList *dInstanceList: display
                 # properties
                 None,
@@ -915,42 +2914,31 @@ class ARS(object):
             ) >= arh.AR_RETURN_ERROR
         ):
             self._update_errors()
-            self.arlib.FreeARInternalIdList(byref(field_id_list), arh.FALSE)
             self.arlib.FreeARBooleanList(byref(field_exist_list), arh.FALSE)
             self.arlib.FreeARNameList(byref(field_name_list), arh.FALSE)
+            self.arlib.FreeARFieldLimitList(
+                byref(field_limits_list), arh.FALSE
+            )
             self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
             raise ARSError(
                 'Unable to obtain field information for schema '
                 '{}'.format(schema)
             )
 
-        # Initialise the name and enum caches for this schema
-        self.field_id_to_name_cache[schema] = OrderedDict()
-        self.field_name_to_id_cache[schema] = OrderedDict()
-        self.field_id_to_type_cache[schema] = OrderedDict()
-        self.enum_id_to_name_cache[schema] = OrderedDict()
-        self.enum_name_to_id_cache[schema] = OrderedDict()
+        fields = []
 
         for i in range(field_id_list.numItems):
-            # Save the field name to id mapping in the cache
             field_id = field_id_list.internalIdList[i]
             field_name = field_name_list.nameList[i].value
-            data_type = field_limits_list.fieldLimitList[i].dataType
+            data_type = None
+            enums = None
 
-            # Save the field id to name mapping in the cache
-            self.field_id_to_name_cache[schema][field_id] = field_name
-
-            # Save the field name to id mapping in the cache
-            self.field_name_to_id_cache[schema][field_name] = field_id
-
-            # Save the field id to type mapping in the cache
-            self.field_id_to_type_cache[schema][field_id] = data_type
+            if limits:
+                data_type = field_limits_list.fieldLimitList[i].dataType
 
             # Retrieve enum values if this field is an enum type
             if data_type == arh.AR_DATA_TYPE_ENUM:
-                # Initialise the enum entries for this field
-                self.enum_id_to_name_cache[schema][field_id] = {}
-                self.enum_name_to_id_cache[schema][field_id] = {}
+                enums = []
 
                 field_enum_limits_list = (
                     field_limits_list.fieldLimitList[i].u.enumLimits
@@ -963,12 +2951,7 @@ class ARS(object):
                     for j in range(regular_list.numItems):
                         enum_id = j
                         enum_value = regular_list.nameList[j].value
-                        self.enum_id_to_name_cache[schema][field_id][enum_id] = (
-                            enum_value
-                        )
-                        self.enum_name_to_id_cache[schema][field_id][enum_value] = (
-                            enum_id
-                        )
+                        enums.append((enum_id, enum_value))
 
                 # Process custom enums mappings
                 elif field_style == arh.AR_ENUM_STYLE_CUSTOM:
@@ -976,56 +2959,42 @@ class ARS(object):
                     for j in range(custom_list.numItems):
                         enum_id = custom_list.enumItemList[j].itemNumber
                         enum_value = custom_list.enumItemList[j].itemName
-                        self.enum_id_to_name_cache[schema][field_id][enum_id] = (
-                            enum_value
-                        )
-                        self.enum_name_to_id_cache[schema][field_id][enum_value] = (
-                            enum_id
-                        )
+                        enums.append((enum_id, enum_value))
 
                 # Process query enums mappings
                 else:
-                    self.arlib.FreeARInternalIdList(
-                        byref(field_id_list), arh.FALSE
-                    )
                     self.arlib.FreeARBooleanList(
                         byref(field_exist_list), arh.FALSE
                     )
                     self.arlib.FreeARNameList(
                         byref(field_name_list), arh.FALSE
                     )
+                    self.arlib.FreeARFieldLimitList(
+                        byref(field_limits_list), arh.FALSE
+                    )
                     self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
                     raise ARSError(
                         'The field id {} for schema {} is a query enum which '
                         'is not supported by PyRemedy'.format(field_id, schema)
                     )
 
-        self.arlib.FreeARInternalIdList(byref(field_id_list), arh.FALSE)
+            fields.append((field_id, field_name, data_type, enums))
+
         self.arlib.FreeARBooleanList(byref(field_exist_list), arh.FALSE)
         self.arlib.FreeARNameList(byref(field_name_list), arh.FALSE)
+        self.arlib.FreeARFieldLimitList(byref(field_limits_list), arh.FALSE)
         self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
 
-    def _register_clib_functions(self):
-        """Explicitly define argument and return types for C functions."""
-        # strdup (string.h)
-        self.clib.strdup.argtypes = [c_char_p]
-        # Please note that the return value of strdup is actually char * but
-        # we can't use this or Python will convert the result into a Python
-        # string which isn't what we want.  Instead, we return a void * (or
-        # alternatively we could have returned POINTER(c_char)) and cast that
-        # result to a c_char_p.
-        self.clib.strdup.restype = c_void_p
-
-        # calloc (stdlib.h)
-        self.clib.calloc.argtypes = [c_size_t, c_size_t]
-        self.clib.calloc.restype = c_void_p
-
-        # malloc (stdlib.h)
-        self.clib.malloc.argtypes = [c_size_t]
-        self.clib.malloc.restype = c_void_p
+        return fields
 
     def _register_arlib_functions(self):
         """Explicitly define argument and return types for Remedy functions."""
+        # ARBeginBulkEntryTransaction
+        self.arlib.ARBeginBulkEntryTransaction.argtypes = [
+            POINTER(arh.ARControlStruct), POINTER(arh.ARStatusList)
+        ]
+        self.arlib.ARBeginBulkEntryTransaction.restype = c_int
+
         # ARCreateEntry
         self.arlib.ARCreateEntry.argtypes = [
             POINTER(arh.ARControlStruct), arh.ARNameType,
@@ -1041,6 +3010,13 @@ class ARS(object):
         ]
         self.arlib.ARDeleteEntry.restype = c_int
 
+        # AREndBulkEntryTransaction
+        self.arlib.AREndBulkEntryTransaction.argtypes = [
+            POINTER(arh.ARControlStruct), c_uint,
+            POINTER(arh.ARBulkEntryReturnList), POINTER(arh.ARStatusList)
+        ]
+        self.arlib.AREndBulkEntryTransaction.restype = c_int
+
         # ARGetEntry
         self.arlib.ARGetEntry.argtypes = [
             POINTER(arh.ARControlStruct), arh.ARNameType,
@@ -1049,6 +3025,16 @@ class ARS(object):
         ]
         self.arlib.ARGetEntry.restype = c_int
 
+        # ARGetEntryStatistics
+        self.arlib.ARGetEntryStatistics.argtypes = [
+            POINTER(arh.ARControlStruct), arh.ARNameType,
+            POINTER(arh.ARQualifierStruct),
+            POINTER(arh.ARFieldValueOrArithStruct), c_uint,
+            POINTER(arh.ARInternalIdList),
+            POINTER(arh.ARStatisticsResultList), POINTER(arh.ARStatusList)
+        ]
+        self.arlib.ARGetEntryStatistics.restype = c_int
+
         # ARGetListEntryWithFields
         self.arlib.ARGetListEntryWithFields.argtypes = [
             POINTER(arh.ARControlStruct), arh.ARNameType,
@@ -1076,6 +3062,15 @@ class ARS(object):
         ]
         self.arlib.ARGetListSchema.restype = c_int
 
+        # ARGetMultipleEntries
+        self.arlib.ARGetMultipleEntries.argtypes = [
+            POINTER(arh.ARControlStruct), arh.ARNameType,
+            POINTER(arh.AREntryIdListList), POINTER(arh.ARInternalIdList),
+            POINTER(arh.ARBooleanList), POINTER(arh.ARFieldValueListList),
+            POINTER(arh.ARStatusList)
+        ]
+        self.arlib.ARGetMultipleEntries.restype = c_int
+
         # ARGetMultipleFields
         self.arlib.ARGetMultipleFields.argtypes = [
             POINTER(arh.ARControlStruct), arh.ARNameType,
@@ -1094,6 +3089,13 @@ class ARS(object):
         ]
         self.arlib.ARGetMultipleFields.restype = c_int
 
+        # ARGetSessionConfiguration
+        self.arlib.ARGetSessionConfiguration.argtypes = [
+            POINTER(arh.ARControlStruct), c_uint, POINTER(arh.ARValueStruct),
+            POINTER(arh.ARStatusList)
+        ]
+        self.arlib.ARGetSessionConfiguration.restype = c_int
+
         # ARInitialization
         self.arlib.ARInitialization.argtypes = [
             POINTER(arh.ARControlStruct), POINTER(arh.ARStatusList)
@@ -1122,6 +3124,13 @@ class ARS(object):
         ]
         self.arlib.ARSetServerPort.restype = c_int
 
+        # ARSetSessionConfiguration
+        self.arlib.ARSetSessionConfiguration.argtypes = [
+            POINTER(arh.ARControlStruct), c_uint, POINTER(arh.ARValueStruct),
+            POINTER(arh.ARStatusList)
+        ]
+        self.arlib.ARSetSessionConfiguration.restype = c_int
+
         # ARTermination
         self.arlib.ARTermination.argtypes = [
             POINTER(arh.ARControlStruct), POINTER(arh.ARStatusList)
@@ -1134,12 +3143,24 @@ class ARS(object):
         ]
         self.arlib.FreeARBooleanList.restype = None
 
+        # FreeARBulkEntryReturnList
+        self.arlib.FreeARBulkEntryReturnList.argtypes = [
+            POINTER(arh.ARBulkEntryReturnList), arh.ARBoolean
+        ]
+        self.arlib.FreeARBulkEntryReturnList.restype = None
+
         # FreeAREntryIdList
         self.arlib.FreeAREntryIdList.argtypes = [
             POINTER(arh.AREntryIdList), arh.ARBoolean
         ]
         self.arlib.FreeAREntryIdList.restype = None
 
+        # FreeAREntryIdListList
+        self.arlib.FreeAREntryIdListList.argtypes = [
+            POINTER(arh.AREntryIdListList), arh.ARBoolean
+        ]
+        self.arlib.FreeAREntryIdListList.restype = None
+
         # FreeAREntryListFieldList
         self.arlib.FreeAREntryListFieldList.argtypes = [
             POINTER(arh.AREntryListFieldList), arh.ARBoolean
@@ -1152,12 +3173,24 @@ class ARS(object):
         ]
         self.arlib.FreeAREntryListFieldValueList.restype = None
 
+        # FreeARFieldLimitList
+        self.arlib.FreeARFieldLimitList.argtypes = [
+            POINTER(arh.ARFieldLimitList), arh.ARBoolean
+        ]
+        self.arlib.FreeARFieldLimitList.restype = None
+
         # FreeARFieldValueList
         self.arlib.FreeARFieldValueList.argtypes = [
             POINTER(arh.ARFieldValueList), arh.ARBoolean
         ]
         self.arlib.FreeARFieldValueList.restype = None
 
+        # FreeARFieldValueListList
+        self.arlib.FreeARFieldValueListList.argtypes = [
+            POINTER(arh.ARFieldValueListList), arh.ARBoolean
+        ]
+        self.arlib.FreeARFieldValueListList.restype = None
+
         # FreeARInternalIdList
         self.arlib.FreeARInternalIdList.argtypes = [
             POINTER(arh.ARInternalIdList), arh.ARBoolean
@@ -1176,54 +3209,18 @@ class ARS(object):
         ]
         self.arlib.FreeARQualifierStruct.restype = None
 
+        # FreeARStatisticsResultList
+        self.arlib.FreeARStatisticsResultList.argtypes = [
+            POINTER(arh.ARStatisticsResultList), arh.ARBoolean
+        ]
+        self.arlib.FreeARStatisticsResultList.restype = None
+
         # FreeARStatusList
         self.arlib.FreeARStatusList.argtypes = [
             POINTER(arh.ARStatusList), arh.ARBoolean
         ]
         self.arlib.FreeARStatusList.restype = None
 
-    def _extract_field(self, schema, field_id, value_struct):
-        """
-        Returns the appropriate value for the schema and field id requested
-        given a particular value structure.
-
-        :param str schema: the schema name related to the field you're extract
-                           data for
-        :param str field_id: the field id of the schema being retrieved
-        :param ARValueStruct value_struct: the Remedy ARValueStruct containing
-                                           the data
-        :return: the value of the field requested
-        :raises: ARSError
-        """
-
-        # Determine the data type of the value
-        data_type = value_struct.dataType
-
-        # Retrieve the field name from the cache
-        field_name = self.field_id_to_name_cache[schema][field_id]
-
-        # Based on the data type, retrieve and convert (if necessary) the
-        # appropriate value and return it to the caller
-        if data_type == arh.AR_DATA_TYPE_NULL:
-            return None
-        elif data_type == arh.AR_DATA_TYPE_INTEGER:
-            return value_struct.u.intVal
-        elif data_type == arh.AR_DATA_TYPE_REAL:
-            return value_struct.u.realVal
-        elif data_type == arh.AR_DATA_TYPE_CHAR:
-            return value_struct.u.charVal
-        elif data_type == arh.AR_DATA_TYPE_ENUM:
-            return (
-                self.enum_id_to_name_cache[schema][field_id][value_struct.u.enumVal]
-            )
-        elif data_type == arh.AR_DATA_TYPE_TIME:
-            return datetime.fromtimestamp(value_struct.u.timeVal)
-        else:
-            raise ARSError(
-                'An unknown data type was encountered for field name '
-                '{} on schema {}'.format(field_name, schema)
-            )
-
     def _update_field(self, schema, field_id, value, field_value_struct):
         """
         Updates a provided ARFieldValueStruct item with the appropriate
@@ -1247,39 +3244,49 @@ class ARS(object):
 
         field_value_struct.fieldId = field_id
         field_value_struct.value.dataType = data_type
-        if data_type == arh.AR_DATA_TYPE_NULL:
-            pass
-        elif data_type == arh.AR_DATA_TYPE_INTEGER:
-            field_value_struct.value.u.intVal = value
-        elif data_type == arh.AR_DATA_TYPE_REAL:
-            field_value_struct.value.u.realVal = value
-        elif data_type == arh.AR_DATA_TYPE_CHAR:
-            # Ensure that we don't pass a NULL pointer into strdup
-            if value is None:
-                raise ARSError(
-                    'The value specified for field name {} on schema {} '
-                    'cannot be None'.format(field_name, schema)
+
+        # Values of the wrong type are rejected by ctypes (or have no
+        # timetuple for time fields) and unknown enum names aren't mapped
+        try:
+            if data_type == arh.AR_DATA_TYPE_NULL:
+                pass
+            elif data_type == arh.AR_DATA_TYPE_INTEGER:
+                field_value_struct.value.u.intVal = value
+            elif data_type == arh.AR_DATA_TYPE_REAL:
+                field_value_struct.value.u.realVal = value
+            elif data_type == arh.AR_DATA_TYPE_CHAR:
+                # Ensure that we don't pass a NULL pointer as a character
+                # value
+                if value is None:
+                    raise ARSError(
+                        'The value specified for field name {} on schema {} '
+                        'cannot be None'.format(field_name, schema)
+                    )
+                # ctypes would treat an integer as the address of a string
+                if not isinstance(value, bytes):
+                    raise TypeError(value)
+                # The field value list is owned by Python and never freed
+                # using FreeARFieldValueList, so the struct may reference the
+                # string directly (ctypes keeps it alive along with the
+                # struct)
+                field_value_struct.value.u.charVal = value
+            elif data_type == arh.AR_DATA_TYPE_ENUM:
+                field_value_struct.value.u.enumVal = (
+                    self.enum_name_to_id_cache[schema][field_id][value]
                 )
-            # Note that we must allocate a new block of memory using
-            # strdup or we end up with a nasty invalid pointer error
-            field_value_struct.value.u.charVal = cast(
-                self.clib.strdup(value), c_char_p
-            )
-        elif data_type == arh.AR_DATA_TYPE_ENUM:
-            try:
-                enum_id = self.enum_name_to_id_cache[schema][field_id][value]
-            except KeyError:
+            elif data_type == arh.AR_DATA_TYPE_TIME:
+                field_value_struct.value.u.timeVal = int(
+                    time.mktime(value.timetuple())
+                )
+            else:
                 raise ARSError(
-                    'An invalid value {} was specified for field name {} '
-                    'on schema {}'.format(value, field_name, schema)
+                    'An unknown data type was encountered for field name {} '
+                    'on schema {}'.format(field_name, schema)
                 )
-            field_value_struct.value.u.enumVal = enum_id
-        elif data_type == arh.AR_DATA_TYPE_TIME:
-            field_value_struct.value.u.timeVal = value.strftime('%s')
-        else:
+        except (AttributeError, KeyError, TypeError, ValueError):
             raise ARSError(
-                'An unknown data type was encountered for field name {} '
-                'on schema {}'.format(field_name, schema)
+                'An invalid value {} was specified for field name {} on '
+                'schema {}'.format(value, field_name, schema)
             )
 
     def _update_errors(self, schema=None):
@@ -1291,13 +3298,109 @@ class ARS(object):
                            for create and update operations)
         """
 
+        self.errors.extend(self._status_errors(self.status, schema))
+
+    def _get_session_configuration(self, variable_id):
+        """
+        Retrieves the value of a session configuration variable.
+
+        :param int variable_id: the session configuration variable
+        :return: the value of the variable
+        :raises: ARSError
+        """
+
+        value_struct = arh.ARValueStruct()
+
+        if (
+            self.arlib.ARGetSessionConfiguration(
+                # ARControlStruct *control: the control record
+                byref(self.control),
+                # unsigned int variableId: the variable to retrieve
+                variable_id,
+
+                # (return) ARValueStruct *variableValue: the value of the
+                # variable
+                byref(value_struct),
+                # (return) ARStatusList *status: notes, warnings or errors
+                # generated by the operation
+                byref(self.status)
+            ) >= arh.AR_RETURN_ERROR
+        ):
+            self._update_errors()
+            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+            raise ARSError(
+                'Unable to retrieve session configuration variable '
+                '{}'.format(variable_id)
+            )
+
+        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+
+        # Session configuration variables are all integers, so the value
+        # holds no memory that must be freed
+        return value_struct.u.intVal
+
+    def _set_session_configuration(self, variable_id, value):
+        """
+        Sets the value of a session configuration variable.
+
+        :param int variable_id: the session configuration variable
+        :param int value: the value to set
+        :raises: ARSError
+        """
+
+        value_struct = arh.ARValueStruct()
+        value_struct.dataType = arh.AR_DATA_TYPE_INTEGER
+        value_struct.u.intVal = value
+
+        if (
+            self.arlib.ARSetSessionConfiguration(
+                # ARControlStruct *control: the control record
+                byref(self.control),
+                # unsigned int variableId: the variable to set
+                variable_id,
+                # ARValueStruct *variableValue: the value to set
+                byref(value_struct),
+
+                # (return) ARStatusList *status: notes, warnings or errors
+                # generated by the operation
+                byref(self.status)
+            ) >= arh.AR_RETURN_ERROR
+        ):
+            self._update_errors()
+            self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+            raise ARSError(
+                'Unable to set session configuration variable {} to '
+                '{}'.format(variable_id, value)
+            )
+
+        self.arlib.FreeARStatusList(byref(self.status), arh.FALSE)
+
+    def _status_errors(
+        self, status, schema=None, message_type=arh.AR_RETURN_OK
+    ):
+        """
+        Converts the messages of a status list into error tuples.
+
+        :param ARStatusList status: the status list to convert
+        :param str schema: the schema name related to the error (only required
+                           for create and update operations)
+        :param int message_type: the least severe message type to include
+        :return: a list of tuples containing the message number, message text
+                 and appended text of each message
+        """
+
+        errors = []
+
         # Go through each error present and add them to the errors list
-        for i in range(self.status.numItems):
-            message_number = self.status.statusList[i].messageNum
-            message_text = self.status.statusList[i].messageText
+        for i in range(status.numItems):
+            if status.statusList[i].messageType < message_type:
+                continue
+
+            message_number = status.statusList[i].messageNum
+            message_text = status.statusList[i].messageText
             appended_text = None
 
-            if self.status.statusList[i].appendedText:
+            if status.statusList[i].appendedText:
                 # If a schema is specified and we encounter one of the
                 # following errors, we must map field ids to names in the
                 # appended text field of the error.
@@ -1305,13 +3408,15 @@ class ARS(object):
                 # ARERR 326: Required field cannot be reset to a NULL value
                 if schema and message_number in [307, 326]:
                     try:
-                        field_id = int(self.status.statusList[i].appendedText)
+                        field_id = int(status.statusList[i].appendedText)
                         appended_text = (
                             self.field_id_to_name_cache[schema][field_id]
                         )
                     except (ValueError, IndexError):
-                        appended_text = self.status.statusList[i].appendedText
+                        appended_text = status.statusList[i].appendedText
                 else:
-                    appended_text = self.status.statusList[i].appendedText
+                    appended_text = status.statusList[i].appendedText
+
+            errors.append((message_number, message_text, appended_text))
 
-            self.errors.append((message_number, message_text, appended_text))
+        return errors
@@ -0,0 +1,420 @@
+from abc import abstractmethod
+from collections import OrderedDict
+import json
+import sqlite3
+
+from .compat import AbstractBase
+
+
+class CachedQualifier(object):
+    """
+    A loaded ARQualifierStruct held by a QualifierCache.  The struct is
+    pinned while it is in use by one or more operations and is only freed
+    once it has been evicted and every user has released it.
+    """
+
+    __slots__ = ['schema', 'struct', 'generation', 'users', 'evicted']
+
+    def __init__(self, schema, struct, generation=None):
+        #: The schema the qualifier was loaded for
+        self.schema = schema
+
+        #: The loaded ARQualifierStruct
+        self.struct = struct
+
+        #: The generation of the field details the qualifier was loaded
+        #: against
+        self.generation = generation
+
+        #: The number of operations currently using the struct
+        self.users = 0
+
+        #: Whether the struct has been removed from the cache
+        self.evicted = False
+
+
+class QualifierCache(object):
+    """
+    A least recently used cache of ARQualifierStruct objects keyed by schema
+    and qualification string, which allows repeated queries to skip the
+    ARLoadARQualifierStruct call.
+
+    Each qualifier records the generation of the field details it was
+    loaded against, so qualifiers are reloaded once the field details of
+    their schema are replaced (possibly by another session sharing the
+    field caches).
+
+    :param free: a function which frees the contents of an ARQualifierStruct
+    :param int size: the maximum number of qualifiers to keep (0 disables
+                     caching)
+    """
+
+    def __init__(self, free, size=100):
+        #: The maximum number of qualifiers held by the cache
+        self.size = size
+
+        self._free = free
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def acquire(self, schema, qualifier, generation=None):
+        """
+        Looks up a cached qualifier and pins it for use.  Each qualifier
+        acquired must be returned using release.
+
+        :param str schema: the schema the qualifier was loaded for
+        :param str qualifier: the qualification string
+        :param generation: the current generation of the field details of
+                           the schema
+        :return: the CachedQualifier or None if it isn't cached (or was
+                 loaded against a previous generation)
+        """
+
+        key = (schema, qualifier)
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+
+        if entry.generation != generation:
+            self._evict(entry)
+            return None
+
+        # Re-insert the entry so that it becomes the most recently used
+        self._entries[key] = entry
+        entry.users += 1
+        return entry
+
+    def add(self, schema, qualifier, struct, generation=None):
+        """
+        Adds a newly loaded qualifier to the cache and pins it for use,
+        evicting the least recently used qualifiers if the cache is full.
+
+        :param str schema: the schema the qualifier was loaded for
+        :param str qualifier: the qualification string
+        :param ARQualifierStruct struct: the loaded qualifier
+        :param generation: the generation of the field details the
+                           qualifier was loaded against
+        :return: the CachedQualifier
+        """
+
+        entry = CachedQualifier(schema, struct, generation)
+        entry.users = 1
+
+        if self.size <= 0:
+            # Caching is disabled so the struct is freed on release
+            entry.evicted = True
+            return entry
+
+        key = (schema, qualifier)
+        if key in self._entries:
+            self._evict(self._entries.pop(key))
+        self._entries[key] = entry
+
+        while len(self._entries) > self.size:
+            key, old_entry = self._entries.popitem(last=False)
+            self._evict(old_entry)
+
+        return entry
+
+    def release(self, entry):
+        """
+        Unpins a qualifier previously obtained using acquire or add, freeing
+        it if it has since been evicted.
+
+        :param CachedQualifier entry: the qualifier to release
+        """
+
+        entry.users -= 1
+        if entry.evicted and entry.users == 0:
+            self._free(entry.struct)
+
+    def invalidate(self, schema=None):
+        """
+        Evicts all qualifiers for a particular schema (or all schemas).
+
+        :param str schema: the schema to evict qualifiers for (None evicts
+                           every qualifier)
+        """
+
+        for key in list(self._entries):
+            if schema is None or key[0] == schema:
+                self._evict(self._entries.pop(key))
+
+    def _evict(self, entry):
+        """
+        Marks a qualifier as evicted and frees it unless it is still in use.
+
+        :param CachedQualifier entry: the qualifier to evict
+        """
+
+        entry.evicted = True
+        if entry.users == 0:
+            self._free(entry.struct)
+
+
+class EnumMappings(object):
+    """
+    The enum mappings of a schema in one direction (enum id to name or enum
+    name to id), keyed by field id.  The enum ids and names of each field
+    are held as retrieved and each mapping is only built the first time it
+    is looked up, so schemas containing many enum fields are cheap to cache
+    when only a few of their fields are used.
+
+    :param OrderedDict tables: a list of enum id and enum name tuples for
+                               each enum field keyed by field id
+    :param build: a function which converts a list of enum id and enum name
+                  tuples into a mapping
+    """
+
+    def __init__(self, tables, build):
+        #: The enum id and enum name tuples of each enum field
+        self.tables = tables
+
+        self._build = build
+        self._mappings = {}
+
+    def __contains__(self, field_id):
+        return field_id in self.tables
+
+    def __iter__(self):
+        return iter(self.tables)
+
+    def __len__(self):
+        return len(self.tables)
+
+    def __getitem__(self, field_id):
+        try:
+            return self._mappings[field_id]
+        except KeyError:
+            # Sessions sharing the cache may build the same mapping
+            # concurrently, which is harmless as the results are identical
+            mapping = self._build(self.tables[field_id])
+            self._mappings[field_id] = mapping
+            return mapping
+
+    def get(self, field_id, default=None):
+        """
+        Looks up the enum mapping of a field.
+
+        :param int field_id: the field id of the enum field
+        :param default: the value to return if the field isn't an enum
+        :return: the enum mapping or the default
+        """
+
+        if field_id not in self.tables:
+            return default
+        return self[field_id]
+
+
+class EnumNames(object):
+    """
+    The enum names of a field whose enum ids are contiguous from zero (as is
+    always the case for regular enums), held in a list indexed by enum id.
+    Like the dicts used for other enum fields, looking up an enum id which
+    the field doesn't contain raises KeyError (rather than IndexError or
+    wrapping around for negative enum ids).
+
+    :param list names: the enum names in enum id order
+    """
+
+    __slots__ = ['names']
+
+    def __init__(self, names):
+        #: The enum names in enum id order
+        self.names = names
+
+    def __contains__(self, enum_id):
+        return 0 <= enum_id < len(self.names)
+
+    def __iter__(self):
+        return iter(range(len(self.names)))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, enum_id):
+        if 0 <= enum_id < len(self.names):
+            return self.names[enum_id]
+        raise KeyError(enum_id)
+
+    def get(self, enum_id, default=None):
+        """
+        Looks up the name of an enum id.
+
+        :param int enum_id: the enum id
+        :param default: the value to return if the enum id doesn't exist
+        :return: the enum name or the default
+        """
+
+        if 0 <= enum_id < len(self.names):
+            return self.names[enum_id]
+        return default
+
+
+def enum_id_to_name(enums):
+    """
+    Builds a mapping of enum ids to names.  Enum ids which are contiguous
+    from zero are mapped using a list indexed by enum id, while any others
+    use a dict.
+
+    :param list enums: a list of enum id and enum name tuples
+    :return: an EnumNames or dict of enum names keyed by enum id
+    """
+
+    if all(enum_id == i for i, (enum_id, enum_name) in enumerate(enums)):
+        return EnumNames([enum_name for enum_id, enum_name in enums])
+    return dict(enums)
+
+
+def enum_name_to_id(enums):
+    """
+    Builds a mapping of enum names to ids.
+
+    :param list enums: a list of enum id and enum name tuples
+    :return: a dict of enum ids keyed by enum name
+    """
+
+    return dict((enum_name, enum_id) for enum_id, enum_name in enums)
+
+
+class MetadataCache(AbstractBase):
+    """
+    The interface of a persistent cache which stores the field and enum
+    details of schemas between sessions.  Subclasses may store details in
+    any backend (e.g. a local file, redis or memcached).
+
+    Metadata is provided as a dict containing 'fields' (a list of field id,
+    field name and data type tuples, where the data type is None for fields
+    which have only been listed by a session using partial_fields) and
+    'enums' (a list of field id and enum mapping tuples where each enum
+    mapping is a list of enum id and enum name tuples).
+    """
+
+    @abstractmethod
+    def load(self, server, schema):
+        """
+        Retrieves the saved metadata of a schema.
+
+        :param str server: the Remedy ARS server the schema belongs to
+        :param str schema: the schema name to retrieve metadata for
+        :return: a tuple containing the epoch timestamp at which the metadata
+                 was retrieved and the metadata itself, or None if no
+                 metadata has been saved
+        """
+
+    @abstractmethod
+    def save(self, server, schema, timestamp, metadata):
+        """
+        Saves the metadata of a schema.
+
+        :param str server: the Remedy ARS server the schema belongs to
+        :param str schema: the schema name to save metadata for
+        :param int timestamp: the epoch timestamp at which the metadata was
+                              retrieved
+        :param dict metadata: the metadata to save
+        """
+
+
+class SQLiteMetadataCache(MetadataCache):
+    """
+    A persistent metadata cache stored in a local SQLite database, which
+    may be shared by multiple processes and threads.  Metadata is stored as
+    JSON so that loading it can never run code, even if the database file
+    has been written by someone else.
+
+    :param str path: the path of the database file
+    """
+
+    def __init__(self, path):
+        #: The path of the database file
+        self.path = path
+
+        connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS schema_metadata ('
+                    'server BLOB, schema BLOB, timestamp INTEGER, '
+                    'metadata BLOB, PRIMARY KEY (server, schema))'
+                )
+        finally:
+            connection.close()
+
+    def load(self, server, schema):
+        connection = sqlite3.connect(self.path)
+        try:
+            row = connection.execute(
+                'SELECT timestamp, metadata FROM schema_metadata '
+                'WHERE server = ? AND schema = ?', (server, schema)
+            ).fetchone()
+        finally:
+            connection.close()
+
+        if row is None:
+            return None
+
+        timestamp, metadata = row
+
+        # Metadata which can't be decoded (e.g. metadata pickled by earlier
+        # versions) is treated as missing
+        try:
+            return timestamp, _from_json(json.loads(metadata))
+        except (TypeError, ValueError):
+            return None
+
+    def save(self, server, schema, timestamp, metadata):
+        connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO schema_metadata '
+                    '(server, schema, timestamp, metadata) '
+                    'VALUES (?, ?, ?, ?)', (
+                        server, schema, timestamp,
+                        json.dumps(_to_json(metadata))
+                    )
+                )
+        finally:
+            connection.close()
+
+
+def _to_json(value):
+    """
+    Converts metadata into values which can be serialised as JSON.  Names
+    are byte strings, which are stored as text decoded using latin-1 so
+    that any byte string survives the round trip.
+
+    :param value: the metadata to convert
+    :return: the converted metadata
+    """
+
+    if isinstance(value, bytes):
+        return value.decode('latin-1')
+    elif isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    elif isinstance(value, dict):
+        return dict((key, _to_json(item)) for key, item in value.items())
+    return value
+
+
+def _from_json(value):
+    """
+    Converts metadata deserialised from JSON back into the form it was
+    saved in, restoring names as byte strings (tuples are returned as
+    lists).
+
+    :param value: the deserialised metadata
+    :return: the converted metadata
+    """
+
+    if isinstance(value, type(u'')):
+        return value.encode('latin-1')
+    elif isinstance(value, list):
+        return [_from_json(item) for item in value]
+    elif isinstance(value, dict):
+        return dict(
+            (str(key), _from_json(item)) for key, item in value.items()
+        )
+    return value
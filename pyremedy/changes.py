@@ -0,0 +1,209 @@
+import time
+
+from . import arh
+from .qualifier import F
+
+
+class ChangeFeed(object):
+    """
+    Polls a schema for entries which have been created or modified since
+    the last poll, so consumers don't need to scan the entire schema
+    repeatedly::
+
+        feed = ChangeFeed(
+            ars, 'HPD:Help Desk', ['Status', 'Short Description'],
+            F('Status') != 'Closed'
+        )
+
+        for batch in feed.watch(interval=60):
+            for entry_id, entry_values in batch:
+                ...
+
+    The feed keeps a watermark containing the latest Modified Date seen
+    (as an epoch timestamp) along with the entry ids seen at that exact
+    time.  Each poll retrieves entries modified at or after the watermark
+    in Modified Date and Request ID order, paging on both fields rather
+    than using offsets.  As Modified Date only has a resolution of one
+    second, entries sharing the watermark's time are retrieved again and
+    any which were already seen are skipped, so entries modified in the
+    same second as a poll are still picked up by the next one.
+
+    The qualifier restricting the entries followed may be a qualification
+    string, which is loaded once and kept in the qualifier cache of the
+    session, or a Qualifier.  Either is combined with the watermark of
+    each page.
+
+    The watermark only advances once a batch has been consumed (i.e. when
+    the next batch is requested), so a batch being processed when a
+    consumer fails is delivered again.  The watermark may be saved and
+    passed to a new feed to resume where a previous feed left off.
+
+    :param ARS ars: the session used to retrieve entries
+    :param str schema: the schema name to follow
+    :param fields: a list of field names to retrieve for each entry (Modified
+                   Date is always retrieved)
+    :type fields: list of strings
+    :param qualifier: restricts the entries followed (None follows all
+                      entries)
+    :type qualifier: string or Qualifier
+    :param tuple watermark: a watermark saved from a previous feed (None
+                            retrieves all existing entries on the first
+                            poll)
+    :param int page_size: the number of entries retrieved per call, which
+                          is also the maximum size of each batch
+    :param bool as_rows: whether to return entry values as Row objects
+                         rather than dicts
+    :raises: ARSError
+    """
+
+    def __init__(
+        self, ars, schema, fields, qualifier=None, watermark=None,
+        page_size=100, as_rows=False
+    ):
+        #: The session used to retrieve entries
+        self.ars = ars
+
+        #: The schema name being followed
+        self.schema = schema
+
+        #: The field names retrieved for each entry
+        self.fields = list(fields)
+
+        #: The qualifier restricting the entries followed
+        self.qualifier = qualifier
+
+        #: The number of entries retrieved per call
+        self.page_size = page_size
+
+        #: Whether entry values are returned as Row objects
+        self.as_rows = as_rows
+
+        # The latest Modified Date seen and the entry ids seen at that time
+        self._modified = None
+        self._boundary_ids = set()
+
+        if watermark is not None:
+            self._modified, boundary_ids = watermark
+            self._boundary_ids = set(boundary_ids)
+
+    @property
+    def watermark(self):
+        """
+        The position of the feed as a tuple containing the latest Modified
+        Date seen as an epoch timestamp and a list of the entry ids seen at
+        that time (or None if no entries have been seen yet).
+        """
+
+        if self._modified is None:
+            return None
+        return self._modified, sorted(self._boundary_ids)
+
+    def poll(self):
+        """
+        Retrieves all entries created or modified since the watermark.
+
+        :return: a generator of batches, where each batch is a list of
+                 tuples containing the entry id and entry values of up to
+                 page_size entries in modification order
+        :raises: ARSError
+        """
+
+        # Ensure that the name of Modified Date is known
+        self.ars.update_fields(self.schema, [arh.AR_CORE_MODIFIED_DATE])
+        modified_field = self.ars.field_id_to_name_cache[self.schema][
+            arh.AR_CORE_MODIFIED_DATE
+        ]
+
+        fields = self.fields
+        if modified_field not in fields:
+            fields = fields + [modified_field]
+
+        # An empty qualification string matches all entries
+        qualifier = self.qualifier if self.qualifier is not None else b''
+
+        # The Modified Date and entry id of the last entry retrieved
+        after = None
+
+        while True:
+            # Modified Date is read as the epoch timestamp retrieved, as
+            # converting the datetime returned back into a timestamp is
+            # ambiguous around daylight saving time changes
+            entries, timestamps = self.ars._query(
+                self.schema, qualifier, fields, arh.AR_START_WITH_FIRST_ENTRY,
+                self.page_size, self.as_rows, [
+                    (arh.AR_CORE_MODIFIED_DATE, 'asc'),
+                    (arh.AR_CORE_ENTRY_ID, 'asc')
+                ], self._page_window(after), arh.AR_CORE_MODIFIED_DATE
+            )
+            match_count = self.ars.match_count
+
+            modified = self._modified
+            boundary_ids = set(self._boundary_ids)
+            batch = []
+
+            # Entries are sorted by Modified Date, so the watermark only
+            # moves forward
+            for entry, entry_modified in zip(entries, timestamps):
+                entry_id = entry[0]
+                if entry_modified != modified:
+                    modified = entry_modified
+                    boundary_ids = set()
+                elif entry_id in boundary_ids:
+                    continue
+
+                boundary_ids.add(entry_id)
+                batch.append(entry)
+
+            if batch:
+                yield batch
+
+            self._modified = modified
+            self._boundary_ids = boundary_ids
+
+            # The server may return fewer entries than requested when its
+            # Max-Entries-Returned-By-GetList limit is below the page size,
+            # so only an empty page or retrieving every match of the page's
+            # qualifier indicates that all changes have been retrieved
+            if not entries or len(entries) >= match_count:
+                break
+
+            after = (timestamps[-1], entries[-1][0])
+
+    def watch(self, interval=60):
+        """
+        Polls for changes indefinitely, waiting between polls once all
+        changes have been retrieved.
+
+        :param float interval: the number of seconds to wait between polls
+        :return: a generator of batches as per poll
+        :raises: ARSError
+        """
+
+        while True:
+            for batch in self.poll():
+                yield batch
+
+            time.sleep(interval)
+
+    def _page_window(self, after):
+        """
+        Builds the qualifier restricting the next page of changes to those
+        following the watermark (or the last entry retrieved by this poll).
+
+        :param tuple after: the Modified Date and entry id of the last entry
+                            retrieved by this poll (or None for the first
+                            page)
+        :return: the Qualifier (or None if all entries are to be retrieved)
+        """
+
+        modified = F(arh.AR_CORE_MODIFIED_DATE)
+
+        if after is not None:
+            after_modified, after_entry_id = after
+            return (modified > after_modified) | (
+                (modified == after_modified) &
+                (F(arh.AR_CORE_ENTRY_ID) > after_entry_id)
+            )
+        elif self._modified is not None:
+            return modified >= self._modified
+        return None
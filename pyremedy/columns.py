@@ -0,0 +1,186 @@
+from array import array
+from collections import OrderedDict
+
+from . import arh
+from .decoder import build_converter
+from .exceptions import ARSError
+
+
+# Epoch timestamps are stored as signed 64-bit integers.  Python 2 arrays
+# don't support the 'q' type code, although a C long is 64 bits on the
+# platforms supported by the Remedy ARS C API.
+try:
+    TIME_TYPECODE = 'q'
+    array(TIME_TYPECODE)
+except ValueError:
+    TIME_TYPECODE = 'l'
+
+
+class Columns(object):
+    """
+    The result of a columnar query, holding the values of each field in a
+    single column rather than one dict per entry.  Integer, real and time
+    values are stored in array.array columns (times as epoch timestamps),
+    enum values as arrays of enum ids alongside a label table and all other
+    values in lists.
+
+    Array columns may be passed straight to NumPy (e.g. numpy.frombuffer)
+    and the entire result to pandas::
+
+        columns = ars.query_columns(schema, qualifier, fields)
+        frame = pandas.DataFrame(columns.columns, index=columns.entry_ids)
+
+    :param ARS ars: the session used to resolve fields
+    :param str schema: the schema name the entries belong to
+    :param fields: a list of validated field names being retrieved
+    :type fields: list of strings
+    """
+
+    def __init__(self, ars, schema, fields):
+        #: The schema the entries belong to
+        self.schema = schema
+
+        #: The entry id of each entry
+        self.entry_ids = []
+
+        #: The values of each field (by field name) in entry order
+        self.columns = OrderedDict()
+
+        #: Arrays flagging entries which contain a NULL value for each field
+        #: (only present for fields which contain NULL values)
+        self.nulls = {}
+
+        #: Mappings of enum ids to names for each enum field
+        self.labels = {}
+
+        # The field name, data type, column and converter for each field id
+        self._plan = {}
+
+        # The entries containing a NULL value for each field name
+        self._null_rows = {}
+
+        for field in fields:
+            field_id = ars.field_name_to_id_cache[schema][field]
+            data_type = ars.field_id_to_type_cache[schema][field_id]
+
+            if data_type == arh.AR_DATA_TYPE_INTEGER:
+                column = array('i')
+            elif data_type == arh.AR_DATA_TYPE_REAL:
+                column = array('d')
+            elif data_type == arh.AR_DATA_TYPE_TIME:
+                column = array(TIME_TYPECODE)
+            elif data_type == arh.AR_DATA_TYPE_ENUM:
+                enums = ars.enum_id_to_name_cache[schema].tables[field_id]
+                self.labels[field] = dict(enums)
+                # Enum ids are generally small, although custom enums may
+                # use any id
+                if enums and max(self.labels[field]) > 0xFFFF:
+                    column = array('I')
+                else:
+                    column = array('H')
+            else:
+                column = []
+
+            self.columns[field] = column
+            self._plan[field_id] = (
+                field, data_type, column,
+                build_converter(ars, schema, field_id)
+            )
+
+    def __len__(self):
+        return len(self.entry_ids)
+
+    def _add_entries(self, entry_list):
+        """
+        Appends the entries of a retrieved AREntryListFieldValueList to the
+        columns.  The entry list itself is not freed.
+
+        :param AREntryListFieldValueList entry_list: the retrieved entries
+        :return: the number of entries added
+        :raises: ARSError
+        """
+
+        for i in range(entry_list.numItems):
+            entry = entry_list.entryList[i]
+
+            # Entries containing more than one id are not supported
+            if entry.entryId.numItems != 1:
+                raise ARSError(
+                    'One or more entries contained multiple IDs that are not '
+                    'supported by PyRemedy'
+                )
+
+            row = len(self.entry_ids)
+            self.entry_ids.append(entry.entryId.entryIdList[0].value)
+
+            field_value_list = entry.entryValues.contents
+            for j in range(field_value_list.numItems):
+                field_value = field_value_list.fieldValueList[j]
+                field, data_type, column, convert = (
+                    self._plan[field_value.fieldId]
+                )
+                value_struct = field_value.value
+
+                if value_struct.dataType == arh.AR_DATA_TYPE_NULL:
+                    self._add_null(field, column, row)
+                elif data_type == arh.AR_DATA_TYPE_INTEGER:
+                    column.append(value_struct.u.intVal)
+                elif data_type == arh.AR_DATA_TYPE_REAL:
+                    column.append(value_struct.u.realVal)
+                elif data_type == arh.AR_DATA_TYPE_TIME:
+                    column.append(value_struct.u.timeVal)
+                elif data_type == arh.AR_DATA_TYPE_ENUM:
+                    column.append(value_struct.u.enumVal)
+                elif data_type == arh.AR_DATA_TYPE_CHAR:
+                    column.append(value_struct.u.charVal)
+                else:
+                    column.append(convert(value_struct))
+
+            # Treat any fields missing from the entry as NULL so that all
+            # columns stay aligned with the entry ids
+            if field_value_list.numItems != len(self._plan):
+                for field, data_type, column, convert in self._plan.values():
+                    if len(column) == row:
+                        self._add_null(field, column, row)
+
+        return entry_list.numItems
+
+    def _add_null(self, field, column, row):
+        """
+        Appends a NULL value to a column.
+
+        :param str field: the field name of the column
+        :param column: the column to append to
+        :param int row: the index of the entry containing the NULL value
+        """
+
+        column.append(0 if isinstance(column, array) else None)
+        self._null_rows.setdefault(field, []).append(row)
+
+    def _string_bytes(self, rows):
+        """
+        Determines the total length of the character values in the last
+        rows added.
+
+        :param int rows: the number of rows to include
+        :return: the total length of the values
+        """
+
+        string_bytes = 0
+        for column in self.columns.values():
+            if isinstance(column, list):
+                for value in column[len(column) - rows:]:
+                    if isinstance(value, bytes):
+                        string_bytes += len(value)
+        return string_bytes
+
+    def _finish(self):
+        """Builds the null arrays once all entries have been added."""
+
+        for field, rows in self._null_rows.items():
+            mask = array('b', [0]) * len(self.entry_ids)
+            for row in rows:
+                mask[row] = 1
+            self.nulls[field] = mask
+
+        self._null_rows = {}
@@ -0,0 +1,33 @@
+from abc import ABCMeta
+import sys
+
+
+# The base of abstract classes, created directly so that the metaclass is
+# applied on both Python 2 and 3
+AbstractBase = ABCMeta('AbstractBase', (object,), {})
+
+
+if sys.version_info[0] >= 3:
+    #: The types of integer values
+    integer_types = (int,)
+
+    def reraise(exc_type, exc_value, exc_traceback):
+        """
+        Raises an exception with the traceback it was originally raised with
+        (e.g. one caught in another thread using sys.exc_info).
+
+        :param type exc_type: the type of the exception
+        :param Exception exc_value: the exception to raise
+        :param traceback exc_traceback: the traceback of the exception
+        """
+
+        raise exc_value.with_traceback(exc_traceback)
+else:
+    #: The types of integer values (including long on Python 2)
+    integer_types = (int, long)  # noqa: F821
+
+    # The three argument raise statement is a syntax error on Python 3
+    exec(
+        'def reraise(exc_type, exc_value, exc_traceback):\n'
+        '    raise exc_type, exc_value, exc_traceback\n'
+    )
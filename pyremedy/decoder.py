@@ -0,0 +1,162 @@
+from datetime import datetime
+from decimal import Decimal
+
+from . import arh
+from .cache import EnumNames
+from .exceptions import ARSError
+
+
+# Functions which extract the value of each supported data type from the
+# union of an ARValueStruct (enums are handled separately as they require
+# the enum mappings of the field)
+EXTRACTORS = {
+    arh.AR_DATA_TYPE_INTEGER: lambda u: u.intVal,
+    arh.AR_DATA_TYPE_REAL: lambda u: u.realVal,
+    arh.AR_DATA_TYPE_CHAR: lambda u: u.charVal,
+    arh.AR_DATA_TYPE_TIME: lambda u, fromtimestamp=datetime.fromtimestamp: (
+        fromtimestamp(u.timeVal)
+    ),
+    arh.AR_DATA_TYPE_DECIMAL: lambda u: Decimal(u.decimalVal.decode('ascii'))
+}
+
+
+def decode_value(value_struct):
+    """
+    Converts an ARValueStruct which doesn't belong to a particular field
+    (e.g. a calculated statistic) into the related Python value.
+
+    :param ARValueStruct value_struct: the value to convert
+    :return: the value
+    :raises: ARSError
+    """
+
+    if value_struct.dataType == arh.AR_DATA_TYPE_NULL:
+        return None
+
+    extract = EXTRACTORS.get(value_struct.dataType)
+    if extract is None:
+        raise ARSError(
+            'An unknown data type {} was encountered'.format(
+                value_struct.dataType
+            )
+        )
+    return extract(value_struct.u)
+
+
+def build_plan(ars, schema, field_ids):
+    """
+    Builds a decoding plan for a set of fields whereby each field id is
+    mapped to the field name, the position of the field and a converter for
+    the values of the field.  Plans are built once per call so that decoding
+    each value only requires a lookup and a call to the related converter.
+
+    :param ARS ars: the session containing the field caches
+    :param str schema: the schema name the fields belong to
+    :param list field_ids: the field ids to decode (duplicates are ignored)
+    :return: a dict of field ids to field name, position and converter
+             tuples
+    """
+
+    plan = {}
+
+    for field_id in field_ids:
+        if field_id not in plan:
+            plan[field_id] = (
+                ars.field_id_to_name_cache[schema][field_id], len(plan),
+                build_converter(ars, schema, field_id)
+            )
+
+    return plan
+
+
+def build_converter(ars, schema, field_id):
+    """
+    Builds a function which converts an ARValueStruct of a field into the
+    related Python value.  The union member read is chosen once from the
+    type of the field, so converting a value only compares its data type
+    with that of the field (which also catches NULL values) before reading
+    it.
+
+    :param ARS ars: the session containing the field caches
+    :param str schema: the schema name the field belongs to
+    :param int field_id: the field id to build the converter for
+    :return: a function accepting an ARValueStruct and returning its value
+    """
+
+    data_type = ars.field_id_to_type_cache[schema][field_id]
+    field_name = ars.field_id_to_name_cache[schema][field_id]
+    enums = ars.enum_id_to_name_cache[schema].get(field_id)
+
+    def fallback(value_struct):
+        # Handles NULL values and values whose type differs from the field
+        if value_struct.dataType == arh.AR_DATA_TYPE_NULL:
+            return None
+
+        if (
+            value_struct.dataType == arh.AR_DATA_TYPE_ENUM and
+            enums is not None
+        ):
+            return enums[value_struct.u.enumVal]
+
+        extract = EXTRACTORS.get(value_struct.dataType)
+        if extract is None:
+            raise ARSError(
+                'An unknown data type was encountered for field name '
+                '{} on schema {}'.format(field_name, schema)
+            )
+        return extract(value_struct.u)
+
+    if data_type == arh.AR_DATA_TYPE_INTEGER:
+        def convert(value_struct):
+            if value_struct.dataType != data_type:
+                return fallback(value_struct)
+            return value_struct.u.intVal
+
+    elif data_type == arh.AR_DATA_TYPE_REAL:
+        def convert(value_struct):
+            if value_struct.dataType != data_type:
+                return fallback(value_struct)
+            return value_struct.u.realVal
+
+    elif data_type == arh.AR_DATA_TYPE_CHAR:
+        def convert(value_struct):
+            if value_struct.dataType != data_type:
+                return fallback(value_struct)
+            return value_struct.u.charVal
+
+    elif data_type == arh.AR_DATA_TYPE_ENUM and isinstance(enums, EnumNames):
+        # Contiguous enum ids index the list of names directly, leaving
+        # unknown enum ids to raise KeyError through the mapping itself
+        names = enums.names
+        count = len(names)
+
+        def convert(value_struct):
+            if value_struct.dataType != data_type:
+                return fallback(value_struct)
+            enum_id = value_struct.u.enumVal
+            if enum_id < count:
+                return names[enum_id]
+            return enums[enum_id]
+
+    elif data_type == arh.AR_DATA_TYPE_ENUM and enums is not None:
+        def convert(value_struct):
+            if value_struct.dataType != data_type:
+                return fallback(value_struct)
+            return enums[value_struct.u.enumVal]
+
+    elif data_type == arh.AR_DATA_TYPE_TIME:
+        def convert(value_struct, fromtimestamp=datetime.fromtimestamp):
+            if value_struct.dataType != data_type:
+                return fallback(value_struct)
+            return fromtimestamp(value_struct.u.timeVal)
+
+    elif data_type == arh.AR_DATA_TYPE_DECIMAL:
+        def convert(value_struct):
+            if value_struct.dataType != data_type:
+                return fallback(value_struct)
+            return Decimal(value_struct.u.decimalVal.decode('ascii'))
+
+    else:
+        return fallback
+
+    return convert
@@ -0,0 +1,239 @@
+from collections import OrderedDict
+import threading
+from timeit import default_timer
+
+from . import arh
+
+
+# Remedy ARS C API functions whose second argument is the schema name
+SCHEMA_FUNCTIONS = frozenset([
+    'ARCreateEntry', 'ARDeleteEntry', 'ARGetEntry', 'ARGetEntryStatistics',
+    'ARGetListEntryWithFields', 'ARGetListField', 'ARGetMultipleEntries',
+    'ARGetMultipleFields', 'ARLoadARQualifierStruct', 'ARSetEntry'
+])
+
+
+class Instrumentation(object):
+    """
+    The interface used by an ARS session to report the time spent in each
+    call to the Remedy ARS C API and in decoding retrieved entries.  The
+    methods of this class do nothing, so subclasses only need to implement
+    the events they are interested in (e.g. to forward them to StatsD).
+
+    Instrumentation objects may be shared by several sessions (e.g. all
+    sessions of an ARSPool) and must therefore be thread-safe.
+    """
+
+    def call(self, function, schema, seconds, failed):
+        """
+        Records a call to the Remedy ARS C API.
+
+        :param str function: the name of the C function called
+        :param str schema: the schema name passed to the function (None if
+                           the function isn't related to a schema)
+        :param float seconds: the wall time spent in the function
+        :param bool failed: whether the function returned an error
+        """
+
+    def decode(self, schema, rows, string_bytes, seconds):
+        """
+        Records the conversion of retrieved entries into Python values.
+
+        :param str schema: the schema name the entries belong to
+        :param int rows: the number of entries decoded
+        :param int string_bytes: the total length of all character values
+                                 decoded
+        :param float seconds: the wall time spent decoding the entries
+        """
+
+
+class Metrics(Instrumentation):
+    """
+    Instrumentation which keeps counters of C API calls (by function and
+    schema) and of decoded entries (by schema).  The counters may be read
+    as a dict using snapshot or exported in the Prometheus text exposition
+    format using prometheus::
+
+        metrics = Metrics()
+        ars = ARS(server, user, password, instrumentation=metrics)
+        ...
+        print(metrics.prometheus())
+    """
+
+    def __init__(self):
+        # The count, error count and total seconds of calls by function and
+        # schema
+        self._calls = OrderedDict()
+
+        # The count, rows, string bytes and total seconds of decodes by
+        # schema
+        self._decodes = OrderedDict()
+
+        self._lock = threading.Lock()
+
+    def call(self, function, schema, seconds, failed):
+        with self._lock:
+            counters = self._calls.get((function, schema))
+            if counters is None:
+                counters = self._calls[(function, schema)] = [0, 0, 0.0]
+            counters[0] += 1
+            if failed:
+                counters[1] += 1
+            counters[2] += seconds
+
+    def decode(self, schema, rows, string_bytes, seconds):
+        with self._lock:
+            counters = self._decodes.get(schema)
+            if counters is None:
+                counters = self._decodes[schema] = [0, 0, 0, 0.0]
+            counters[0] += 1
+            counters[1] += rows
+            counters[2] += string_bytes
+            counters[3] += seconds
+
+    def reset(self):
+        """Resets all counters."""
+
+        with self._lock:
+            self._calls.clear()
+            self._decodes.clear()
+
+    def snapshot(self):
+        """
+        Returns the current value of all counters.
+
+        :return: a dict containing 'calls' (a list of dicts with the
+                 function, schema, count, errors and seconds of each
+                 function and schema called) and 'decodes' (a list of dicts
+                 with the schema, count, rows, string_bytes and seconds of
+                 each schema decoded)
+        """
+
+        with self._lock:
+            return {
+                'calls': [
+                    {
+                        'function': function, 'schema': schema,
+                        'count': count, 'errors': errors, 'seconds': seconds
+                    }
+                    for (function, schema), (count, errors, seconds)
+                    in self._calls.items()
+                ],
+                'decodes': [
+                    {
+                        'schema': schema, 'count': count, 'rows': rows,
+                        'string_bytes': string_bytes, 'seconds': seconds
+                    }
+                    for schema, (count, rows, string_bytes, seconds)
+                    in self._decodes.items()
+                ]
+            }
+
+    def prometheus(self, prefix='pyremedy'):
+        """
+        Exports all counters in the Prometheus text exposition format.
+
+        :param str prefix: the prefix of each metric name
+        :return: the metrics as a text string
+        """
+
+        snapshot = self.snapshot()
+        lines = []
+
+        for name, key, description, source in [
+            (
+                'arlib_calls_total', 'count',
+                'Number of calls to the Remedy ARS C API', 'calls'
+            ),
+            (
+                'arlib_call_errors_total', 'errors',
+                'Number of calls to the Remedy ARS C API that failed',
+                'calls'
+            ),
+            (
+                'arlib_call_seconds_total', 'seconds',
+                'Wall time spent in calls to the Remedy ARS C API', 'calls'
+            ),
+            (
+                'decoded_rows_total', 'rows',
+                'Number of retrieved entries decoded', 'decodes'
+            ),
+            (
+                'decoded_string_bytes_total', 'string_bytes',
+                'Length of all character values decoded', 'decodes'
+            ),
+            (
+                'decode_seconds_total', 'seconds',
+                'Wall time spent decoding retrieved entries', 'decodes'
+            )
+        ]:
+            metric = '{}_{}'.format(prefix, name)
+            lines.append('# HELP {} {}'.format(metric, description))
+            lines.append('# TYPE {} counter'.format(metric))
+
+            for sample in snapshot[source]:
+                labels = []
+                if 'function' in sample:
+                    labels.append(
+                        'function="{}"'.format(_label(sample['function']))
+                    )
+                labels.append('schema="{}"'.format(_label(sample['schema'])))
+                lines.append('{}{{{}}} {}'.format(
+                    metric, ','.join(labels), sample[key]
+                ))
+
+        return '\n'.join(lines) + '\n'
+
+
+class InstrumentedLibrary(object):
+    """
+    A wrapper around the Remedy ARS C API which reports the wall time and
+    outcome of each function call to an Instrumentation object.  Functions
+    are wrapped on first use and must have their argument and return types
+    registered beforehand.
+
+    :param CDLL library: the Remedy ARS C API
+    :param Instrumentation instrumentation: the object to report calls to
+    """
+
+    def __init__(self, library, instrumentation):
+        self._library = library
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        function = getattr(self._library, name)
+        record = self._instrumentation.call
+        has_schema = name in SCHEMA_FUNCTIONS
+
+        def call(*args):
+            schema = args[1].value if has_schema else None
+            started = default_timer()
+            result = function(*args)
+            # FreeAR functions don't return a value
+            record(
+                name, schema, default_timer() - started,
+                result is not None and result >= arh.AR_RETURN_ERROR
+            )
+            return result
+
+        # Cache the wrapper so that later calls skip __getattr__
+        setattr(self, name, call)
+        return call
+
+
+def _label(value):
+    """
+    Converts a value into an escaped Prometheus label value.
+
+    :param value: the value to convert (None becomes an empty string)
+    :return: the escaped label value
+    """
+
+    if value is None:
+        value = ''
+    elif isinstance(value, bytes):
+        value = value.decode('utf-8', 'replace')
+
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
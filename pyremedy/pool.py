@@ -0,0 +1,477 @@
+from contextlib import contextmanager
+from datetime import datetime
+import sys
+import threading
+import time
+
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+
+from .ars import ARS
+from .compat import integer_types, reraise
+from .exceptions import ARSError
+from .qualifier import F, Qualifier
+
+
+# Remedy ARS errors which indicate that the connection behind a session can
+# no longer be relied upon
+# ARERR 90: Cannot establish a network connection to the AR System server
+# ARERR 91: RPC call failed
+AR_CONNECTION_ERRORS = frozenset([90, 91])
+
+
+class ARSPool(object):
+    """
+    The ARSPool object maintains a fixed number of ARS sessions against a
+    single Remedy ARS server and hands them out to threads one at a time.
+    All sessions in the pool share a single set of field and enum caches so
+    that schema metadata is only retrieved once for the entire pool.
+
+    Sessions are checked out using the session context manager::
+
+        pool = ARSPool(
+            server='myserver.domain.com', port=1234,
+            user='fots', password='password123', size=8
+        )
+
+        with pool.session() as ars:
+            entries = ars.query(schema, qualifier, fields)
+
+    An ARS session must only be used by one thread at a time, so sessions
+    should never be retained after they are returned to the pool.
+
+    :param str server: the Remedy ARS server to connect to
+    :param str user: the username to authenticate with
+    :param str password: the password to authenticate with
+    :param int size: the number of sessions to open
+    :param int port: the port number of the server
+    :param int rpc_program_number: the RPC program number of the server
+    :param float timeout: the default number of seconds to wait for a free
+                          session (None waits forever)
+    :param kwargs: additional keyword arguments passed to each ARS session
+                   (e.g. qualifier_cache_size)
+    :raises: ARSError
+    """
+
+    def __init__(
+        self, server, user, password, size=4, port=0, rpc_program_number=0,
+        timeout=None, **kwargs
+    ):
+        if size < 1:
+            raise ARSError(
+                'The pool size must be a positive number but {} was '
+                'specified'.format(size)
+            )
+
+        #: The number of sessions maintained by the pool
+        self.size = size
+
+        #: The default number of seconds to wait for a free session
+        self.timeout = timeout
+
+        #: A cache containing the time at which field details were retrieved
+        #: shared by all sessions
+        self.field_timestamp_cache = {}
+
+        #: A cache containing field id to name mappings shared by all sessions
+        self.field_id_to_name_cache = {}
+
+        #: A cache containing field name to id mappings shared by all sessions
+        self.field_name_to_id_cache = {}
+
+        #: A cache containing field id to type mappings shared by all sessions
+        self.field_id_to_type_cache = {}
+
+        #: A cache containing enum id to name mappings shared by all sessions
+        self.enum_id_to_name_cache = {}
+
+        #: A cache containing enum name to id mappings shared by all sessions
+        self.enum_name_to_id_cache = {}
+
+        #: A cache containing the generation of the field details of schemas
+        #: shared by all sessions
+        self.field_generation_cache = {}
+
+        #: A lock held while the field and enum caches are updated by any
+        #: session
+        self.field_lock = threading.RLock()
+
+        self._server = server
+        self._user = user
+        self._password = password
+        self._port = port
+        self._rpc_program_number = rpc_program_number
+        self._kwargs = kwargs
+
+        # Idle sessions waiting to be checked out.  A None item represents a
+        # slot whose session was discarded and must be reopened on checkout.
+        self._idle = Queue(maxsize=size)
+
+        self._closed = False
+
+        try:
+            for i in range(size):
+                self._idle.put(self._open())
+        except ARSError:
+            self.terminate()
+            raise
+
+    @contextmanager
+    def session(self, timeout=None):
+        """
+        A context manager which checks out a session for the duration of
+        the block and returns it to the pool afterwards.
+
+        :param float timeout: the number of seconds to wait for a free
+                              session (defaults to the pool timeout)
+        :return: an ARS session
+        :raises: ARSError
+        """
+
+        ars = self.checkout(timeout)
+        try:
+            yield ars
+        finally:
+            self.checkin(ars)
+
+    def checkout(self, timeout=None):
+        """
+        Removes a session from the pool, waiting for one to become free if
+        necessary.  Each session checked out must be returned using checkin.
+
+        :param float timeout: the number of seconds to wait for a free
+                              session (defaults to the pool timeout)
+        :return: an ARS session
+        :raises: ARSError
+        """
+
+        if self._closed:
+            raise ARSError('Unable to check out a session from a closed pool')
+
+        if timeout is None:
+            timeout = self.timeout
+
+        try:
+            ars = self._idle.get(timeout=timeout)
+        except Empty:
+            raise ARSError(
+                'Timed out after {} seconds waiting for a free '
+                'session'.format(timeout)
+            )
+
+        # Reopen a session that was previously discarded, giving the slot
+        # back to the pool if the server still can't be reached
+        if ars is None:
+            try:
+                ars = self._open()
+            except ARSError:
+                self._idle.put(None)
+                raise
+
+        return ars
+
+    def checkin(self, ars):
+        """
+        Returns a session to the pool.  Sessions which encountered a
+        connection error on their last call are terminated and replaced with
+        a new session the next time one is checked out.
+
+        :param ARS ars: the session to return
+        """
+
+        healthy = self._is_healthy(ars)
+        ars.errors = []
+
+        if self._closed or not healthy:
+            self._close(ars)
+            ars = None
+
+        self._idle.put(ars)
+
+    def terminate(self):
+        """
+        Terminates all sessions opened by the pool.  Sessions that are
+        currently checked out are terminated when they are returned.
+        """
+
+        self._closed = True
+
+        while True:
+            try:
+                ars = self._idle.get_nowait()
+            except Empty:
+                break
+            if ars is not None:
+                self._close(ars)
+
+    def query(
+        self, schema, qualifier, fields, partition_field=None,
+        boundaries=None, ordered=True, as_rows=False
+    ):
+        """
+        Runs a specified qualification string against a chosen schema and
+        returns all related records with the fields specified by the caller.
+
+        When a partition field and boundaries are provided, the qualifier is
+        split into disjoint sub-queries on ranges of the partition field
+        which are run concurrently on separate sessions.  For example, the
+        boundaries [1000, 2000] split the query into three sub-queries for
+        values below 1000, from 1000 up to 2000 and from 2000 onwards.
+
+        :param str schema: the schema name to run the query against
+        :param qualifier: the query determining which records to retrieve
+        :type qualifier: string or Qualifier
+        :param fields: a list of field names to retrieve from the schema
+        :type fields: list of strings
+        :param partition_field: the field name (or field id) to partition on
+        :type partition_field: string or int
+        :param list boundaries: sorted values of the partition field at which
+                                to split the query (integers, strings or
+                                datetime objects)
+        :param bool ordered: whether entries are returned in partition order
+                             (otherwise partitions are merged as they
+                             complete)
+        :param bool as_rows: whether to return entry values as Row objects
+                             rather than dicts
+        :return: a list of tuples containing the entries matching the criteria
+                 specified whereby each tuple contains the entry id and
+                 entry values
+        :raises: ARSError
+        """
+
+        return list(
+            self.iter_query(
+                schema, qualifier, fields, partition_field, boundaries,
+                ordered, as_rows
+            )
+        )
+
+    def iter_query(
+        self, schema, qualifier, fields, partition_field=None,
+        boundaries=None, ordered=False, as_rows=False
+    ):
+        """
+        Runs a specified qualification string against a chosen schema as
+        per query, yielding the records of each partition as soon as the
+        partition has been retrieved.
+
+        Unlike query, partitions are yielded in the order they complete by
+        default, as holding back a completed partition until every earlier
+        one has been retrieved would delay the first records yielded (query
+        returns nothing until all partitions are retrieved, so ordering its
+        results costs nothing).
+
+        Closing the generator early (e.g. by breaking out of a loop over it)
+        abandons the partitions which haven't started and waits for those in
+        progress, so all sessions are back in the pool once it is closed.
+
+        :param str schema: the schema name to run the query against
+        :param qualifier: the query determining which records to retrieve
+        :type qualifier: string or Qualifier
+        :param fields: a list of field names to retrieve from the schema
+        :type fields: list of strings
+        :param partition_field: the field name (or field id) to partition on
+        :type partition_field: string or int
+        :param list boundaries: sorted values of the partition field at which
+                                to split the query
+        :param bool ordered: whether entries are yielded in partition order
+        :param bool as_rows: whether to return entry values as Row objects
+                             rather than dicts
+        :return: a generator of tuples containing the entry id and entry
+                 values
+        :raises: ARSError
+        """
+
+        if partition_field is None or not boundaries:
+            qualifiers = [qualifier]
+        else:
+            qualifiers = self._partition_qualifiers(
+                qualifier, partition_field, boundaries
+            )
+
+        # Partitions are retrieved by a fixed set of workers, one for each
+        # session in the pool (or each partition if there are fewer)
+        tasks = Queue()
+        results = Queue()
+        stopped = threading.Event()
+
+        for task in enumerate(qualifiers):
+            tasks.put(task)
+
+        def run_partitions():
+            while not stopped.is_set():
+                try:
+                    index, partition_qualifier = tasks.get_nowait()
+                except Empty:
+                    break
+
+                try:
+                    with self.session() as ars:
+                        entries = ars.query(
+                            schema, partition_qualifier, fields,
+                            as_rows=as_rows
+                        )
+                    results.put((index, entries, None))
+                except Exception:
+                    results.put((index, None, sys.exc_info()))
+
+        workers = []
+        for i in range(min(self.size, len(qualifiers))):
+            worker = threading.Thread(target=run_partitions)
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+
+        pending = {}
+        next_index = 0
+
+        try:
+            for i in range(len(qualifiers)):
+                index, entries, exc_info = results.get()
+                if exc_info is not None:
+                    reraise(*exc_info)
+
+                if not ordered:
+                    for entry in entries:
+                        yield entry
+                    continue
+
+                # Hold back partitions which complete ahead of their turn
+                pending[index] = entries
+                while next_index in pending:
+                    for entry in pending.pop(next_index):
+                        yield entry
+                    next_index += 1
+        finally:
+            # Partitions which haven't started are abandoned if iteration
+            # fails or is stopped early, while those in progress are waited
+            # for so that their sessions are back in the pool once the
+            # generator is closed
+            stopped.set()
+            for worker in workers:
+                worker.join()
+
+    def _partition_qualifiers(self, qualifier, partition_field, boundaries):
+        """
+        Splits a qualifier into disjoint qualifiers covering consecutive
+        ranges of the partition field.
+
+        :param qualifier: the qualification string or qualifier to split
+        :type qualifier: string or Qualifier
+        :param partition_field: the field name (or field id) to partition on
+        :type partition_field: string or int
+        :param list boundaries: sorted values at which to split the qualifier
+        :return: a list of len(boundaries) + 1 qualifiers of the same type as
+                 the qualifier provided
+        :raises: ARSError
+        """
+
+        if isinstance(qualifier, Qualifier):
+            field = F(partition_field)
+            ranges = [field < boundaries[0]]
+            for low, high in zip(boundaries, boundaries[1:]):
+                ranges.append((field >= low) & (field < high))
+            ranges.append(field >= boundaries[-1])
+            return [qualifier & value_range for value_range in ranges]
+
+        if isinstance(partition_field, integer_types):
+            field = b"'" + str(partition_field).encode('ascii') + b"'"
+        else:
+            field = b"'" + partition_field + b"'"
+
+        values = [self._format_qualifier_value(value) for value in boundaries]
+
+        ranges = [field + b' < ' + values[0]]
+        for low, high in zip(values, values[1:]):
+            ranges.append(
+                field + b' >= ' + low + b' AND ' + field + b' < ' + high
+            )
+        ranges.append(field + b' >= ' + values[-1])
+
+        # An empty qualifier matches every record, leaving just the range
+        if not qualifier.strip():
+            return ranges
+
+        return [
+            b'(' + qualifier + b') AND (' + value_range + b')'
+            for value_range in ranges
+        ]
+
+    def _format_qualifier_value(self, value):
+        """
+        Converts a Python value into its representation in a qualification
+        string.
+
+        :param value: the value to convert
+        :type value: int, float, string or datetime
+        :return: the value as used in a qualification string
+        :raises: ARSError
+        """
+
+        if isinstance(value, datetime):
+            return str(int(time.mktime(value.timetuple()))).encode('ascii')
+        elif isinstance(value, integer_types):
+            return str(value).encode('ascii')
+        elif isinstance(value, float):
+            return repr(value).encode('ascii')
+        elif isinstance(value, bytes):
+            return b'"' + value.replace(b'"', b'""') + b'"'
+        else:
+            raise ARSError(
+                'An invalid partition boundary {!r} was specified (expected '
+                'an integer, float, string or datetime)'.format(value)
+            )
+
+    def _open(self):
+        """
+        Opens a new session which shares the caches of the pool.
+
+        :return: a new ARS session
+        :raises: ARSError
+        """
+
+        ars = ARS(
+            self._server, self._user, self._password, port=self._port,
+            rpc_program_number=self._rpc_program_number, **self._kwargs
+        )
+
+        ars.field_timestamp_cache = self.field_timestamp_cache
+        ars.field_id_to_name_cache = self.field_id_to_name_cache
+        ars.field_name_to_id_cache = self.field_name_to_id_cache
+        ars.field_id_to_type_cache = self.field_id_to_type_cache
+        ars.enum_id_to_name_cache = self.enum_id_to_name_cache
+        ars.enum_name_to_id_cache = self.enum_name_to_id_cache
+        ars.field_generation_cache = self.field_generation_cache
+        ars.field_lock = self.field_lock
+
+        return ars
+
+    def _close(self, ars):
+        """
+        Terminates a session, ignoring any errors as the session is being
+        discarded anyway.
+
+        :param ARS ars: the session to terminate
+        """
+
+        try:
+            ars.terminate()
+        except ARSError:
+            pass
+
+    def _is_healthy(self, ars):
+        """
+        Determines whether a session may be reused based on the errors
+        raised by its last call.
+
+        :param ARS ars: the session to check
+        :return: whether the session can be reused
+        """
+
+        for message_number, message_text, appended_text in ars.errors:
+            if message_number in AR_CONNECTION_ERRORS:
+                return False
+
+        return True
@@ -0,0 +1,355 @@
+from abc import abstractmethod
+from ctypes import cast, pointer, POINTER
+from datetime import datetime
+import time
+
+from . import arh
+from .compat import AbstractBase, integer_types
+from .exceptions import ARSError
+
+
+class Qualifier(AbstractBase):
+    """
+    A qualification built in Python which is converted directly into an
+    ARQualifierStruct, avoiding the ARLoadARQualifierStruct call and any
+    need to quote values in a qualification string.  Qualifiers are created
+    by comparing F objects and may be combined using & (AND), | (OR) and
+    ~ (NOT)::
+
+        qualifier = (
+            (F('Status') == 'Assigned') &
+            ((F('Priority') < 2) | ~F('Assignee').like('%Bot%'))
+        )
+
+    Please note that comparisons must be surrounded by parentheses when
+    combined as & and | take precedence over comparison operators in
+    Python.
+    """
+
+    def __and__(self, other):
+        return LogicalQualifier(arh.AR_COND_OP_AND, self, other)
+
+    def __or__(self, other):
+        return LogicalQualifier(arh.AR_COND_OP_OR, self, other)
+
+    def __invert__(self):
+        return NotQualifier(self)
+
+    def __bool__(self):
+        raise TypeError(
+            'Qualifiers must be combined using &, | and ~ rather than and, '
+            'or and not'
+        )
+
+    __nonzero__ = __bool__
+
+    def compile(self, ars, schema):
+        """
+        Builds an ARQualifierStruct for the qualifier, resolving field names
+        and enum values using the field caches of an ARS session.
+
+        The struct is owned by Python and must never be passed to
+        FreeARQualifierStruct.
+
+        :param ARS ars: the session used to resolve fields
+        :param str schema: the schema name to build the qualifier for
+        :return: the populated ARQualifierStruct
+        :raises: ARSError
+        """
+
+        # Ensure we have the field and enum details of the fields used
+        ars.update_fields(schema, self._fields())
+
+        qualifier_struct = arh.ARQualifierStruct()
+
+        # Keep a reference to every struct referenced by pointer so that
+        # they live as long as the qualifier itself
+        qualifier_struct.keep = []
+        self._build(ars, schema, qualifier_struct, qualifier_struct.keep)
+        return qualifier_struct
+
+    @abstractmethod
+    def _build(self, ars, schema, qualifier_struct, keep):
+        """
+        Populates an ARQualifierStruct for this qualifier.
+
+        :param ARS ars: the session used to resolve fields
+        :param str schema: the schema name to build the qualifier for
+        :param ARQualifierStruct qualifier_struct: the struct to populate
+        :param list keep: a list of objects that must be kept alive
+        :raises: ARSError
+        """
+
+    @abstractmethod
+    def _fields(self):
+        """
+        Lists the fields referenced by the qualifier.
+
+        :return: a list of field names (or field ids)
+        """
+
+
+class LogicalQualifier(Qualifier):
+    """
+    Combines two qualifiers using AND or OR.
+
+    :param int operation: AR_COND_OP_AND or AR_COND_OP_OR
+    :param Qualifier left: the left operand
+    :param Qualifier right: the right operand
+    """
+
+    def __init__(self, operation, left, right):
+        if (
+            not isinstance(left, Qualifier) or
+            not isinstance(right, Qualifier)
+        ):
+            raise TypeError(
+                'Only qualifiers may be combined using & and |'
+            )
+
+        self.operation = operation
+        self.left = left
+        self.right = right
+
+    def _build(self, ars, schema, qualifier_struct, keep):
+        left_struct = arh.ARQualifierStruct()
+        right_struct = arh.ARQualifierStruct()
+        keep.extend([left_struct, right_struct])
+
+        self.left._build(ars, schema, left_struct, keep)
+        self.right._build(ars, schema, right_struct, keep)
+
+        qualifier_struct.operation = self.operation
+        qualifier_struct.u.andor.operandLeft = pointer(left_struct)
+        qualifier_struct.u.andor.operandRight = pointer(right_struct)
+
+    def _fields(self):
+        return self.left._fields() + self.right._fields()
+
+
+class NotQualifier(Qualifier):
+    """
+    Negates a qualifier.
+
+    :param Qualifier qualifier: the qualifier to negate
+    """
+
+    def __init__(self, qualifier):
+        self.qualifier = qualifier
+
+    def _build(self, ars, schema, qualifier_struct, keep):
+        inner_struct = arh.ARQualifierStruct()
+        keep.append(inner_struct)
+
+        self.qualifier._build(ars, schema, inner_struct, keep)
+
+        qualifier_struct.operation = arh.AR_COND_OP_NOT
+        qualifier_struct.u.notQual = pointer(inner_struct)
+
+    def _fields(self):
+        return self.qualifier._fields()
+
+
+class Comparison(Qualifier):
+    """
+    A relational operation comparing a field with a value or another field.
+
+    :param int operation: one of the AR_REL_OP constants
+    :param F field: the field on the left of the comparison
+    :param value: the value or F object on the right of the comparison
+    """
+
+    def __init__(self, operation, field, value):
+        self.operation = operation
+        self.field = field
+        self.value = value
+
+    def _build(self, ars, schema, qualifier_struct, keep):
+        rel_op = arh.ARRelOpStruct()
+        keep.append(rel_op)
+
+        rel_op.operation = self.operation
+
+        field_id = self.field._resolve(ars, schema)
+        rel_op.operandLeft.tag = arh.AR_FIELD
+        rel_op.operandLeft.u.fieldId = field_id
+
+        if isinstance(self.value, F):
+            rel_op.operandRight.tag = arh.AR_FIELD
+            rel_op.operandRight.u.fieldId = self.value._resolve(ars, schema)
+        elif self.operation in (arh.AR_REL_OP_IN, arh.AR_REL_OP_NOT_IN):
+            values = list(self.value)
+            value_array = (arh.ARValueStruct * max(len(values), 1))()
+            keep.append(value_array)
+
+            for i, value in enumerate(values):
+                self.field._encode(
+                    ars, schema, field_id, value, value_array[i]
+                )
+
+            rel_op.operandRight.tag = arh.AR_VALUE_SET
+            rel_op.operandRight.u.valueSet.numItems = len(values)
+            rel_op.operandRight.u.valueSet.valueList = cast(
+                value_array, POINTER(arh.ARValueStruct)
+            )
+        else:
+            rel_op.operandRight.tag = arh.AR_VALUE
+            self.field._encode(
+                ars, schema, field_id, self.value,
+                rel_op.operandRight.u.value
+            )
+
+        qualifier_struct.operation = arh.AR_COND_OP_REL_OP
+        qualifier_struct.u.relOp = pointer(rel_op)
+
+    def _fields(self):
+        if isinstance(self.value, F):
+            return [self.field.field, self.value.field]
+        return [self.field.field]
+
+
+class F(object):
+    """
+    A reference to a field used to build qualifiers.  Comparing an F object
+    with a value (or another F object) produces a Qualifier.
+
+    :param field: the field name or field id
+    :type field: string or int
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    # Comparisons produce qualifiers, so F objects can't be hashed
+    __hash__ = None
+
+    def __eq__(self, value):
+        return Comparison(arh.AR_REL_OP_EQUAL, self, value)
+
+    def __ne__(self, value):
+        return Comparison(arh.AR_REL_OP_NOT_EQUAL, self, value)
+
+    def __lt__(self, value):
+        return Comparison(arh.AR_REL_OP_LESS, self, value)
+
+    def __le__(self, value):
+        return Comparison(arh.AR_REL_OP_LESS_EQUAL, self, value)
+
+    def __gt__(self, value):
+        return Comparison(arh.AR_REL_OP_GREATER, self, value)
+
+    def __ge__(self, value):
+        return Comparison(arh.AR_REL_OP_GREATER_EQUAL, self, value)
+
+    def like(self, pattern):
+        """
+        Matches the field against a wildcard pattern (e.g. '%error%').
+
+        :param str pattern: the pattern to match against
+        :return: a Qualifier
+        """
+
+        return Comparison(arh.AR_REL_OP_LIKE, self, pattern)
+
+    def isin(self, values):
+        """
+        Matches the field against a set of values.
+
+        :param values: the values to match against
+        :type values: iterable of values
+        :return: a Qualifier
+        """
+
+        return Comparison(arh.AR_REL_OP_IN, self, list(values))
+
+    def notin(self, values):
+        """
+        Matches fields containing none of the values provided.
+
+        :param values: the values to exclude
+        :type values: iterable of values
+        :return: a Qualifier
+        """
+
+        return Comparison(arh.AR_REL_OP_NOT_IN, self, list(values))
+
+    def _resolve(self, ars, schema):
+        """
+        Determines the field id of the field referenced.
+
+        :param ARS ars: the session used to resolve the field
+        :param str schema: the schema name the field belongs to
+        :return: the field id
+        :raises: ARSError
+        """
+
+        if isinstance(self.field, integer_types):
+            if self.field not in ars.field_id_to_name_cache[schema]:
+                raise ARSError(
+                    'A field with id {} does not exist in schema '
+                    '{}'.format(self.field, schema)
+                )
+            return self.field
+
+        try:
+            return ars.field_name_to_id_cache[schema][self.field]
+        except KeyError:
+            raise ARSError(
+                'A field with name {} does not exist in schema '
+                '{}'.format(self.field, schema)
+            )
+
+    def _encode(self, ars, schema, field_id, value, value_struct):
+        """
+        Populates an ARValueStruct with a value for this field.
+
+        :param ARS ars: the session used to resolve enum values
+        :param str schema: the schema name the field belongs to
+        :param int field_id: the field id of the field
+        :param value: the value to encode
+        :param ARValueStruct value_struct: the struct to populate
+        :raises: ARSError
+        """
+
+        if value is None:
+            value_struct.dataType = arh.AR_DATA_TYPE_NULL
+            return
+
+        data_type = ars.field_id_to_type_cache[schema][field_id]
+        value_struct.dataType = data_type
+
+        # Values of the wrong type are rejected by ctypes and unknown enum
+        # names aren't mapped
+        try:
+            if data_type == arh.AR_DATA_TYPE_INTEGER:
+                value_struct.u.intVal = value
+            elif data_type == arh.AR_DATA_TYPE_REAL:
+                value_struct.u.realVal = value
+            elif data_type == arh.AR_DATA_TYPE_CHAR:
+                # ctypes would treat an integer as the address of a string
+                if not isinstance(value, bytes):
+                    raise TypeError(value)
+                value_struct.u.charVal = value
+            elif data_type == arh.AR_DATA_TYPE_ENUM:
+                if isinstance(value, integer_types):
+                    enum_id = value
+                else:
+                    enum_name_to_id = ars.enum_name_to_id_cache[schema]
+                    enum_id = enum_name_to_id[field_id][value]
+                value_struct.u.enumVal = enum_id
+            elif data_type == arh.AR_DATA_TYPE_TIME:
+                if isinstance(value, datetime):
+                    value = int(time.mktime(value.timetuple()))
+                elif not isinstance(value, integer_types):
+                    raise TypeError(value)
+                value_struct.u.timeVal = value
+            else:
+                raise ARSError(
+                    'An unknown data type was encountered for field {} on '
+                    'schema {}'.format(self.field, schema)
+                )
+        except (KeyError, TypeError):
+            raise ARSError(
+                'An invalid value {} was specified for field {} on schema '
+                '{}'.format(value, self.field, schema)
+            )
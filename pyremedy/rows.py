@@ -0,0 +1,179 @@
+from collections import OrderedDict
+from operator import itemgetter
+import re
+import threading
+
+from .compat import integer_types
+
+
+# The number of row classes kept for reuse, as ad-hoc field lists would
+# otherwise accumulate classes for the life of the process
+ROW_CLASS_CACHE_SIZE = 256
+
+# Row classes generated for each schema and list of fields in least
+# recently used order (shared by all sessions)
+_row_classes = OrderedDict()
+_row_classes_lock = threading.Lock()
+
+
+class Row(tuple):
+    """
+    A compact query result holding the values of an entry in the order the
+    fields were requested.  Rows are tuples so they require far less memory
+    than a dict per entry and all rows of a query share a single mapping of
+    field names to positions.
+
+    Values may be accessed by position, by field name or as attributes
+    named after the fields (lower case with non-alphanumeric characters
+    replaced by underscores)::
+
+        row[0]
+        row['Short Description']
+        row.short_description
+    """
+
+    __slots__ = ()
+
+    #: The schema name the row belongs to
+    schema = None
+
+    #: The field names of the row in order
+    fields = ()
+
+    # A mapping of field names to positions shared by all rows of the class
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, integer_types + (slice,)):
+            return tuple.__getitem__(self, key)
+        try:
+            return tuple.__getitem__(self, self._index[key])
+        except KeyError:
+            raise KeyError(key)
+
+    def __repr__(self):
+        return 'Row({})'.format(', '.join(
+            '{!r}: {!r}'.format(field, value)
+            for field, value in zip(self.fields, self)
+        ))
+
+    def __reduce__(self):
+        return (_restore_row, (self.schema, self.fields, tuple(self)))
+
+    def get(self, field, default=None):
+        """
+        Returns the value of a field or a default if the field wasn't
+        retrieved.
+
+        :param str field: the field name
+        :param default: the value to return if the field wasn't retrieved
+        :return: the value of the field
+        """
+
+        index = self._index.get(field)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+
+    def keys(self):
+        """
+        Returns the field names of the row.
+
+        :return: a tuple of field names
+        """
+
+        return self.fields
+
+    def items(self):
+        """
+        Returns the field names and values of the row.
+
+        :return: a list of tuples containing each field name and value
+        """
+
+        return list(zip(self.fields, self))
+
+    def as_dict(self):
+        """
+        Converts the row into a dict as returned when rows aren't used.
+
+        :return: a dict containing the field names and values
+        """
+
+        return dict(zip(self.fields, self))
+
+
+def row_class(schema, fields):
+    """
+    Returns the Row subclass for a schema and list of fields, creating it
+    the first time it is requested.  The most recently used classes are
+    kept for reuse, while rows of classes which have been discarded remain
+    valid.
+
+    :param str schema: the schema name the rows belong to
+    :param fields: the unique field names of the rows in order
+    :type fields: list of strings
+    :return: a subclass of Row
+    """
+
+    key = (schema, tuple(fields))
+    with _row_classes_lock:
+        cls = _row_classes.pop(key, None)
+        if cls is not None:
+            _row_classes[key] = cls
+            return cls
+
+    attributes = {
+        '__slots__': (),
+        'schema': schema,
+        'fields': key[1],
+        '_index': dict((field, i) for i, field in enumerate(key[1]))
+    }
+
+    # Provide attribute access for each field unless the name clashes with
+    # an existing attribute or an earlier field
+    for i, field in enumerate(key[1]):
+        name = _attribute_name(field)
+        if name and name not in attributes and not hasattr(Row, name):
+            attributes[name] = property(itemgetter(i))
+
+    cls = type('Row', (Row,), attributes)
+
+    with _row_classes_lock:
+        cls = _row_classes.setdefault(key, cls)
+        while len(_row_classes) > ROW_CLASS_CACHE_SIZE:
+            _row_classes.popitem(last=False)
+
+    return cls
+
+
+def _attribute_name(field):
+    """
+    Determines the attribute name used to access a field on a row.
+
+    :param str field: the field name
+    :return: the attribute name or None if the name has no usable characters
+    """
+
+    if isinstance(field, bytes):
+        field = field.decode('utf-8', 'replace')
+
+    name = re.sub(r'[^0-9A-Za-z]+', '_', field).strip('_').lower()
+    if not name:
+        return None
+    if name[0].isdigit():
+        name = 'f_' + name
+    return str(name)
+
+
+def _restore_row(schema, fields, values):
+    """
+    Recreates a pickled row.
+
+    :param str schema: the schema name the row belongs to
+    :param tuple fields: the field names of the row
+    :param tuple values: the values of the row
+    :return: the row
+    """
+
+    return row_class(schema, fields)(values)
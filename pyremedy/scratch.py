@@ -0,0 +1,184 @@
+from ctypes import cast, memset, pointer, sizeof, POINTER
+
+from . import arh
+
+
+class ScratchStructs(object):
+    """
+    A set of request structs which are reused by every call made by an ARS
+    session, avoiding the allocation of new structs and arrays on each call.
+    Arrays grow as required but never shrink.
+
+    The structs and their arrays are owned by Python and must never be
+    passed to the FreeAR functions.  As they are overwritten by the next
+    call, they must only be used for the duration of a single call.
+    """
+
+    def __init__(self):
+        self._name = arh.ARNameType()
+        self._entry_id_list = arh.AREntryIdList()
+        self._entry_id_list_list = arh.AREntryIdListList()
+        self._internal_id_list = arh.ARInternalIdList()
+        self._entry_list_field_list = arh.AREntryListFieldList()
+        self._field_value_list = arh.ARFieldValueList()
+
+        # The arrays referenced by the lists above
+        self._entry_ids = None
+        self._entry_id_lists = None
+        self._entry_id_list_ids = None
+        self._internal_ids = None
+        self._entry_list_fields = None
+        self._field_values = None
+
+    def name(self, value):
+        """
+        Populates the scratch ARNameType.
+
+        :param str value: the name to store
+        :return: the ARNameType
+        """
+
+        self._name.value = value
+        return self._name
+
+    def entry_id_list(self, entry_id):
+        """
+        Populates the scratch AREntryIdList with a single entry id.
+
+        :param str entry_id: the entry id to store
+        :return: the AREntryIdList
+        """
+
+        if self._entry_ids is None:
+            self._entry_ids = (arh.AREntryIdType * 1)()
+            self._entry_id_list.entryIdList = cast(
+                self._entry_ids, POINTER(arh.AREntryIdType)
+            )
+
+        self._entry_ids[0].value = entry_id
+        self._entry_id_list.numItems = 1
+        return self._entry_id_list
+
+    def entry_id_list_list(self, entry_ids):
+        """
+        Populates the scratch AREntryIdListList with a list containing a
+        single entry id for each of the entry ids provided.
+
+        :param list entry_ids: the entry ids to store
+        :return: the AREntryIdListList
+        """
+
+        count = len(entry_ids)
+        if self._entry_id_lists is None or len(self._entry_id_lists) < count:
+            size = self._grow(count)
+            self._entry_id_lists = (arh.AREntryIdList * size)()
+            self._entry_id_list_ids = (arh.AREntryIdType * size)()
+
+            # Each list references its own item of the entry id array
+            for i in range(size):
+                self._entry_id_lists[i].numItems = 1
+                self._entry_id_lists[i].entryIdList = pointer(
+                    self._entry_id_list_ids[i]
+                )
+
+            self._entry_id_list_list.entryIdList = cast(
+                self._entry_id_lists, POINTER(arh.AREntryIdList)
+            )
+
+        for i, entry_id in enumerate(entry_ids):
+            self._entry_id_list_ids[i].value = entry_id
+
+        self._entry_id_list_list.numItems = count
+        return self._entry_id_list_list
+
+    def internal_id_list(self, field_ids):
+        """
+        Populates the scratch ARInternalIdList with the field ids provided.
+
+        :param list field_ids: the field ids to store
+        :return: the ARInternalIdList
+        """
+
+        count = len(field_ids)
+        if self._internal_ids is None or len(self._internal_ids) < count:
+            self._internal_ids = (arh.ARInternalId * self._grow(count))()
+            self._internal_id_list.internalIdList = cast(
+                self._internal_ids, POINTER(arh.ARInternalId)
+            )
+
+        for i, field_id in enumerate(field_ids):
+            self._internal_ids[i] = field_id
+
+        self._internal_id_list.numItems = count
+        return self._internal_id_list
+
+    def entry_list_field_list(self, field_ids):
+        """
+        Populates the scratch AREntryListFieldList with the field ids to
+        retrieve along with each entry of a list.
+
+        :param list field_ids: the field ids to store
+        :return: the AREntryListFieldList
+        """
+
+        count = len(field_ids)
+        if (
+            self._entry_list_fields is None or
+            len(self._entry_list_fields) < count
+        ):
+            self._entry_list_fields = (
+                arh.AREntryListFieldStruct * self._grow(count)
+            )()
+            for field_struct in self._entry_list_fields:
+                # From the C API Reference document (Chapter 3 / Entries)
+                # For ARGetListEntryWithFields, set the column width to a
+                # number greater than 0 and the separator to one blank
+                # space.
+                field_struct.columnWidth = 1
+                field_struct.separator = b' '
+
+            self._entry_list_field_list.fieldsList = cast(
+                self._entry_list_fields, POINTER(arh.AREntryListFieldStruct)
+            )
+
+        for i, field_id in enumerate(field_ids):
+            self._entry_list_fields[i].fieldId = field_id
+
+        self._entry_list_field_list.numItems = count
+        return self._entry_list_field_list
+
+    def field_value_list(self, count):
+        """
+        Prepares the scratch ARFieldValueList to hold a number of zeroed
+        items.
+
+        :param int count: the number of items required
+        :return: the ARFieldValueList
+        """
+
+        if self._field_values is None or len(self._field_values) < count:
+            self._field_values = (arh.ARFieldValueStruct * self._grow(count))()
+            self._field_value_list.fieldValueList = cast(
+                self._field_values, POINTER(arh.ARFieldValueStruct)
+            )
+        else:
+            memset(
+                self._field_values, 0, count * sizeof(arh.ARFieldValueStruct)
+            )
+
+        self._field_value_list.numItems = count
+        return self._field_value_list
+
+    def _grow(self, count):
+        """
+        Determines the size of a new array so that arrays double in size
+        rather than growing one item at a time.
+
+        :param int count: the number of items required
+        :return: the number of items to allocate
+        """
+
+        size = 16
+        while size < count:
+            size *= 2
+        return size
@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+
+# Import PyRemedy and the simulator from the source tree
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+)
+
+from benchmarks.simulator import Simulator
+from pyremedy import ARS, arh
+
+
+#: The name of the schema the tests are run against
+SCHEMA = b'HPD:Help Desk'
+
+#: The fields of the schema (modules which require others override the
+#: fields fixture)
+FIELDS = [
+    (1, b'Request ID', arh.AR_DATA_TYPE_CHAR),
+    (7, b'Status', arh.AR_DATA_TYPE_ENUM, [(0, b'New'), (1, b'Closed')]),
+    (8, b'Short Description', arh.AR_DATA_TYPE_CHAR),
+    (9, b'Priority', arh.AR_DATA_TYPE_INTEGER)
+]
+
+
+@pytest.fixture
+def simulator():
+    """A simulated Remedy ARS C API without any schemas."""
+
+    return Simulator()
+
+
+@pytest.fixture
+def ars(simulator):
+    """An ARS session connected to the simulator."""
+
+    ars = ARS(b'simulator', b'user', b'password', arlib=simulator)
+    yield ars
+    ars.terminate()
+
+
+@pytest.fixture
+def fields():
+    """The fields of the schema added to the simulator."""
+
+    return FIELDS
+
+
+@pytest.fixture
+def schema(simulator, fields):
+    """The name of a schema added to the simulator without any entries."""
+
+    simulator.add_schema(SCHEMA, fields)
+    return SCHEMA
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    """The ids of entries containing synthetic values added to the schema."""
+
+    return simulator.generate(schema, 5)
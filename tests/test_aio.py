@@ -0,0 +1,216 @@
+import threading
+
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARSError
+
+aio = pytest.importorskip('pyremedy.aio')
+asyncio = pytest.importorskip('asyncio')
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.add_entries(schema, [{9: i} for i in range(5)])
+
+
+class Gate(object):
+    """
+    Holds calls to ARGetListEntryWithFields until they are let through,
+    recording the number of calls in flight.
+    """
+
+    def __init__(self, simulator):
+        self.opened = threading.Event()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._function = simulator.ARGetListEntryWithFields.function
+        simulator.ARGetListEntryWithFields.function = self
+
+    def __call__(self, *args):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            self.opened.wait(5)
+            return self._function(*args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def wait_for_calls(self, calls):
+        """Waits for a number of calls to reach the server."""
+
+        for i in range(500):
+            if self.calls >= calls:
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError('Only {} calls were made'.format(self.calls))
+
+
+@pytest.fixture
+def gate(simulator):
+    return Gate(simulator)
+
+
+@pytest.fixture
+def async_ars(simulator, entry_ids):
+    async_ars = aio.AsyncARS(
+        b'simulator', b'user', b'password', size=2, arlib=simulator
+    )
+    yield async_ars
+    run(async_ars.terminate())
+
+
+def run(coroutine):
+    """Runs a coroutine on a new event loop, failing if it takes too long."""
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(asyncio.wait_for(coroutine, 10))
+    finally:
+        loop.close()
+
+
+def test_calls_are_limited_to_the_number_of_sessions(async_ars, gate):
+    async def main():
+        calls = [
+            asyncio.ensure_future(async_ars.query(SCHEMA, b'', [b'Priority']))
+            for i in range(6)
+        ]
+        await gate.wait_for_calls(2)
+        await asyncio.sleep(0.05)
+        assert gate.calls == 2
+
+        gate.opened.set()
+        return await asyncio.gather(*calls)
+
+    results = run(main())
+
+    assert [len(entries) for entries in results] == [5] * 6
+    assert gate.max_in_flight == 2
+
+
+def test_cancelling_a_waiting_call(async_ars, gate):
+    async def main():
+        running = [
+            asyncio.ensure_future(async_ars.query(SCHEMA, b'', [b'Priority']))
+            for i in range(2)
+        ]
+        await gate.wait_for_calls(2)
+
+        waiting = asyncio.ensure_future(
+            async_ars.query(SCHEMA, b'', [b'Priority'])
+        )
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+
+        gate.opened.set()
+        await asyncio.gather(*running)
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        # The abandoned call never reached the server and held no slot
+        entries = await async_ars.query(SCHEMA, b'', [b'Priority'])
+        return len(entries)
+
+    assert run(main()) == 5
+    assert gate.calls == 3
+
+
+def test_cancelling_a_call_in_flight(async_ars, gate):
+    async def main():
+        call = asyncio.ensure_future(
+            async_ars.query(SCHEMA, b'', [b'Priority'])
+        )
+        await gate.wait_for_calls(1)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+        # The session is only freed once the server has responded, so only
+        # one of these calls is sent until then
+        calls = [
+            asyncio.ensure_future(async_ars.query(SCHEMA, b'', [b'Priority']))
+            for i in range(2)
+        ]
+        await gate.wait_for_calls(2)
+        await asyncio.sleep(0.05)
+        assert gate.calls == 2
+
+        gate.opened.set()
+        return await asyncio.gather(*calls)
+
+    assert [len(entries) for entries in run(main())] == [5, 5]
+    assert gate.calls == 3
+
+
+def test_terminate_waits_for_calls_in_flight(async_ars, simulator, gate):
+    async def main():
+        calls = [
+            asyncio.ensure_future(async_ars.query(SCHEMA, b'', [b'Priority']))
+            for i in range(3)
+        ]
+        await gate.wait_for_calls(2)
+
+        terminate = asyncio.ensure_future(async_ars.terminate())
+        await asyncio.sleep(0.05)
+        assert not terminate.done()
+
+        late = asyncio.ensure_future(
+            async_ars.query(SCHEMA, b'', [b'Priority'])
+        )
+
+        gate.opened.set()
+        await terminate
+        return await asyncio.gather(*(calls + [late]), return_exceptions=True)
+
+    results = run(main())
+
+    # The calls in flight complete while those waiting for a session and
+    # those made afterwards fail
+    assert [len(entries) for entries in results[:2]] == [5, 5]
+    assert isinstance(results[2], ARSError)
+    assert isinstance(results[3], ARSError)
+    assert simulator.allocations == 0
+
+
+def test_calls_after_terminate(async_ars, entry_ids):
+    async def main():
+        await async_ars.terminate()
+
+        with pytest.raises(ARSError):
+            await async_ars.get(SCHEMA, entry_ids[0], [b'Priority'])
+
+        with pytest.raises(ARSError):
+            async for entry in async_ars.iter_query(
+                SCHEMA, b'', [b'Priority']
+            ):
+                pass
+
+        # Terminating again has no effect
+        await async_ars.terminate()
+
+    run(main())
+
+
+def test_closing_iter_query_returns_the_session(async_ars):
+    async def main():
+        entries = async_ars.iter_query(
+            SCHEMA, b'', [b'Priority'], page_size=2
+        )
+        first = await entries.__anext__()
+        await entries.aclose()
+
+        calls = [
+            async_ars.query(SCHEMA, b'', [b'Priority']) for i in range(2)
+        ]
+        return first, await asyncio.gather(*calls)
+
+    first, results = run(main())
+
+    assert first[1] == {b'Priority': 0}
+    assert [len(entries) for entries in results] == [5, 5]
@@ -0,0 +1,108 @@
+from ctypes import byref
+
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARS, arh
+from pyremedy.allocations import AllocationTracker
+
+
+def test_report():
+    tracker = AllocationTracker()
+    tracker.allocated(1, 'ARGetListSchema', 'schemas', arh.ARNameList)
+    tracker.checkpoint()
+
+    tracker.allocated(2, 'ARGetListSchema', 'schemas', arh.ARNameList)
+    tracker.allocated(3, 'ARGetEntry', 'get', arh.ARFieldValueList)
+    tracker.allocated(4, 'ARGetEntry', 'get', arh.ARFieldValueList)
+    tracker.allocated(5, 'ARGetEntry', 'get', arh.ARFieldValueList)
+
+    # Filling a struct again before freeing it loses the memory it held
+    tracker.allocated(5, 'ARGetEntry', 'get', arh.ARFieldValueList)
+
+    assert tracker.report() == (
+        '       4 ARGetEntry (called by get), 1 lost\n'
+        '       1 ARGetListSchema (called by schemas)\n'
+    )
+    assert tracker.lost() == {('ARGetEntry', 'get'): 1}
+
+
+def test_report_without_growth():
+    tracker = AllocationTracker()
+    assert tracker.report() == 'No growth in outstanding allocations\n'
+
+    tracker.allocated(1, 'ARGetListSchema', 'schemas', arh.ARNameList)
+    tracker.allocated(2, 'ARGetListSchema', 'schemas', arh.ARNameList)
+    tracker.checkpoint()
+    tracker.freed([1, 3])
+
+    assert tracker.outstanding() == {('ARGetListSchema', 'schemas'): 1}
+    assert tracker.growth() == {}
+    assert tracker.report() == 'No growth in outstanding allocations\n'
+
+
+def test_tracking():
+    tracker = AllocationTracker()
+    tracker.allocated(1, 'ARGetListSchema', 'schemas', arh.ARNameList)
+    tracker.allocated(2, 'ARGetEntry', 'get', arh.ARFieldValueList)
+
+    assert tracker.tracking(2, arh.ARFieldValueList)
+    assert not tracker.tracking(2, arh.ARStatusList)
+    assert not tracker.tracking(1, arh.ARFieldValueList)
+
+    tracker.freed([2])
+    assert not tracker.tracking(2, arh.ARFieldValueList)
+    assert tracker.tracking(1, arh.ARNameList)
+
+
+@pytest.fixture
+def tracked(simulator, entry_ids):
+    tracker = AllocationTracker()
+    ars = ARS(
+        b'simulator', b'user', b'password', arlib=simulator,
+        allocation_tracker=tracker
+    )
+    yield ars, tracker, entry_ids
+    ars.terminate()
+
+
+def test_session_operations_free_their_allocations(tracked):
+    ars, tracker, entry_ids = tracked
+
+    # Retrieve the field details before the checkpoint
+    ars.query(SCHEMA, b'', [b'Short Description'])
+    tracker.checkpoint()
+
+    for i in range(3):
+        ars.query(SCHEMA, b'', [b'Short Description'])
+        ars.get(SCHEMA, entry_ids[0], [b'Short Description'])
+        ars.get_many(SCHEMA, entry_ids, [b'Short Description'])
+        entry_id = ars.create(SCHEMA, {b'Short Description': b'New'})
+        ars.update(SCHEMA, entry_id, {b'Short Description': b'Updated'})
+        ars.delete(SCHEMA, entry_id)
+
+    assert tracker.report() == 'No growth in outstanding allocations\n'
+    assert tracker.lost() == {}
+
+
+def test_session_allocations_are_attributed_to_the_caller(tracked):
+    ars, tracker, entry_ids = tracked
+    schema_list = arh.ARNameList()
+    status = arh.ARStatusList()
+
+    def leaky_method():
+        ars.arlib.ARGetListSchema(
+            byref(ars.control), 0, arh.AR_LIST_SCHEMA_ALL, arh.ARNameType(),
+            None, None, byref(schema_list), byref(status)
+        )
+
+    leaky_method()
+    try:
+        assert tracker.report() == (
+            '       1 ARGetListSchema (called by leaky_method)\n'
+        )
+    finally:
+        ars.arlib.FreeARNameList(byref(schema_list), arh.FALSE)
+
+    assert tracker.report() == 'No growth in outstanding allocations\n'
+
@@ -0,0 +1,222 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import FIELDS, SCHEMA
+from pyremedy import ARSError, arh
+from pyremedy import ars as ars_module
+
+
+# ARERR 302: Entry does not exist in database
+AR_ERROR_NO_SUCH_ENTRY = 302
+
+
+@pytest.fixture
+def fields():
+    return FIELDS + [(10, b'Due Date', arh.AR_DATA_TYPE_TIME)]
+
+
+def test_bulk_create(ars, simulator, entry_ids):
+    results = ars.bulk_create(SCHEMA, [
+        {b'Priority': 1, b'Status': b'New'}, {b'Priority': 2}
+    ])
+
+    assert [errors for entry_id, errors in results] == [[], []]
+    new_entry_ids = [entry_id for entry_id, errors in results]
+    assert ars.get(SCHEMA, new_entry_ids[0], [b'Priority', b'Status']) == {
+        b'Priority': 1, b'Status': b'New'
+    }
+    assert ars.get(SCHEMA, new_entry_ids[1], [b'Priority']) == {
+        b'Priority': 2
+    }
+
+
+
+def test_bulk_rejects_non_bytes_characters(ars, simulator, entry_ids):
+    # ctypes would store an integer in a character value as an address
+    entry_values = {b'Short Description': 12345}
+
+    with pytest.raises(ARSError):
+        ars.bulk_create(SCHEMA, [{b'Priority': 1}, entry_values])
+
+    with pytest.raises(ARSError):
+        ars.bulk_update(SCHEMA, [(entry_ids[0], entry_values)])
+
+    # Values are converted before any transaction begins
+    assert len(simulator.schemas[SCHEMA].entries) == 5
+
+def test_bulk_update(ars, entry_ids):
+    results = ars.bulk_update(SCHEMA, [
+        (entry_ids[0], {b'Priority': 10}), (entry_ids[1], {b'Priority': 11})
+    ])
+
+    assert results == [(entry_ids[0], []), (entry_ids[1], [])]
+    assert ars.get(SCHEMA, entry_ids[1], [b'Priority']) == {b'Priority': 11}
+
+
+def test_bulk_delete_reports_errors_per_entry(ars, simulator, entry_ids):
+    results = ars.bulk_delete(SCHEMA, [entry_ids[0], b'missing'])
+
+    assert [entry_id for entry_id, errors in results] == [
+        entry_ids[0], b'missing'
+    ]
+    assert [
+        message_number for message_number, message_text, appended_text
+        in results[1][1]
+    ] == [AR_ERROR_NO_SUCH_ENTRY]
+
+    # The entry which succeeded reports the failure of the transaction and
+    # was rolled back along with the rest of the transaction
+    assert results[0][1]
+    assert AR_ERROR_NO_SUCH_ENTRY not in [
+        message_number for message_number, message_text, appended_text
+        in results[0][1]
+    ]
+    assert entry_ids[0] in simulator.schemas[SCHEMA].entries
+
+
+def test_bulk_delete_only_rolls_back_failed_batches(
+    ars, simulator, entry_ids
+):
+    results = ars.bulk_delete(
+        SCHEMA, [entry_ids[0], entry_ids[1], b'missing', entry_ids[2]],
+        batch_size=2
+    )
+
+    assert [bool(errors) for entry_id, errors in results] == [
+        False, False, True, True
+    ]
+    assert list(simulator.schemas[SCHEMA].entries) == entry_ids[2:]
+
+
+def test_bulk_create_validates_before_sending(ars, simulator, entry_ids):
+    with pytest.raises(ARSError):
+        ars.bulk_create(SCHEMA, [{b'Priority': 1}, {b'Bogus': 2}])
+
+    assert list(simulator.schemas[SCHEMA].entries) == entry_ids
+
+
+def test_bulk_rejects_invalid_batch_size(ars, entry_ids):
+    with pytest.raises(ARSError):
+        ars.bulk_delete(SCHEMA, entry_ids, batch_size=0)
+
+
+@pytest.mark.parametrize('invalid_values', [
+    {b'Status': b'Bogus'}, {b'Priority': b'high'}
+])
+def test_bulk_create_converts_values_before_sending(
+    ars, simulator, entry_ids, invalid_values
+):
+    entries = [{b'Priority': i, b'Status': b'New'} for i in range(5)]
+
+    with pytest.raises(ARSError):
+        ars.bulk_create(SCHEMA, entries + [invalid_values], batch_size=2)
+
+    assert list(simulator.schemas[SCHEMA].entries) == entry_ids
+
+
+def test_bulk_update_converts_values_before_sending(
+    ars, simulator, entry_ids
+):
+    with pytest.raises(ARSError):
+        ars.bulk_update(SCHEMA, [
+            (entry_ids[0], {b'Priority': 10}),
+            (entry_ids[1], {b'Priority': 11}),
+            (entry_ids[2], {b'Status': b'Bogus'})
+        ], batch_size=1)
+
+    assert ars.get(SCHEMA, entry_ids[0], [b'Priority']) != {b'Priority': 10}
+
+
+def test_bulk_calls_keep_their_own_values(ars, entry_ids):
+    # Calls are queued until each transaction is sent, so the values of
+    # earlier calls must not be overwritten by later ones
+    results = ars.bulk_create(SCHEMA, [
+        {b'Priority': i, b'Status': b'Closed' if i % 2 else b'New'}
+        for i in range(6)
+    ], batch_size=4)
+
+    assert [
+        ars.get(SCHEMA, entry_id, [b'Priority', b'Status'])
+        for entry_id, errors in results
+    ] == [
+        {b'Priority': i, b'Status': b'Closed' if i % 2 else b'New'}
+        for i in range(6)
+    ]
+
+
+def test_bulk_create_reuses_request_structs(
+    ars, simulator, entry_ids, monkeypatch
+):
+    created = []
+
+    class CountedScratchStructs(ars_module.ScratchStructs):
+        def __init__(self):
+            super(CountedScratchStructs, self).__init__()
+            created.append(self)
+
+    monkeypatch.setattr(ars_module, 'ScratchStructs', CountedScratchStructs)
+
+    results = ars.bulk_create(
+        SCHEMA, [{b'Priority': i} for i in range(50)], batch_size=4
+    )
+
+    # One set of structs converts every entry up front and the same
+    # batch_size sets are used by each transaction
+    assert len(created) == 5
+    assert [
+        ars.get(SCHEMA, entry_id, [b'Priority'])
+        for entry_id, errors in results
+    ] == [{b'Priority': i} for i in range(50)]
+
+
+def test_bulk_failed_transaction_keeps_earlier_results(
+    ars, simulator, entry_ids
+):
+    end = simulator.AREndBulkEntryTransaction.function
+    transactions = []
+
+    def fail_second_transaction(control, action, return_list, status):
+        transactions.append(action)
+        if len(transactions) == 2:
+            # The queued calls are discarded without being applied
+            end(control, arh.AR_BULK_ENTRY_ACTION_CANCEL, return_list, status)
+            return simulator._error(status, 91, b'RPC call failed')
+        return end(control, action, return_list, status)
+
+    simulator.AREndBulkEntryTransaction.function = fail_second_transaction
+
+    with pytest.raises(ARSError) as excinfo:
+        ars.bulk_create(
+            SCHEMA, [{b'Priority': i} for i in range(5)], batch_size=2
+        )
+
+    assert [error[0] for error in ars.errors] == [91]
+
+    # The entries of the first transaction were created and are reported
+    results = excinfo.value.results
+    assert [errors for entry_id, errors in results] == [[], []]
+    assert [
+        ars.get(SCHEMA, entry_id, [b'Priority'])
+        for entry_id, errors in results
+    ] == [{b'Priority': 0}, {b'Priority': 1}]
+    assert len(simulator.schemas[SCHEMA].entries) == len(entry_ids) + 2
+
+
+def test_time_values(ars, entry_ids):
+    due = datetime(2015, 3, 14, 9, 26, 53)
+    entry_id = ars.create(SCHEMA, {b'Due Date': due})
+    assert ars.get(SCHEMA, entry_id, [b'Due Date']) == {b'Due Date': due}
+
+    due = datetime(2016, 1, 2, 3, 4, 5)
+    ars.update(SCHEMA, entry_id, {b'Due Date': due})
+    assert ars.get(SCHEMA, entry_id, [b'Due Date']) == {b'Due Date': due}
+
+    results = ars.bulk_update(SCHEMA, [(entry_ids[0], {b'Due Date': due})])
+    assert results == [(entry_ids[0], [])]
+    assert ars.get(SCHEMA, entry_ids[0], [b'Due Date']) == {b'Due Date': due}
+
+
+def test_invalid_time_values(ars, entry_ids):
+    with pytest.raises(ARSError):
+        ars.create(SCHEMA, {b'Due Date': b'2015-03-14'})
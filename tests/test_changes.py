@@ -0,0 +1,110 @@
+import pytest
+
+from conftest import FIELDS, SCHEMA
+from pyremedy import ChangeFeed, F, arh
+
+
+# The Modified Date of the first entry created
+MODIFIED = 1600000000
+
+
+@pytest.fixture
+def fields():
+    return FIELDS + [(6, b'Modified Date', arh.AR_DATA_TYPE_TIME)]
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    # Entries are modified three to a second
+    return simulator.add_entries(schema, [
+        {6: MODIFIED + i // 3, 7: i % 2, 8: b'entry'} for i in range(10)
+    ])
+
+
+def poll_entry_ids(feed):
+    return [entry[0] for batch in feed.poll() for entry in batch]
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 4, 100])
+def test_poll_retrieves_all_changes(ars, entry_ids, page_size):
+    feed = ChangeFeed(ars, SCHEMA, [b'Short Description'], page_size=page_size)
+
+    assert poll_entry_ids(feed) == entry_ids
+    assert feed.watermark == (MODIFIED + 3, [entry_ids[-1]])
+    assert poll_entry_ids(feed) == []
+
+
+def test_poll_continues_after_short_pages(ars, simulator, entry_ids):
+    # The server returns fewer entries than requested for each page
+    simulator.max_entries = 2
+    feed = ChangeFeed(ars, SCHEMA, [b'Short Description'], page_size=4)
+
+    assert poll_entry_ids(feed) == entry_ids
+
+
+def test_poll_skips_entries_seen_on_the_boundary(ars, simulator, entry_ids):
+    feed = ChangeFeed(ars, SCHEMA, [b'Short Description'], page_size=2)
+    poll_entry_ids(feed)
+
+    # An entry modified in the same second as the watermark is retrieved
+    # while those already seen at that time are skipped
+    new_entry_ids = simulator.add_entries(SCHEMA, [
+        {6: MODIFIED + 3, 7: 0, 8: b'late'}
+    ])
+    assert poll_entry_ids(feed) == new_entry_ids
+    assert feed.watermark == (MODIFIED + 3, sorted(
+        [entry_ids[-1]] + new_entry_ids
+    ))
+
+    # A later modification moves an entry past the watermark
+    simulator.schemas[SCHEMA].entries[entry_ids[0]][6] = MODIFIED + 5
+    assert poll_entry_ids(feed) == [entry_ids[0]]
+    assert feed.watermark == (MODIFIED + 5, [entry_ids[0]])
+
+
+def test_poll_resumes_from_watermark(ars, entry_ids):
+    feed = ChangeFeed(
+        ars, SCHEMA, [b'Short Description'],
+        watermark=(MODIFIED + 2, entry_ids[6:8])
+    )
+
+    assert poll_entry_ids(feed) == entry_ids[8:]
+
+
+def test_watermark_only_advances_once_batches_are_consumed(ars, entry_ids):
+    feed = ChangeFeed(ars, SCHEMA, [b'Short Description'], page_size=2)
+
+    for batch in feed.poll():
+        break
+
+    assert feed.watermark is None
+    assert poll_entry_ids(feed) == entry_ids
+
+
+@pytest.mark.parametrize('qualifier', [
+    F(b'Status') == b'New', b"'Status' = \"New\""
+])
+def test_poll_combines_qualifier(ars, simulator, entry_ids, qualifier):
+    loads = []
+    load = simulator.ARLoadARQualifierStruct.function
+
+    def count_loads(*args):
+        loads.append(args[3])
+        return load(*args)
+
+    simulator.ARLoadARQualifierStruct.function = count_loads
+    feed = ChangeFeed(
+        ars, SCHEMA, [b'Status'], qualifier, page_size=2, as_rows=True
+    )
+    retrieved = [entry for batch in feed.poll() for entry in batch]
+
+    if isinstance(qualifier, bytes):
+        # Qualification strings are loaded once rather than for every page
+        # (the simulator doesn't parse them so every entry matches)
+        assert loads == [qualifier]
+        assert [entry[0] for entry in retrieved] == entry_ids
+    else:
+        assert [entry[0] for entry in retrieved] == entry_ids[::2]
+        assert set(entry[1][b'Status'] for entry in retrieved) == set([
+            b'New'
+        ])
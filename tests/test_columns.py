@@ -0,0 +1,90 @@
+from array import array
+
+import pytest
+
+from conftest import FIELDS, SCHEMA
+from pyremedy import arh
+
+
+@pytest.fixture
+def fields():
+    return FIELDS + [
+        (3, b'Create Date', arh.AR_DATA_TYPE_TIME),
+        (10, b'Effort', arh.AR_DATA_TYPE_REAL),
+        (11, b'Impact', arh.AR_DATA_TYPE_ENUM, [
+            (1000, b'Low'), (100000, b'High')
+        ])
+    ]
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.add_entries(schema, [
+        {3: 1400000000, 7: 0, 8: b'printer', 9: 3, 10: 1.5, 11: 1000},
+        {3: 1400000060, 7: 1, 8: None, 9: None, 10: 0.25, 11: 100000},
+        {3: 1400000120, 7: 1, 8: b'network', 9: 1, 10: None, 11: 1000}
+    ])
+
+
+def test_query_columns(ars, entry_ids):
+    columns = ars.query_columns(SCHEMA, b'', [
+        b'Create Date', b'Status', b'Short Description', b'Priority',
+        b'Effort', b'Impact'
+    ], page_size=2)
+
+    assert len(columns) == 3
+    assert columns.schema == SCHEMA
+    assert columns.entry_ids == entry_ids
+    assert list(columns.columns) == [
+        b'Create Date', b'Status', b'Short Description', b'Priority',
+        b'Effort', b'Impact'
+    ]
+
+    # Times are epoch timestamps and enums are ids with a label table
+    assert columns.columns[b'Create Date'].tolist() == [
+        1400000000, 1400000060, 1400000120
+    ]
+    assert columns.columns[b'Status'] == array('H', [0, 1, 1])
+    assert columns.labels[b'Status'] == {0: b'New', 1: b'Closed'}
+    assert [
+        columns.labels[b'Status'][enum_id]
+        for enum_id in columns.columns[b'Status']
+    ] == [b'New', b'Closed', b'Closed']
+
+    # Enum ids which don't fit in 16 bits use a wider array
+    assert columns.columns[b'Impact'].typecode == 'I'
+    assert columns.columns[b'Impact'].tolist() == [1000, 100000, 1000]
+    assert columns.labels[b'Impact'] == {1000: b'Low', 100000: b'High'}
+
+
+def test_query_columns_nulls(ars, entry_ids):
+    columns = ars.query_columns(
+        SCHEMA, b'', [b'Short Description', b'Priority', b'Effort']
+    )
+
+    assert columns.columns[b'Short Description'] == [
+        b'printer', None, b'network'
+    ]
+    assert columns.columns[b'Priority'] == array('i', [3, 0, 1])
+    assert columns.columns[b'Effort'] == array('d', [1.5, 0.25, 0.0])
+    assert columns.nulls == {
+        b'Short Description': array('b', [0, 1, 0]),
+        b'Priority': array('b', [0, 1, 0]),
+        b'Effort': array('b', [0, 0, 1])
+    }
+
+
+def test_query_columns_limit_and_offset(ars, entry_ids):
+    columns = ars.query_columns(
+        SCHEMA, b'', [b'Priority'], page_size=1, offset=1, limit=1
+    )
+
+    assert columns.entry_ids == entry_ids[1:2]
+    assert columns.nulls[b'Priority'] == array('b', [1])
+
+
+def test_query_columns_frees_pages(ars, simulator, entry_ids):
+    ars.query_columns(SCHEMA, b'', [b'Priority'], page_size=1)
+    ars.qualifier_cache.invalidate()
+
+    assert simulator.allocations == 0
@@ -0,0 +1,69 @@
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARSError, arh
+
+
+def test_configure(ars, simulator):
+    ars.configure(timeout_long=10, chunk_response_size=50)
+
+    assert simulator.session_configuration[arh.AR_SESS_TIMEOUT_LONG] == 10
+    assert simulator.session_configuration[
+        arh.AR_SESS_CHUNK_RESPONSE_SIZE
+    ] == 50
+    assert simulator.session_configuration[arh.AR_SESS_TIMEOUT_NORMAL] == 120
+    assert ars.session_options == {
+        'timeout_long': 10, 'chunk_response_size': 50
+    }
+
+
+def test_configuration_restores_server_values(ars, simulator):
+    with ars.configuration(timeout_normal=5, timeout_long=10):
+        assert simulator.session_configuration[
+            arh.AR_SESS_TIMEOUT_NORMAL
+        ] == 5
+        assert simulator.session_configuration[
+            arh.AR_SESS_TIMEOUT_LONG
+        ] == 10
+
+    assert simulator.session_configuration[arh.AR_SESS_TIMEOUT_NORMAL] == 120
+    assert simulator.session_configuration[arh.AR_SESS_TIMEOUT_LONG] == 300
+
+
+def test_configuration_restores_configured_values(ars, simulator):
+    ars.configure(timeout_long=60)
+
+    # The configured value is known so it isn't retrieved from the server
+    simulator.session_configuration[arh.AR_SESS_TIMEOUT_LONG] = 999
+
+    with ars.configuration(timeout_long=10):
+        with ars.configuration(timeout_long=20, timeout_xlong=30):
+            assert simulator.session_configuration[
+                arh.AR_SESS_TIMEOUT_LONG
+            ] == 20
+        assert simulator.session_configuration[
+            arh.AR_SESS_TIMEOUT_LONG
+        ] == 10
+
+    assert simulator.session_configuration[arh.AR_SESS_TIMEOUT_LONG] == 60
+    assert ars.session_options['timeout_long'] == 60
+
+
+def test_configuration_restores_after_errors(ars, simulator, entry_ids):
+    with pytest.raises(ARSError):
+        with ars.configuration(chunk_response_size=1):
+            ars.update(SCHEMA, b'missing', {b'Request ID': b'1'})
+
+    # The errors of the failed call are kept
+    assert [error[1] for error in ars.errors] == [
+        b'Entry does not exist in database'
+    ]
+    assert simulator.session_configuration[
+        arh.AR_SESS_CHUNK_RESPONSE_SIZE
+    ] == 100
+
+
+def test_configuration_applies_to_calls(ars, simulator, entry_ids):
+    with ars.configuration(chunk_response_size=1) as configured:
+        assert configured is ars
+        assert len(ars.query(SCHEMA, b'', [b'Request ID'])) == len(entry_ids)
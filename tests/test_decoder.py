@@ -0,0 +1,160 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARSError, arh
+from pyremedy.cache import EnumMappings, enum_id_to_name
+from pyremedy.decoder import build_converter, build_plan, decode_value
+
+FIELDS = [
+    (2, b'Count', arh.AR_DATA_TYPE_INTEGER),
+    (3, b'Effort', arh.AR_DATA_TYPE_REAL),
+    (4, b'Summary', arh.AR_DATA_TYPE_CHAR),
+    (5, b'Status', arh.AR_DATA_TYPE_ENUM),
+    (6, b'Impact', arh.AR_DATA_TYPE_ENUM),
+    (7, b'Due Date', arh.AR_DATA_TYPE_TIME),
+    (8, b'Cost', arh.AR_DATA_TYPE_DECIMAL),
+    (9, b'Attachment', arh.AR_DATA_TYPE_ATTACH)
+]
+
+ENUMS = {
+    5: [(0, b'New'), (1, b'Closed')],
+    6: [(10, b'Low'), (20, b'High')]
+}
+
+TIMESTAMP = 1400000000
+
+
+class FieldCaches(object):
+    """The field caches of an ARS session for a single schema."""
+
+    def __init__(self):
+        self.field_id_to_name_cache = {
+            SCHEMA: dict((field[0], field[1]) for field in FIELDS)
+        }
+        self.field_id_to_type_cache = {
+            SCHEMA: dict((field[0], field[2]) for field in FIELDS)
+        }
+        self.enum_id_to_name_cache = {
+            SCHEMA: EnumMappings(ENUMS, enum_id_to_name)
+        }
+
+
+@pytest.fixture
+def caches():
+    return FieldCaches()
+
+
+def value(data_type, member=None, member_value=None):
+    """Builds an ARValueStruct of a data type holding a value."""
+
+    value_struct = arh.ARValueStruct()
+    value_struct.dataType = data_type
+    if member is not None:
+        setattr(value_struct.u, member, member_value)
+    return value_struct
+
+
+VALUES = [
+    (value(arh.AR_DATA_TYPE_INTEGER, 'intVal', -5), -5),
+    (value(arh.AR_DATA_TYPE_REAL, 'realVal', 2.5), 2.5),
+    (value(arh.AR_DATA_TYPE_CHAR, 'charVal', b'Printer'), b'Printer'),
+    (
+        value(arh.AR_DATA_TYPE_TIME, 'timeVal', TIMESTAMP),
+        datetime.fromtimestamp(TIMESTAMP)
+    ),
+    (
+        value(arh.AR_DATA_TYPE_DECIMAL, 'decimalVal', b'12.50'),
+        Decimal('12.50')
+    ),
+    (value(arh.AR_DATA_TYPE_NULL), None)
+]
+
+
+@pytest.mark.parametrize('value_struct, expected', VALUES)
+def test_decode_value(value_struct, expected):
+    assert decode_value(value_struct) == expected
+
+
+@pytest.mark.parametrize('data_type', [
+    arh.AR_DATA_TYPE_ENUM, arh.AR_DATA_TYPE_ATTACH, 99
+])
+def test_decode_value_unknown_types(data_type):
+    with pytest.raises(ARSError):
+        decode_value(value(data_type))
+
+
+@pytest.mark.parametrize('field_id, value_struct, expected', [
+    (2, value(arh.AR_DATA_TYPE_INTEGER, 'intVal', 42), 42),
+    (3, value(arh.AR_DATA_TYPE_REAL, 'realVal', 0.25), 0.25),
+    (4, value(arh.AR_DATA_TYPE_CHAR, 'charVal', b'Offline'), b'Offline'),
+    (5, value(arh.AR_DATA_TYPE_ENUM, 'enumVal', 1), b'Closed'),
+    (6, value(arh.AR_DATA_TYPE_ENUM, 'enumVal', 20), b'High'),
+    (
+        7, value(arh.AR_DATA_TYPE_TIME, 'timeVal', TIMESTAMP),
+        datetime.fromtimestamp(TIMESTAMP)
+    ),
+    (
+        8, value(arh.AR_DATA_TYPE_DECIMAL, 'decimalVal', b'-0.5'),
+        Decimal('-0.5')
+    )
+])
+def test_converters(caches, field_id, value_struct, expected):
+    convert = build_converter(caches, SCHEMA, field_id)
+    assert convert(value_struct) == expected
+
+
+@pytest.mark.parametrize('field_id', [field[0] for field in FIELDS])
+def test_converters_null_values(caches, field_id):
+    convert = build_converter(caches, SCHEMA, field_id)
+    assert convert(value(arh.AR_DATA_TYPE_NULL)) is None
+
+
+@pytest.mark.parametrize('field_id, value_struct, expected', [
+    (2, value(arh.AR_DATA_TYPE_CHAR, 'charVal', b'42'), b'42'),
+    (4, value(arh.AR_DATA_TYPE_INTEGER, 'intVal', 42), 42),
+    (3, value(arh.AR_DATA_TYPE_ENUM, 'enumVal', 1), None),
+    (9, value(arh.AR_DATA_TYPE_REAL, 'realVal', 1.5), 1.5)
+])
+def test_converters_values_of_other_types(
+    caches, field_id, value_struct, expected
+):
+    # Values whose type differs from that of the field are converted by
+    # their own type (enums require the enum mappings of the field)
+    convert = build_converter(caches, SCHEMA, field_id)
+    if expected is None:
+        with pytest.raises(ARSError):
+            convert(value_struct)
+    else:
+        assert convert(value_struct) == expected
+
+
+@pytest.mark.parametrize('data_type', [arh.AR_DATA_TYPE_ATTACH, 99])
+def test_converters_unknown_types(caches, data_type):
+    convert = build_converter(caches, SCHEMA, 9)
+
+    with pytest.raises(ARSError) as excinfo:
+        convert(value(data_type))
+    assert 'Attachment' in str(excinfo.value)
+
+
+@pytest.mark.parametrize('field_id, enum_id', [(5, 2), (5, 10), (6, 15)])
+def test_converters_unknown_enum_ids(caches, field_id, enum_id):
+    convert = build_converter(caches, SCHEMA, field_id)
+
+    with pytest.raises(KeyError):
+        convert(value(arh.AR_DATA_TYPE_ENUM, 'enumVal', enum_id))
+
+
+def test_build_plan(caches):
+    plan = build_plan(caches, SCHEMA, [4, 2, 4, 5])
+
+    assert sorted(plan) == [2, 4, 5]
+    assert [plan[field_id][:2] for field_id in [4, 2, 5]] == [
+        (b'Summary', 0), (b'Count', 1), (b'Status', 2)
+    ]
+
+    field_name, index, convert = plan[5]
+    assert convert(value(arh.AR_DATA_TYPE_ENUM, 'enumVal', 0)) == b'New'
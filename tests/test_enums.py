@@ -0,0 +1,137 @@
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import arh
+from pyremedy.cache import (
+    EnumMappings, EnumNames, enum_id_to_name, enum_name_to_id
+)
+
+
+TABLES = {
+    7: [(0, b'New'), (1, b'Closed')],
+    8: [(10, b'Low'), (20, b'High')]
+}
+
+
+@pytest.fixture
+def builds():
+    """The enum tables built into mappings."""
+
+    return []
+
+
+@pytest.fixture
+def mappings(builds):
+    def build(enums):
+        builds.append(enums)
+        return enum_id_to_name(enums)
+
+    return EnumMappings(TABLES, build)
+
+
+def test_mappings_are_built_lazily(mappings, builds):
+    assert builds == []
+
+    assert mappings[8] == {10: b'Low', 20: b'High'}
+    assert mappings[8] is mappings[8]
+    assert builds == [TABLES[8]]
+
+
+def test_mapping_lookups(mappings, builds):
+    assert 7 in mappings
+    assert 9 not in mappings
+    assert sorted(mappings) == [7, 8]
+    assert len(mappings) == 2
+
+    assert mappings.get(7).names == [b'New', b'Closed']
+    assert mappings.get(9) is None
+    assert mappings.get(9, {}) == {}
+
+    with pytest.raises(KeyError):
+        mappings[9]
+
+    assert builds == [TABLES[7]]
+
+
+def test_contiguous_enum_ids_use_a_list():
+    mapping = enum_id_to_name(TABLES[7])
+
+    assert isinstance(mapping, EnumNames)
+    assert mapping.names == [b'New', b'Closed']
+    assert [mapping[0], mapping[1]] == [b'New', b'Closed']
+    assert list(mapping) == [0, 1]
+    assert len(mapping) == 2
+    assert 1 in mapping and 2 not in mapping and -1 not in mapping
+    assert mapping.get(1) == b'Closed'
+    assert mapping.get(-1) is None
+    assert mapping.get(2, b'Unknown') == b'Unknown'
+
+
+@pytest.mark.parametrize('enums', [
+    [(1, b'Low'), (2, b'High')],
+    [(0, b'New'), (2, b'Closed')],
+    TABLES[8]
+])
+def test_other_enum_ids_use_a_dict(enums):
+    assert enum_id_to_name(enums) == dict(enums)
+
+
+@pytest.mark.parametrize('enums', [TABLES[7], TABLES[8]])
+def test_unknown_enum_ids(enums):
+    mapping = enum_id_to_name(enums)
+
+    # Contiguous and custom enum ids behave the same way
+    for enum_id in [-1, -2, 2, 5, 15]:
+        with pytest.raises(KeyError):
+            mapping[enum_id]
+
+
+def test_enum_name_to_id():
+    assert enum_name_to_id(TABLES[8]) == {b'Low': 10, b'High': 20}
+
+
+@pytest.fixture
+def fields():
+    return [
+        (1, b'Request ID', arh.AR_DATA_TYPE_CHAR),
+        (7, b'Status', arh.AR_DATA_TYPE_ENUM, TABLES[7]),
+        (8, b'Impact', arh.AR_DATA_TYPE_ENUM, TABLES[8])
+    ]
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.add_entries(schema, [{7: 1, 8: 20}, {7: 0, 8: 10}])
+
+
+def test_enum_values(ars, entry_ids):
+    entries = ars.query(SCHEMA, b'', [b'Status', b'Impact'])
+
+    assert [entry_values for entry_id, entry_values in entries] == [
+        {b'Status': b'Closed', b'Impact': b'High'},
+        {b'Status': b'New', b'Impact': b'Low'}
+    ]
+
+
+def test_enum_values_by_name(ars, entry_ids):
+    entry_id = ars.create(SCHEMA, {b'Status': b'Closed', b'Impact': b'Low'})
+
+    assert ars.get(SCHEMA, entry_id, [b'Status', b'Impact']) == {
+        b'Status': b'Closed', b'Impact': b'Low'
+    }
+
+
+def test_unknown_enum_values(ars, simulator, entry_ids):
+    # An enum id the field details don't contain (e.g. added on the server
+    # since they were retrieved)
+    simulator.add_entries(SCHEMA, [{7: 2, 8: 10}])
+
+    with pytest.raises(KeyError):
+        ars.query(SCHEMA, b'', [b'Status'])
+
+
+def test_unknown_custom_enum_values(ars, simulator, entry_ids):
+    simulator.add_entries(SCHEMA, [{7: 0, 8: 15}])
+
+    with pytest.raises(KeyError):
+        ars.query(SCHEMA, b'', [b'Impact'])
@@ -0,0 +1,84 @@
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARSError, arh
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.add_entries(schema, [
+        {7: i % 2, 9: i} for i in range(arh.AR_MAX_MULT_ENTRIES + 10)
+    ])
+
+
+def test_get_many_keeps_requested_order(ars, entry_ids):
+    requested = [entry_ids[5], entry_ids[0], entry_ids[3]]
+
+    entries = ars.get_many(SCHEMA, requested, [b'Priority', b'Status'])
+
+    assert entries == [
+        (entry_ids[5], {b'Priority': 5, b'Status': b'Closed'}),
+        (entry_ids[0], {b'Priority': 0, b'Status': b'New'}),
+        (entry_ids[3], {b'Priority': 3, b'Status': b'Closed'})
+    ]
+
+
+def test_get_many_missing_entries(ars, entry_ids):
+    entries = ars.get_many(
+        SCHEMA, [b'missing', entry_ids[1], b'gone'], [b'Priority']
+    )
+
+    assert entries == [
+        (b'missing', None), (entry_ids[1], {b'Priority': 1}), (b'gone', None)
+    ]
+
+
+def test_get_many_batches(ars, simulator, entry_ids):
+    calls = []
+    get_multiple_entries = simulator.ARGetMultipleEntries.function
+
+    def count_calls(*args):
+        calls.append(args)
+        return get_multiple_entries(*args)
+
+    simulator.ARGetMultipleEntries.function = count_calls
+
+    entries = ars.get_many(SCHEMA, entry_ids, [b'Priority'])
+
+    assert [entry_id for entry_id, entry_values in entries] == entry_ids
+    assert [
+        entry_values[b'Priority'] for entry_id, entry_values in entries
+    ] == list(range(len(entry_ids)))
+    assert len(calls) == 2
+    assert simulator.allocations == 0
+
+
+def test_get_many_no_entries(ars, entry_ids):
+    assert ars.get_many(SCHEMA, [], [b'Priority']) == []
+
+
+def test_get_many_invalid_field(ars, entry_ids):
+    with pytest.raises(ARSError):
+        ars.get_many(SCHEMA, entry_ids[:2], [b'Bogus'])
+
+
+def test_get_many_reuses_request_structs(ars, entry_ids):
+    def get_many(count):
+        entries = ars.get_many(SCHEMA, entry_ids[:count], [b'Priority'])
+        assert entries == [
+            (entry_id, {b'Priority': i})
+            for i, entry_id in enumerate(entry_ids[:count])
+        ]
+
+        scratch = ars.scratch
+        return [
+            scratch._entry_id_lists, scratch._entry_id_list_ids,
+            scratch._internal_ids
+        ]
+
+    # The request arrays grow for larger batches and are reused for smaller
+    # ones and batches of the same size
+    arrays = get_many(40)
+    for count in [1, 3, 40]:
+        reused = get_many(count)
+        assert all(a is b for a, b in zip(arrays, reused))
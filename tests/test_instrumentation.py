@@ -0,0 +1,134 @@
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARS, ARSError, Metrics
+
+
+@pytest.fixture
+def metrics():
+    metrics = Metrics()
+    metrics.call('ARGetEntry', b'HPD:Help Desk', 0.25, False)
+    metrics.call('ARGetEntry', b'HPD:Help Desk', 0.5, True)
+    metrics.call('FreeARStatusList', None, 0.0, False)
+    metrics.decode(b'HPD:Help Desk', 10, 200, 0.125)
+    return metrics
+
+
+def test_snapshot(metrics):
+    assert metrics.snapshot() == {
+        'calls': [
+            {
+                'function': 'ARGetEntry', 'schema': b'HPD:Help Desk',
+                'count': 2, 'errors': 1, 'seconds': 0.75
+            },
+            {
+                'function': 'FreeARStatusList', 'schema': None,
+                'count': 1, 'errors': 0, 'seconds': 0.0
+            }
+        ],
+        'decodes': [
+            {
+                'schema': b'HPD:Help Desk', 'count': 1, 'rows': 10,
+                'string_bytes': 200, 'seconds': 0.125
+            }
+        ]
+    }
+
+    metrics.reset()
+    assert metrics.snapshot() == {'calls': [], 'decodes': []}
+
+
+def test_prometheus(metrics):
+    assert metrics.prometheus().split('\n') == [
+        '# HELP pyremedy_arlib_calls_total Number of calls to the Remedy '
+        'ARS C API',
+        '# TYPE pyremedy_arlib_calls_total counter',
+        'pyremedy_arlib_calls_total{function="ARGetEntry",'
+        'schema="HPD:Help Desk"} 2',
+        'pyremedy_arlib_calls_total{function="FreeARStatusList",'
+        'schema=""} 1',
+        '# HELP pyremedy_arlib_call_errors_total Number of calls to the '
+        'Remedy ARS C API that failed',
+        '# TYPE pyremedy_arlib_call_errors_total counter',
+        'pyremedy_arlib_call_errors_total{function="ARGetEntry",'
+        'schema="HPD:Help Desk"} 1',
+        'pyremedy_arlib_call_errors_total{function="FreeARStatusList",'
+        'schema=""} 0',
+        '# HELP pyremedy_arlib_call_seconds_total Wall time spent in calls '
+        'to the Remedy ARS C API',
+        '# TYPE pyremedy_arlib_call_seconds_total counter',
+        'pyremedy_arlib_call_seconds_total{function="ARGetEntry",'
+        'schema="HPD:Help Desk"} 0.75',
+        'pyremedy_arlib_call_seconds_total{function="FreeARStatusList",'
+        'schema=""} 0.0',
+        '# HELP pyremedy_decoded_rows_total Number of retrieved entries '
+        'decoded',
+        '# TYPE pyremedy_decoded_rows_total counter',
+        'pyremedy_decoded_rows_total{schema="HPD:Help Desk"} 10',
+        '# HELP pyremedy_decoded_string_bytes_total Length of all character '
+        'values decoded',
+        '# TYPE pyremedy_decoded_string_bytes_total counter',
+        'pyremedy_decoded_string_bytes_total{schema="HPD:Help Desk"} 200',
+        '# HELP pyremedy_decode_seconds_total Wall time spent decoding '
+        'retrieved entries',
+        '# TYPE pyremedy_decode_seconds_total counter',
+        'pyremedy_decode_seconds_total{schema="HPD:Help Desk"} 0.125',
+        ''
+    ]
+
+
+def test_prometheus_prefix_and_escaping():
+    metrics = Metrics()
+    metrics.decode(b'Odd "Form"\\\nName', 1, 0, 0.0)
+
+    lines = metrics.prometheus(prefix='remedy').split('\n')
+
+    assert (
+        'remedy_decoded_rows_total{schema="Odd \\"Form\\"\\\\\\nName"} 1'
+        in lines
+    )
+    assert not [line for line in lines if line.startswith('pyremedy')]
+
+
+def test_empty_prometheus():
+    lines = Metrics().prometheus().split('\n')
+
+    assert len(lines) == 6 * 2 + 1
+    assert all(line.startswith('# ') for line in lines[:-1])
+
+
+@pytest.fixture
+def instrumented(simulator, schema):
+    simulator.add_entries(schema, [{8: b'abc'}, {8: b'defgh'}])
+
+    metrics = Metrics()
+    ars = ARS(
+        b'simulator', b'user', b'password', arlib=simulator,
+        instrumentation=metrics
+    )
+    yield ars, metrics
+    ars.terminate()
+
+
+def test_session_metrics(instrumented):
+    ars, metrics = instrumented
+
+    ars.query(SCHEMA, b'', [b'Short Description'])
+    with pytest.raises(ARSError):
+        ars.update(SCHEMA, b'missing', {b'Short Description': b'x'})
+
+    snapshot = metrics.snapshot()
+    calls = dict(
+        ((call['function'], call['schema']), call)
+        for call in snapshot['calls']
+    )
+
+    assert calls[('ARGetListEntryWithFields', SCHEMA)]['count'] == 1
+    assert calls[('ARGetListEntryWithFields', SCHEMA)]['errors'] == 0
+    assert calls[('ARSetEntry', SCHEMA)]['errors'] == 1
+    assert calls[('ARInitialization', None)]['count'] == 1
+
+    assert [
+        (decode['schema'], decode['rows'], decode['string_bytes'])
+        for decode in snapshot['decodes']
+    ] == [(SCHEMA, 2, 8)]
@@ -0,0 +1,87 @@
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARSError, F
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.generate(schema, 25)
+
+
+@pytest.mark.parametrize('page_size', [7, 10, 25, 100])
+def test_keyset_retrieves_all_pages(ars, simulator, entry_ids, page_size):
+    # The server returns fewer entries than requested for large pages
+    simulator.max_entries = 7
+
+    entries = list(ars.iter_query(
+        SCHEMA, b'', [b'Priority'], page_size=page_size, keyset=True
+    ))
+
+    assert [entry_id for entry_id, entry_values in entries] == entry_ids
+
+
+def test_keyset_limit(ars, simulator, entry_ids):
+    simulator.max_entries = 7
+
+    entries = list(ars.iter_query(
+        SCHEMA, b'', [b'Priority'], page_size=10, limit=12, keyset=True
+    ))
+
+    assert [entry_id for entry_id, entry_values in entries] == entry_ids[:12]
+
+
+def test_keyset_combines_qualifier(ars, simulator, entry_ids):
+    simulator.max_entries = 4
+    schema_entries = simulator.schemas[SCHEMA].entries
+    expected = [
+        entry_id for entry_id in entry_ids
+        if schema_entries[entry_id][9] >= 50000
+    ]
+
+    entries = list(ars.iter_query(
+        SCHEMA, F(b'Priority') >= 50000, [b'Priority'], page_size=3,
+        keyset=True
+    ))
+
+    assert [entry_id for entry_id, entry_values in entries] == expected
+    assert all(
+        entry_values[b'Priority'] >= 50000
+        for entry_id, entry_values in entries
+    )
+
+
+def test_keyset_isnt_shifted_by_deletions(ars, simulator, entry_ids):
+    schema_entries = simulator.schemas[SCHEMA].entries
+    retrieved = []
+
+    for entry_id, entry_values in ars.iter_query(
+        SCHEMA, b'', [b'Priority'], page_size=5, keyset=True
+    ):
+        # Remove an entry which has already been retrieved
+        if retrieved:
+            schema_entries.pop(retrieved[0], None)
+        retrieved.append(entry_id)
+
+    assert retrieved == entry_ids
+
+
+def test_keyset_query_columns(ars, simulator, entry_ids):
+    simulator.max_entries = 4
+
+    columns = ars.query_columns(
+        SCHEMA, b'', [b'Request ID', b'Priority'], page_size=6, keyset=True
+    )
+
+    assert columns.entry_ids == entry_ids
+    assert columns.columns[b'Request ID'] == entry_ids
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'offset': 5}, {'sort': [b'Priority']}
+])
+def test_keyset_rejects_offset_and_sort(ars, entry_ids, kwargs):
+    with pytest.raises(ARSError):
+        list(ars.iter_query(
+            SCHEMA, b'', [b'Priority'], keyset=True, **kwargs
+        ))
@@ -0,0 +1,154 @@
+import pickle
+import sqlite3
+
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARS, MetadataCache, SQLiteMetadataCache, arh
+
+METADATA = {
+    'fields': [
+        (1, b'Request ID', arh.AR_DATA_TYPE_CHAR),
+        (7, b'Status', arh.AR_DATA_TYPE_ENUM),
+        (8, b'Caf\xe9 \xff', None)
+    ],
+    'enums': [(7, [(0, b'New'), (1, b'\x80\xfe')])]
+}
+
+
+@pytest.fixture
+def metadata_cache(tmpdir):
+    return SQLiteMetadataCache(str(tmpdir.join('metadata.db')))
+
+
+def test_metadata_cache_is_abstract():
+    with pytest.raises(TypeError):
+        MetadataCache()
+
+
+def test_round_trip(metadata_cache):
+    metadata_cache.save(b'server', SCHEMA, 1400000000, METADATA)
+
+    timestamp, metadata = metadata_cache.load(b'server', SCHEMA)
+
+    # Any byte string survives while tuples are returned as lists
+    assert timestamp == 1400000000
+    assert metadata == {
+        'fields': [list(field) for field in METADATA['fields']],
+        'enums': [[7, [[0, b'New'], [1, b'\x80\xfe']]]]
+    }
+    assert all(isinstance(field[1], bytes) for field in metadata['fields'])
+
+
+def test_load_missing(metadata_cache):
+    metadata_cache.save(b'server', SCHEMA, 1400000000, METADATA)
+
+    assert metadata_cache.load(b'server', b'Other') is None
+    assert metadata_cache.load(b'other', SCHEMA) is None
+
+
+def test_save_replaces(metadata_cache):
+    metadata_cache.save(b'server', SCHEMA, 1400000000, METADATA)
+    metadata_cache.save(b'server', SCHEMA, 1400000060, {
+        'fields': [], 'enums': []
+    })
+
+    assert metadata_cache.load(b'server', SCHEMA) == (
+        1400000060, {'fields': [], 'enums': []}
+    )
+
+
+def test_stored_as_json(metadata_cache):
+    metadata_cache.save(b'server', SCHEMA, 1400000000, METADATA)
+
+    connection = sqlite3.connect(metadata_cache.path)
+    try:
+        metadata, = connection.execute(
+            'SELECT metadata FROM schema_metadata'
+        ).fetchone()
+    finally:
+        connection.close()
+
+    assert metadata.startswith('{')
+
+
+def test_pickled_metadata_is_ignored(metadata_cache):
+    # Metadata written by earlier versions is never unpickled
+    connection = sqlite3.connect(metadata_cache.path)
+    try:
+        with connection:
+            connection.execute(
+                'INSERT INTO schema_metadata VALUES (?, ?, ?, ?)', (
+                    b'server', SCHEMA, 1400000000,
+                    sqlite3.Binary(pickle.dumps(METADATA))
+                )
+            )
+    finally:
+        connection.close()
+
+    assert metadata_cache.load(b'server', SCHEMA) is None
+
+
+@pytest.fixture
+def get_multiple_fields_calls(simulator):
+    """Counts the calls retrieving field details from the simulator."""
+
+    calls = []
+    get_multiple_fields = simulator.ARGetMultipleFields.function
+
+    def count_calls(*args):
+        calls.append(args)
+        return get_multiple_fields(*args)
+
+    simulator.ARGetMultipleFields.function = count_calls
+    return calls
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    # The schema was last changed well before any details are saved
+    simulator.schemas[schema].timestamp = 1000000000
+
+    return simulator.add_entries(schema, [{7: 1}])
+
+
+def get_status(simulator, metadata_cache, entry_id):
+    ars = ARS(
+        b'simulator', b'user', b'password', arlib=simulator,
+        metadata_cache=metadata_cache
+    )
+    try:
+        return ars.get(SCHEMA, entry_id, [b'Status'])
+    finally:
+        ars.terminate()
+
+
+def test_sessions_share_metadata(
+    simulator, metadata_cache, entry_ids, get_multiple_fields_calls
+):
+    get_status(simulator, metadata_cache, entry_ids[0])
+    assert len(get_multiple_fields_calls) == 1
+
+    # A new session decodes entries using the saved details alone
+    assert get_status(simulator, metadata_cache, entry_ids[0]) == {
+        b'Status': b'Closed'
+    }
+    assert len(get_multiple_fields_calls) == 1
+
+
+def test_modified_schemas_are_retrieved_again(
+    simulator, metadata_cache, entry_ids, get_multiple_fields_calls
+):
+    get_status(simulator, metadata_cache, entry_ids[0])
+
+    # The schema is changed on the server after its details were saved
+    simulator.add_schema(SCHEMA, [
+        (1, b'Request ID', arh.AR_DATA_TYPE_CHAR),
+        (7, b'Status', arh.AR_DATA_TYPE_ENUM, [(0, b'Open'), (1, b'Done')])
+    ])
+    simulator.add_entries(SCHEMA, [{7: 1}])
+
+    assert get_status(simulator, metadata_cache, entry_ids[0]) == {
+        b'Status': b'Done'
+    }
+    assert len(get_multiple_fields_calls) == 2
@@ -0,0 +1,75 @@
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARSError
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.generate(schema, 25)
+
+
+def test_iter_query_retrieves_all_pages(ars, entry_ids):
+    entries = list(ars.iter_query(SCHEMA, b'', [b'Priority'], page_size=10))
+
+    assert [entry_id for entry_id, entry_values in entries] == entry_ids
+
+
+@pytest.mark.parametrize('page_size', [7, 10, 25, 100])
+def test_iter_query_continues_after_short_pages(
+    ars, simulator, entry_ids, page_size
+):
+    # The server returns fewer entries than requested for large pages
+    simulator.max_entries = 7
+
+    entries = list(ars.iter_query(
+        SCHEMA, b'', [b'Priority'], page_size=page_size
+    ))
+
+    assert [entry_id for entry_id, entry_values in entries] == entry_ids
+
+
+def test_iter_query_limit(ars, simulator, entry_ids):
+    simulator.max_entries = 7
+
+    entries = list(ars.iter_query(
+        SCHEMA, b'', [b'Priority'], page_size=10, limit=12
+    ))
+
+    assert [entry_id for entry_id, entry_values in entries] == entry_ids[:12]
+
+
+def test_iter_query_offset(ars, entry_ids):
+    entries = list(ars.iter_query(
+        SCHEMA, b'', [b'Priority'], page_size=5, offset=20
+    ))
+
+    assert [entry_id for entry_id, entry_values in entries] == entry_ids[20:]
+
+
+def test_iter_query_rejects_invalid_page_size(ars, entry_ids):
+    with pytest.raises(ARSError):
+        list(ars.iter_query(SCHEMA, b'', [b'Priority'], page_size=0))
+
+
+def test_iter_query_frees_pages(ars, simulator, entry_ids):
+    pages = ars.iter_query(SCHEMA, b'', [b'Priority'], page_size=5)
+    next(pages)
+    pages.close()
+    ars.qualifier_cache.invalidate()
+
+    assert simulator.allocations == 0
+
+
+def test_iter_query_between_other_calls(ars, entry_ids):
+    priorities = []
+
+    # Other calls made between pages don't affect the fields retrieved
+    for entry_id, entry_values in ars.iter_query(
+        SCHEMA, b'', [b'Priority'], page_size=10
+    ):
+        ars.query(SCHEMA, b'', [b'Short Description', b'Request ID'])
+        ars.count(SCHEMA, b'')
+        priorities.append(list(entry_values))
+
+    assert priorities == [[b'Priority']] * 25
@@ -0,0 +1,335 @@
+import bisect
+import threading
+import traceback
+
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARSError, ARSPool, F, arh
+
+FIELDS = [(1, b'Request ID', arh.AR_DATA_TYPE_CHAR)] + [
+    (field_id, b'Field ' + str(field_id).encode('ascii'),
+     arh.AR_DATA_TYPE_INTEGER)
+    for field_id in range(100, 120)
+]
+
+BOUNDARIES = [20000, 50000, 80000]
+
+
+@pytest.fixture
+def fields():
+    return FIELDS
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.generate(schema, 30)
+
+
+@pytest.fixture
+def pool(simulator):
+    pool = ARSPool(
+        b'simulator', b'user', b'password', size=4, arlib=simulator,
+        partial_fields=True
+    )
+    yield pool
+    pool.terminate()
+
+
+@pytest.fixture
+def qualifier_loads(simulator):
+    """Counts the qualification strings loaded by the simulator."""
+
+    loads = []
+    load = simulator.ARLoadARQualifierStruct.function
+
+    def count_loads(*args):
+        loads.append(args[3])
+        return load(*args)
+
+    simulator.ARLoadARQualifierStruct.function = count_loads
+    return loads
+
+
+@pytest.mark.parametrize('ordered', [False, True])
+def test_partitioned_query(pool, entry_ids, ordered):
+    field = FIELDS[1][1]
+    with pool.session() as ars:
+        expected = ars.query(SCHEMA, F(field) >= 0, [field])
+
+    entries = pool.query(
+        SCHEMA, F(field) >= 0, [field], field, BOUNDARIES, ordered=ordered
+    )
+
+    assert sorted(entries) == sorted(expected)
+    if ordered:
+        partitions = [
+            bisect.bisect_right(BOUNDARIES, entry_values[field])
+            for entry_id, entry_values in entries
+        ]
+        assert partitions == sorted(partitions)
+
+
+def test_partitioned_query_string_qualifier(pool, entry_ids):
+    entries = pool.query(
+        SCHEMA, b"'Field 100' >= 0", [b'Field 100'], 100, BOUNDARIES
+    )
+
+    # The simulator doesn't parse qualification strings, so each partition
+    # returns every entry
+    assert len(entries) == len(entry_ids) * (len(BOUNDARIES) + 1)
+
+
+def test_partition_qualification_strings(pool, entry_ids, qualifier_loads):
+    pool.query(
+        SCHEMA, b"'Field 101' > 5", [b'Field 100'], b'Field 100', BOUNDARIES
+    )
+
+    assert sorted(qualifier_loads) == sorted([
+        b"('Field 101' > 5) AND ('Field 100' < 20000)",
+        b"('Field 101' > 5) AND "
+        b"('Field 100' >= 20000 AND 'Field 100' < 50000)",
+        b"('Field 101' > 5) AND "
+        b"('Field 100' >= 50000 AND 'Field 100' < 80000)",
+        b"('Field 101' > 5) AND ('Field 100' >= 80000)"
+    ])
+
+
+@pytest.mark.parametrize('qualifier', [b'', b'  '])
+def test_partition_empty_qualification_string(
+    pool, entry_ids, qualifier_loads, qualifier
+):
+    pool.query(SCHEMA, qualifier, [b'Field 100'], 100, [1000, 2000])
+
+    assert sorted(qualifier_loads) == sorted([
+        b"'100' < 1000",
+        b"'100' >= 1000 AND '100' < 2000",
+        b"'100' >= 2000"
+    ])
+
+
+@pytest.mark.parametrize('boundary, expected', [
+    (10 ** 20, b'100000000000000000000'),
+    (2.5, b'2.5'),
+    (b'Say "hi"', b'"Say ""hi"""')
+])
+def test_partition_boundary_values(pool, boundary, expected):
+    assert pool._partition_qualifiers(
+        b'', b'Field', [boundary]
+    ) == [b"'Field' < " + expected, b"'Field' >= " + expected]
+
+
+def test_partition_rejects_invalid_boundaries(pool, entry_ids):
+    with pytest.raises(ARSError):
+        pool.query(
+            SCHEMA, b'', [b'Field 100'], b'Field 100', [u'text']
+        )
+
+
+def test_partition_errors_keep_their_traceback(pool, entry_ids):
+    with pytest.raises(ARSError) as excinfo:
+        pool.query(SCHEMA, b'', [b'Bogus'], b'Field 100', BOUNDARIES)
+
+    # The traceback reaches into the worker which raised the error
+    frames = traceback.extract_tb(excinfo.tb)
+    functions = [frame[2] for frame in frames]
+    assert '_validate_fields' in functions
+
+
+def test_closing_iter_query_returns_sessions(pool, simulator, entry_ids):
+    simulator.latency = 0.01
+    entries = pool.iter_query(
+        SCHEMA, b'', [b'Field 100'], b'Field 100',
+        list(range(1000, 20000, 1000))
+    )
+    next(entries)
+    entries.close()
+
+    # Every session is idle once the generator is closed
+    sessions = [pool.checkout(timeout=0) for i in range(pool.size)]
+    for ars in sessions:
+        pool.checkin(ars)
+
+
+def test_concurrent_partial_merges(pool, simulator, entry_ids):
+    simulator.latency = 0.001
+    field_names = [field[1] for field in FIELDS[1:]]
+    errors = []
+
+    def use_fields(schema, start, fields):
+        try:
+            with pool.session() as ars:
+                start.wait()
+                ars.query(schema, b'', fields)
+        except Exception as e:
+            errors.append(e)
+
+    # Each session merges the details of a different set of fields into
+    # a schema which none of them have used before
+    for i in range(10):
+        schema = SCHEMA + str(i).encode('ascii')
+        simulator.add_schema(schema, FIELDS)
+        simulator.generate(schema, 1)
+
+        start = threading.Event()
+        threads = [
+            threading.Thread(
+                target=use_fields, args=(schema, start, field_names[j::4])
+            )
+            for j in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert sorted(pool.field_id_to_type_cache[schema]) == [
+            field[0] for field in FIELDS[1:]
+        ]
+
+        with pool.session() as ars:
+            entries = ars.query(schema, b'', field_names)
+        assert sorted(entries[0][1]) == sorted(field_names)
+
+
+def test_merge_keeps_qualifiers_of_other_sessions(
+    pool, entry_ids, qualifier_loads
+):
+    first = pool.checkout()
+    second = pool.checkout()
+    try:
+        first.query(SCHEMA, b"'Field 100' > 0", [b'Field 100'])
+        generation = pool.field_generation_cache[SCHEMA]
+
+        # Details of further fields are merged by another session
+        second.query(SCHEMA, b'', [b'Field 101', b'Field 102'])
+        first.query(SCHEMA, b"'Field 100' > 0", [b'Field 100'])
+    finally:
+        pool.checkin(first)
+        pool.checkin(second)
+
+    assert pool.field_generation_cache[SCHEMA] == generation
+    assert qualifier_loads.count(b"'Field 100' > 0") == 1
+
+
+def test_refresh_invalidates_qualifiers_of_other_sessions(
+    pool, simulator, entry_ids, qualifier_loads
+):
+    first = pool.checkout()
+    second = pool.checkout()
+    try:
+        first.query(SCHEMA, b"'Field 100' > 0", [b'Field 100'])
+        generation = pool.field_generation_cache[SCHEMA]
+
+        # The schema is changed on the server and refreshed by another
+        # session
+        simulator.add_schema(SCHEMA, FIELDS + [
+            (200, b'Added', arh.AR_DATA_TYPE_CHAR)
+        ])
+        assert second.refresh() == [SCHEMA]
+        first.query(SCHEMA, b"'Field 100' > 0", [b'Field 100'])
+    finally:
+        pool.checkin(first)
+        pool.checkin(second)
+
+    assert pool.field_generation_cache[SCHEMA] != generation
+    assert b'Added' in pool.field_name_to_id_cache[SCHEMA]
+    assert qualifier_loads.count(b"'Field 100' > 0") == 2
+
+
+def fail_with(simulator, function_name, message_number):
+    """Makes a simulated function fail with the error number given."""
+
+    def fail(*args):
+        return simulator._error(args[-1], message_number, b'Failed')
+
+    getattr(simulator, function_name).function = fail
+
+
+def test_checkin_reuses_sessions(pool, entry_ids):
+    with pool.session() as ars:
+        ars.get(SCHEMA, entry_ids[0], [b'Field 100'])
+
+    sessions = [pool.checkout(timeout=0) for i in range(pool.size)]
+    try:
+        assert ars in sessions
+    finally:
+        for session in sessions:
+            pool.checkin(session)
+
+
+def test_other_errors_keep_the_session(pool, simulator, entry_ids):
+    ars = pool.checkout()
+    with pytest.raises(ARSError):
+        ars.get(SCHEMA, b'000000000099999', [b'Field 100'])
+    assert [error[0] for error in ars.errors] == [302]
+    pool.checkin(ars)
+
+    # Errors are cleared once the session is back in the pool
+    assert ars.errors == []
+    sessions = [pool.checkout(timeout=0) for i in range(pool.size)]
+    try:
+        assert ars in sessions
+    finally:
+        for session in sessions:
+            pool.checkin(session)
+
+
+@pytest.mark.parametrize('message_number', [90, 91])
+def test_connection_errors_discard_the_session(
+    pool, simulator, entry_ids, message_number
+):
+    ars = pool.checkout()
+    get = simulator.ARGetEntry.function
+    fail_with(simulator, 'ARGetEntry', message_number)
+    try:
+        with pytest.raises(ARSError):
+            ars.get(SCHEMA, entry_ids[0], [b'Field 100'])
+    finally:
+        simulator.ARGetEntry.function = get
+    assert [error[0] for error in ars.errors] == [message_number]
+    pool.checkin(ars)
+
+    # The discarded slot is reopened with a new session on checkout
+    sessions = [pool.checkout(timeout=0) for i in range(pool.size)]
+    try:
+        assert ars not in sessions
+        for session in sessions:
+            session.get(SCHEMA, entry_ids[0], [b'Field 100'])
+    finally:
+        for session in sessions:
+            pool.checkin(session)
+
+
+def test_failed_reopen_returns_the_slot(pool, simulator, entry_ids):
+    ars = pool.checkout()
+    fail_with(simulator, 'ARGetEntry', 90)
+    with pytest.raises(ARSError):
+        ars.get(SCHEMA, entry_ids[0], [b'Field 100'])
+    pool.checkin(ars)
+
+    # The server can't be reached when the slot is reopened
+    initialization = simulator.ARInitialization.function
+    fail_with(simulator, 'ARInitialization', 90)
+    sessions = [pool.checkout(timeout=0) for i in range(pool.size - 1)]
+    with pytest.raises(ARSError):
+        pool.checkout(timeout=0)
+
+    # The slot is reopened once the server is back
+    simulator.ARInitialization.function = initialization
+    sessions.append(pool.checkout(timeout=0))
+    for session in sessions:
+        pool.checkin(session)
+
+
+def test_checkout_timeout(pool):
+    sessions = [pool.checkout() for i in range(pool.size)]
+    try:
+        with pytest.raises(ARSError) as excinfo:
+            pool.checkout(timeout=0.01)
+        assert 'Timed out' in str(excinfo.value)
+    finally:
+        for session in sessions:
+            pool.checkin(session)
@@ -0,0 +1,166 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import FIELDS, SCHEMA
+from pyremedy import ARSError, F, arh
+from pyremedy.qualifier import Comparison, Qualifier
+
+
+@pytest.fixture
+def fields():
+    return FIELDS + [
+        (10, b'Urgency', arh.AR_DATA_TYPE_INTEGER),
+        (11, b'Due Date', arh.AR_DATA_TYPE_TIME)
+    ]
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.add_entries(schema, [
+        {7: 1, 8: b'Printer offline', 9: 2, 10: 2},
+        {7: 0, 8: b'Password reset', 9: 3, 10: 1},
+        {7: 1, 8: b'Printer jammed', 9: 1, 10: 3},
+        {7: 0, 8: b'VPN down', 9: 2, 10: None}
+    ])
+
+
+def matches(ars, entry_ids, qualifier):
+    entries = ars.query(SCHEMA, qualifier, [b'Priority'])
+    return sorted(
+        entry_ids.index(entry_id) for entry_id, entry_values in entries
+    )
+
+
+@pytest.mark.parametrize('qualifier, expected', [
+    (F(b'Priority') == 2, [0, 3]),
+    (F(b'Priority') != 2, [1, 2]),
+    (F(b'Priority') < 2, [2]),
+    (F(b'Priority') <= 2, [0, 2, 3]),
+    (F(b'Priority') > 2, [1]),
+    (F(b'Priority') >= 2, [0, 1, 3]),
+    (F(9) == 3, [1]),
+    (Comparison(arh.AR_REL_OP_EQUAL, F(b'Urgency'), None), [3]),
+    (F(b'Short Description').like(b'Printer%'), [0, 2]),
+    (F(b'Short Description').like(b'VPN _own'), [3]),
+    (F(b'Priority').isin([1, 3]), [1, 2]),
+    (F(b'Priority').notin(x for x in [1, 3]), [0, 3])
+])
+def test_comparisons(ars, entry_ids, qualifier, expected):
+    assert matches(ars, entry_ids, qualifier) == expected
+
+
+def test_field_comparisons(ars, entry_ids):
+    assert matches(ars, entry_ids, F(b'Priority') == F(b'Urgency')) == [0]
+    assert matches(ars, entry_ids, F(b'Priority') > F(10)) == [1]
+
+
+@pytest.mark.parametrize('qualifier, expected', [
+    ((F(b'Priority') == 2) & (F(b'Urgency') == 2), [0]),
+    ((F(b'Priority') == 1) | (F(b'Priority') == 3), [1, 2]),
+    (~(F(b'Priority') == 2), [1, 2]),
+    (
+        (F(b'Status') == b'Closed') &
+        ((F(b'Priority') < 2) | ~F(b'Short Description').like(b'%offline')),
+        [2]
+    )
+])
+def test_combined_qualifiers(ars, entry_ids, qualifier, expected):
+    assert matches(ars, entry_ids, qualifier) == expected
+
+
+def test_enum_values(ars, entry_ids):
+    assert matches(ars, entry_ids, F(b'Status') == b'Closed') == [0, 2]
+    assert matches(ars, entry_ids, F(b'Status') == 0) == [1, 3]
+    assert matches(
+        ars, entry_ids, F(b'Status').isin([b'New', b'Closed'])
+    ) == [0, 1, 2, 3]
+
+
+def test_compiled_struct(ars, entry_ids):
+    qualifier = (F(b'Status') == b'Closed') & ~(F(b'Priority') > F(10))
+    qualifier_struct = qualifier.compile(ars, SCHEMA)
+
+    assert qualifier_struct.operation == arh.AR_COND_OP_AND
+
+    status = qualifier_struct.u.andor.operandLeft.contents.u.relOp.contents
+    assert status.operation == arh.AR_REL_OP_EQUAL
+    assert status.operandLeft.tag == arh.AR_FIELD
+    assert status.operandLeft.u.fieldId == 7
+    assert status.operandRight.tag == arh.AR_VALUE
+    assert status.operandRight.u.value.dataType == arh.AR_DATA_TYPE_ENUM
+    assert status.operandRight.u.value.u.enumVal == 1
+
+    negated = qualifier_struct.u.andor.operandRight.contents
+    assert negated.operation == arh.AR_COND_OP_NOT
+
+    priority = negated.u.notQual.contents.u.relOp.contents
+    assert priority.operation == arh.AR_REL_OP_GREATER
+    assert priority.operandLeft.u.fieldId == 9
+    assert priority.operandRight.tag == arh.AR_FIELD
+    assert priority.operandRight.u.fieldId == 10
+
+
+def test_compiled_qualifiers_are_not_loaded(ars, simulator, entry_ids):
+    loads = []
+    load = simulator.ARLoadARQualifierStruct.function
+
+    def count_loads(*args):
+        loads.append(args[3])
+        return load(*args)
+
+    simulator.ARLoadARQualifierStruct.function = count_loads
+
+    ars.query(SCHEMA, F(b'Priority') == 2, [b'Priority'])
+    assert loads == []
+
+    ars.terminate()
+    assert simulator.allocations == 0
+
+
+@pytest.mark.parametrize('qualifier', [
+    F(b'Unknown') == 1,
+    F(999) == 1,
+    F(b'Priority') == F(b'Unknown'),
+    F(b'Status') == b'Unknown'
+])
+def test_invalid_qualifiers(ars, entry_ids, qualifier):
+    with pytest.raises(ARSError):
+        ars.query(SCHEMA, qualifier, [b'Priority'])
+
+
+@pytest.mark.parametrize('qualifier', [
+    F(b'Priority') == b'x',
+    F(b'Priority') == u'x',
+    F(b'Priority') == 1.5,
+    F(b'Priority').isin([1, b'x']),
+    F(b'Short Description') == 5,
+    F(b'Status') == 1.0,
+    F(b'Due Date') == b'yesterday'
+])
+def test_invalid_values(ars, entry_ids, qualifier):
+    with pytest.raises(ARSError) as excinfo:
+        ars.query(SCHEMA, qualifier, [b'Priority'])
+
+    assert 'invalid value' in str(excinfo.value)
+
+
+def test_time_values(ars, entry_ids):
+    # No entries have a due date
+    assert matches(ars, entry_ids, F(b'Due Date') > 0) == []
+    assert matches(
+        ars, entry_ids, F(b'Due Date') > datetime(2015, 1, 1)
+    ) == []
+
+
+def test_qualifiers_cannot_be_combined_with_other_values():
+    with pytest.raises(TypeError):
+        (F(b'Priority') == 1) & b"'Priority' = 1"
+
+    with pytest.raises(TypeError):
+        (F(b'Priority') == 1) and (F(b'Priority') == 2)
+
+
+def test_qualifier_is_abstract():
+    with pytest.raises(TypeError):
+        Qualifier()
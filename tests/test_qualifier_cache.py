@@ -0,0 +1,106 @@
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import arh
+from pyremedy.cache import QualifierCache
+
+
+@pytest.fixture
+def freed():
+    """The structs freed by the cache."""
+
+    return []
+
+
+@pytest.fixture
+def cache(freed):
+    return QualifierCache(freed.append, size=2)
+
+
+def test_acquire_cached(cache, freed):
+    entry = cache.add(SCHEMA, b'a', 'struct a', 1)
+    cache.release(entry)
+
+    assert cache.acquire(SCHEMA, b'a', 1) is entry
+    assert cache.acquire(b'Other', b'a', 1) is None
+    assert freed == []
+
+
+def test_least_recently_used_are_evicted(cache, freed):
+    for qualifier in [b'a', b'b']:
+        cache.release(cache.add(SCHEMA, qualifier, 'struct ' + str(qualifier)))
+
+    # Using a makes b the least recently used
+    cache.release(cache.acquire(SCHEMA, b'a'))
+    cache.release(cache.add(SCHEMA, b'c', 'struct c'))
+
+    assert len(cache) == 2
+    assert cache.acquire(SCHEMA, b'b') is None
+    assert freed == ['struct ' + str(b'b')]
+
+
+def test_pinned_qualifiers_are_freed_on_release(cache, freed):
+    entry = cache.add(SCHEMA, b'a', 'struct a')
+    pinned = cache.acquire(SCHEMA, b'a')
+    cache.release(entry)
+
+    cache.invalidate(SCHEMA)
+    assert freed == []
+    assert cache.acquire(SCHEMA, b'a') is None
+
+    cache.release(pinned)
+    assert freed == ['struct a']
+
+
+def test_previous_generations_are_evicted(cache, freed):
+    cache.release(cache.add(SCHEMA, b'a', 'struct a', 1))
+
+    # The field details of the schema were replaced by another session
+    assert cache.acquire(SCHEMA, b'a', 2) is None
+    assert freed == ['struct a']
+    assert len(cache) == 0
+
+
+def test_invalidate_schema(cache, freed):
+    cache.release(cache.add(SCHEMA, b'a', 'struct a'))
+    cache.release(cache.add(b'Other', b'a', 'struct b'))
+
+    cache.invalidate(SCHEMA)
+    assert freed == ['struct a']
+    assert cache.acquire(b'Other', b'a') is not None
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_caching_disabled(freed):
+    cache = QualifierCache(freed.append, size=0)
+
+    entry = cache.add(SCHEMA, b'a', 'struct a')
+    assert len(cache) == 0
+
+    cache.release(entry)
+    assert freed == ['struct a']
+
+
+def test_sessions_reuse_loaded_qualifiers(ars, simulator):
+    simulator.add_schema(SCHEMA, [(9, b'Priority', arh.AR_DATA_TYPE_INTEGER)])
+    simulator.generate(SCHEMA, 5)
+    loads = []
+    load = simulator.ARLoadARQualifierStruct.function
+
+    def count_loads(*args):
+        loads.append(args[3])
+        return load(*args)
+
+    simulator.ARLoadARQualifierStruct.function = count_loads
+
+    for i in range(3):
+        ars.query(SCHEMA, b"'Priority' > 0", [b'Priority'])
+        ars.count(SCHEMA, b"'Priority' > 0")
+
+    assert loads == [b"'Priority' > 0"]
+
+    # Cached qualifiers are freed along with the session
+    ars.terminate()
+    assert simulator.allocations == 0
@@ -0,0 +1,87 @@
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARSError, F
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.add_entries(schema, [
+        {7: 1, 9: 2}, {7: 0, 9: 3}, {7: 1, 9: 1}, {7: 0, 9: 2}
+    ])
+
+
+def priorities(entries):
+    return [entry_values[b'Priority'] for entry_id, entry_values in entries]
+
+
+@pytest.mark.parametrize('sort, expected', [
+    ([b'Priority'], [1, 2, 2, 3]),
+    ([(b'Priority', 'asc')], [1, 2, 2, 3]),
+    ([(b'Priority', 'desc')], [3, 2, 2, 1]),
+    ([(9, b'desc')], [3, 2, 2, 1])
+])
+def test_query_sort(ars, entry_ids, sort, expected):
+    entries = ars.query(SCHEMA, b'', [b'Priority'], sort=sort)
+
+    assert priorities(entries) == expected
+
+
+def test_query_sort_multiple_fields(ars, entry_ids):
+    entries = ars.query(
+        SCHEMA, b'', [b'Priority', b'Status'],
+        sort=[(b'Status', 'desc'), (b'Priority', 'asc')]
+    )
+
+    assert [entry_id for entry_id, entry_values in entries] == [
+        entry_ids[2], entry_ids[0], entry_ids[3], entry_ids[1]
+    ]
+
+
+def test_iter_query_sort_across_pages(ars, entry_ids):
+    entries = list(ars.iter_query(
+        SCHEMA, b'', [b'Priority'], page_size=3,
+        sort=[(b'Priority', 'desc')]
+    ))
+
+    assert priorities(entries) == [3, 2, 2, 1]
+
+
+def test_query_columns_sort(ars, entry_ids):
+    columns = ars.query_columns(
+        SCHEMA, b'', [b'Priority'], sort=[(b'Priority', 'desc')]
+    )
+
+    assert columns.columns[b'Priority'].tolist() == [3, 2, 2, 1]
+
+
+@pytest.mark.parametrize('sort', [
+    [(b'Priority', 'up')], [b'Bogus'], [12345]
+])
+def test_query_invalid_sort(ars, entry_ids, sort):
+    with pytest.raises(ARSError):
+        ars.query(SCHEMA, b'', [b'Priority'], sort=sort)
+
+
+@pytest.mark.parametrize('qualifier, expected', [
+    (b'', 4), (F(b'Status') == b'Closed', 2), (F(b'Priority') > 5, 0)
+])
+def test_count(ars, entry_ids, qualifier, expected):
+    assert ars.count(SCHEMA, qualifier) == expected
+    assert ars.match_count == expected
+
+
+def test_query_match_count(ars, entry_ids):
+    entries = ars.query(SCHEMA, F(b'Priority') >= 2, [b'Priority'], limit=1)
+
+    # The match count includes the records beyond the limit
+    assert len(entries) == 1
+    assert ars.match_count == 3
+
+
+def test_iter_query_match_count(ars, entry_ids):
+    entries = ars.iter_query(SCHEMA, b'', [b'Priority'], page_size=1)
+    next(entries)
+
+    assert ars.match_count == 4
+    entries.close()
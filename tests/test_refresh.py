@@ -0,0 +1,170 @@
+import threading
+
+import pytest
+
+from conftest import FIELDS, SCHEMA
+from pyremedy import ARSPool, arh
+
+
+OTHER_SCHEMA = b'CHG:Infrastructure Change'
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    simulator.add_schema(OTHER_SCHEMA, FIELDS)
+
+    # The schemas were last changed well before they are retrieved
+    for name in [schema, OTHER_SCHEMA]:
+        simulator.schemas[name].timestamp = 1000000000
+
+    return simulator.add_entries(SCHEMA, [{7: 1, 9: 3}])
+
+
+@pytest.fixture
+def calls(simulator):
+    """Records the calls listing schemas and fields and their arguments."""
+
+    calls = []
+
+    def record(name, function):
+        def call(*args):
+            calls.append((name, args))
+            return function(*args)
+        return call
+
+    for name in ['ARGetListSchema', 'ARGetListField', 'ARGetMultipleFields']:
+        simulated = getattr(simulator, name)
+        simulated.function = record(name, simulated.function)
+
+    return calls
+
+
+def call_names(calls):
+    return [name for name, args in calls]
+
+
+def test_refresh_without_cached_details(ars, entry_ids, calls):
+    assert ars.refresh() == []
+    assert calls == []
+
+
+def test_refresh_unchanged(ars, entry_ids, calls):
+    ars.schemas()
+    ars.get(SCHEMA, entry_ids[0], [b'Status'])
+    timestamp = ars.field_timestamp_cache[SCHEMA]
+    del calls[:]
+
+    assert ars.refresh() == []
+
+    # Only the schema lists are retrieved as no schema has changed since
+    assert call_names(calls) == ['ARGetListSchema', 'ARGetListSchema']
+    assert calls[0][1][1] == 0
+    assert calls[1][1][1] > 0
+    assert ars.field_timestamp_cache[SCHEMA] >= timestamp
+    assert ars.get(SCHEMA, entry_ids[0], [b'Status']) == {
+        b'Status': b'Closed'
+    }
+
+
+def test_refresh_changed_schema(ars, simulator, entry_ids, calls):
+    ars.schemas()
+    ars.get(SCHEMA, entry_ids[0], [b'Status'])
+    ars.fields(OTHER_SCHEMA)
+    changed_since = ars.field_timestamp_cache[SCHEMA] - 300
+
+    # A field is modified, another is added and another removed
+    simulator.add_schema(SCHEMA, [
+        (1, b'Request ID', arh.AR_DATA_TYPE_CHAR),
+        (7, b'Status', arh.AR_DATA_TYPE_ENUM, [(0, b'Open'), (1, b'Done')]),
+        (10, b'Urgency', arh.AR_DATA_TYPE_INTEGER)
+    ])
+    simulator.add_entries(SCHEMA, [{7: 1, 10: 2}])
+    simulator.add_schema(b'New Schema', FIELDS)
+    del calls[:]
+
+    assert ars.refresh() == [SCHEMA]
+
+    # Fields changed since the details were retrieved are listed and only
+    # their details are retrieved
+    list_field_calls = [
+        args for name, args in calls if name == 'ARGetListField'
+    ]
+    assert [args[3] for args in list_field_calls] == [0, changed_since]
+    assert call_names(calls).count('ARGetMultipleFields') == 1
+
+    assert b'New Schema' in ars.schemas()
+    assert list(ars.field_name_to_id_cache[SCHEMA]) == [
+        b'Request ID', b'Status', b'Urgency'
+    ]
+    assert ars.get(SCHEMA, entry_ids[0], [b'Status']) == {
+        b'Status': b'Done'
+    }
+    assert b'Priority' in ars.field_name_to_id_cache[OTHER_SCHEMA]
+
+
+def test_refresh_deleted_schema(ars, simulator, entry_ids):
+    ars.schemas()
+    ars.fields(SCHEMA)
+    ars.fields(OTHER_SCHEMA)
+    ars.query(SCHEMA, b"'Priority' > 1", [b'Priority'])
+
+    del simulator.schemas[SCHEMA]
+
+    assert ars.refresh() == [SCHEMA]
+
+    assert SCHEMA not in ars.schemas()
+    for cache in [
+        ars.field_timestamp_cache, ars.field_id_to_name_cache,
+        ars.field_name_to_id_cache, ars.field_id_to_type_cache,
+        ars.enum_id_to_name_cache, ars.enum_name_to_id_cache,
+        ars.field_generation_cache
+    ]:
+        assert SCHEMA not in cache
+        assert OTHER_SCHEMA in cache
+
+    # The qualifiers loaded for the schema have been freed
+    assert ars.qualifier_cache.acquire(SCHEMA, b"'Priority' > 1") is None
+
+    # The schema is retrieved again if it is recreated
+    simulator.add_schema(SCHEMA, FIELDS)
+    assert b'Priority' in ars.fields(SCHEMA)
+
+
+def test_refresh_retrieves_fields_without_the_lock(simulator, entry_ids):
+    pool = ARSPool(
+        b'simulator', b'user', b'password', size=2, arlib=simulator
+    )
+    try:
+        first = pool.checkout()
+        second = pool.checkout()
+        first.fields(SCHEMA)
+        simulator.add_schema(SCHEMA, FIELDS + [
+            (10, b'Urgency', arh.AR_DATA_TYPE_INTEGER)
+        ])
+
+        # Other sessions can take the field lock while the refreshed field
+        # details are being retrieved
+        locked = []
+        get_multiple_fields = simulator.ARGetMultipleFields.function
+
+        def take_lock():
+            locked.append(pool.field_lock.acquire(False))
+            if locked[-1]:
+                pool.field_lock.release()
+
+        def check_lock(*args):
+            thread = threading.Thread(target=take_lock)
+            thread.start()
+            thread.join()
+            return get_multiple_fields(*args)
+
+        simulator.ARGetMultipleFields.function = check_lock
+        assert first.refresh() == [SCHEMA]
+
+        assert locked == [True]
+        assert b'Urgency' in second.fields(SCHEMA)
+
+        pool.checkin(first)
+        pool.checkin(second)
+    finally:
+        pool.terminate()
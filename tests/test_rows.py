@@ -0,0 +1,92 @@
+import pickle
+
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import Row
+from pyremedy import rows
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.add_entries(schema, [
+        {7: 0, 8: b'printer', 9: 3}, {7: 1, 8: b'network', 9: 1}
+    ])
+
+
+def test_query_rows(ars, entry_ids):
+    entries = ars.query(
+        SCHEMA, b'', [b'Short Description', b'Status'], as_rows=True
+    )
+
+    entry_id, row = entries[0]
+    assert isinstance(row, Row)
+    assert row == (b'printer', b'New')
+    assert row[1] == row[b'Status'] == row.status == b'New'
+    assert row.short_description == b'printer'
+    assert row.keys() == (b'Short Description', b'Status')
+    assert row.items() == [
+        (b'Short Description', b'printer'), (b'Status', b'New')
+    ]
+    assert row.as_dict() == ars.get(
+        SCHEMA, entry_id, [b'Short Description', b'Status']
+    )
+    assert row.get(b'Priority', 5) == 5
+    with pytest.raises(KeyError):
+        row[b'Priority']
+
+    # All rows of a query share a class
+    assert type(entries[1][1]) is type(row)
+
+
+def test_get_and_get_many_rows(ars, entry_ids):
+    row = ars.get(SCHEMA, entry_ids[1], [b'Priority'], as_rows=True)
+    assert row.priority == 1
+
+    entries = ars.get_many(
+        SCHEMA, entry_ids + [b'missing'], [b'Priority'], as_rows=True
+    )
+    assert [entry_values for entry_id, entry_values in entries] == [
+        (3,), (1,), None
+    ]
+
+
+def test_rows_pickle(ars, entry_ids):
+    entry_id, row = ars.query(
+        SCHEMA, b'', [b'Priority', b'Status'], as_rows=True
+    )[0]
+
+    restored = pickle.loads(pickle.dumps(row))
+
+    assert restored == row
+    assert restored.status == b'New'
+    assert restored.fields == row.fields
+
+
+def test_row_class_attribute_names():
+    cls = rows.row_class(SCHEMA, [b'Assigned Group*+', b'1st Level', b'get'])
+    row = cls((b'Support', 1, 2))
+
+    assert row.assigned_group == b'Support'
+    assert row.f_1st_level == 1
+
+    # Field names clashing with methods are only available by name
+    assert row[b'get'] == 2
+    assert callable(row.get)
+
+
+def test_row_classes_are_bounded(monkeypatch):
+    monkeypatch.setattr(rows, 'ROW_CLASS_CACHE_SIZE', 3)
+    monkeypatch.setattr(rows, '_row_classes', rows.OrderedDict())
+
+    first = rows.row_class(SCHEMA, [b'A'])
+    for field in [b'B', b'C']:
+        rows.row_class(SCHEMA, [field])
+
+    # Using a class keeps it while the least recently used one is dropped
+    assert rows.row_class(SCHEMA, [b'A']) is first
+    rows.row_class(SCHEMA, [b'D'])
+
+    assert len(rows._row_classes) == 3
+    assert (SCHEMA, (b'A',)) in rows._row_classes
+    assert (SCHEMA, (b'B',)) not in rows._row_classes
@@ -0,0 +1,41 @@
+import pytest
+
+from conftest import SCHEMA
+from pyremedy import ARSError
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.add_entries(schema, [{9: i} for i in range(3)])
+
+
+def test_get_reuses_request_structs(ars, simulator, entry_ids):
+    internal_id_list = ars.scratch.internal_id_list([])
+
+    for i, entry_id in enumerate(entry_ids):
+        assert ars.get(SCHEMA, entry_id, [b'Priority']) == {b'Priority': i}
+
+    assert ars.scratch.internal_id_list([]) is internal_id_list
+    assert simulator.allocations == 0
+
+
+def test_get_invalid_field(ars, simulator, entry_ids):
+    with pytest.raises(ARSError) as excinfo:
+        ars.get(SCHEMA, entry_ids[0], [b'Priority', b'Bogus'])
+
+    assert 'Bogus' in str(excinfo.value)
+    assert simulator.allocations == 0
+
+
+@pytest.mark.parametrize('value', [12345, u'Printer offline', 2.5])
+def test_create_and_update_reject_non_bytes_characters(
+    ars, simulator, entry_ids, value
+):
+    # ctypes would store an integer in a character value as an address
+    with pytest.raises(ARSError):
+        ars.create(SCHEMA, {b'Short Description': value})
+
+    with pytest.raises(ARSError):
+        ars.update(SCHEMA, entry_ids[0], {b'Short Description': value})
+
+    assert len(simulator.schemas[SCHEMA].entries) == 3
@@ -0,0 +1,72 @@
+import pytest
+
+from conftest import FIELDS, SCHEMA
+from pyremedy import ARSError, F, arh
+
+
+@pytest.fixture
+def fields():
+    return FIELDS + [(10, b'Effort', arh.AR_DATA_TYPE_REAL)]
+
+
+@pytest.fixture
+def entry_ids(simulator, schema):
+    return simulator.add_entries(schema, [
+        {7: 0, 9: 1, 10: 1.5}, {7: 1, 9: 2, 10: 2.0},
+        {7: 0, 9: 1, 10: 4.5}, {7: 0, 9: 2, 10: None}
+    ])
+
+
+def test_count(ars, entry_ids):
+    assert ars.statistics(SCHEMA, b'', 'count') == [(4,)]
+
+
+def test_count_grouped_by_enum(ars, entry_ids):
+    # Group values are decoded as per queries, so enums are named
+    results = ars.statistics(SCHEMA, b'', 'count', group_by=[b'Status'])
+
+    assert sorted(results) == [(b'Closed', 1), (b'New', 3)]
+
+
+def test_count_grouped_by_several_fields(ars, entry_ids):
+    results = ars.statistics(
+        SCHEMA, F(b'Status') == b'New', 'count',
+        group_by=[b'Status', 9]
+    )
+
+    assert sorted(results) == [(b'New', 1, 2), (b'New', 2, 1)]
+
+
+@pytest.mark.parametrize('operation, expected', [
+    ('sum', 8.0), ('avg', 8.0 / 3), ('min', 1.5), ('max', 4.5)
+])
+def test_statistics_of_target_field(ars, entry_ids, operation, expected):
+    results = ars.statistics(SCHEMA, b'', operation, target_field=b'Effort')
+
+    assert results == [(pytest.approx(expected),)]
+
+
+def test_statistics_grouped_by_field_id(ars, entry_ids):
+    results = ars.statistics(
+        SCHEMA, b'', 'max', target_field=10, group_by=[7]
+    )
+
+    assert sorted(results) == [(b'Closed', 2.0), (b'New', 4.5)]
+
+
+def test_statistics_frees_results(ars, simulator, entry_ids):
+    ars.statistics(SCHEMA, b'', 'count', group_by=[b'Status'])
+    ars.qualifier_cache.invalidate()
+
+    assert simulator.allocations == 0
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'operation': 'median', 'target_field': b'Effort'},
+    {'operation': 'sum'},
+    {'operation': 'sum', 'target_field': b'Bogus'},
+    {'operation': 'count', 'group_by': [b'Bogus']}
+])
+def test_invalid_statistics(ars, entry_ids, kwargs):
+    with pytest.raises(ARSError):
+        ars.statistics(SCHEMA, b'', **kwargs)